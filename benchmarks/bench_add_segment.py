@@ -0,0 +1,60 @@
+"""`ScriptFile.add_segment`的吞吐量基准测试
+
+每个片段均为带淡入淡出及滤镜的视频片段, 因此每次添加都会向素材列表中加入多项素材. 用法:
+
+    python benchmarks/bench_add_segment.py [--sizes 1000,10000,100000] [--max-seconds S] [--repo PATH]
+
+通过`--repo`指定其它版本的代码目录(如`git worktree add /tmp/base <commit>`), 即可得到修改前的对比数据
+"""
+
+import os
+import sys
+import time
+import argparse
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="逗号分隔的片段数量")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="某一规模耗时超过此秒数后跳过更大的规模")
+    parser.add_argument("--repo", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="被测试的代码目录, 默认为本仓库")
+    return parser.parse_args()
+
+def bench(draft, material, filter_type, count: int) -> float:
+    """返回添加`count`个片段的耗时, 单位为秒, 不含片段的构造时间"""
+    script = draft.ScriptFile(1920, 1080, 30, True)
+    script.add_track(draft.TrackType.video)
+    segments = []
+    for i in range(count):
+        seg = draft.VideoSegment(material, draft.Timerange(i * 100000, 100000))
+        seg.add_fade(10000, 10000)
+        seg.add_filter(filter_type, 50)
+        segments.append(seg)
+
+    start = time.perf_counter()
+    for seg in segments:
+        script.add_segment(seg)
+    return time.perf_counter() - start
+
+def main() -> None:
+    args = _parse_args()
+    sys.path.insert(0, os.path.abspath(args.repo))
+    import pyJianYingDraft as draft
+
+    material = draft.VideoMaterial(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                                "readme_assets", "tutorial", "video.mp4"))
+    filter_type = list(draft.FilterType)[0]
+
+    print("代码目录: %s" % os.path.dirname(os.path.abspath(draft.__file__)))
+    print("%10s %12s %14s" % ("片段数", "耗时(s)", "吞吐量(seg/s)"))
+    skip = False
+    for count in (int(size) for size in args.sizes.split(",")):
+        if skip:
+            print("%10d %12s %14s" % (count, "跳过", "-"))
+            continue
+        elapsed = bench(draft, material, filter_type, count)
+        print("%10d %12.3f %14.0f" % (count, elapsed, count / elapsed))
+        skip = elapsed > args.max_seconds
+
+if __name__ == "__main__":
+    main()
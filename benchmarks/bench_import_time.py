@@ -0,0 +1,68 @@
+"""`import pyJianYingDraft`的导入耗时基准测试
+
+多次在新的解释器中以`python -X importtime`导入本包, 解析其输出并报告各次运行的中位数:
+本包及`pyJianYingDraft.metadata`的累计导入耗时, 以及累计耗时最多的若干个模块. 用法:
+
+    python benchmarks/bench_import_time.py [--runs N] [--top N] [--repo PATH]
+
+通过`--repo`指定其它版本的代码目录(如`git worktree add /tmp/base <commit>`), 即可得到修改前的对比数据
+"""
+
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+
+from typing import Dict, List
+
+_LINE_PATTERN = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\S+)\s*$")
+"""`-X importtime`输出的一行: 自身耗时(us) | 累计耗时(us) | 缩进的模块名"""
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="运行次数, 取中位数")
+    parser.add_argument("--top", type=int, default=10, help="列出累计耗时最多的模块数量")
+    parser.add_argument("--repo", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="被测试的代码目录, 默认为本仓库")
+    return parser.parse_args()
+
+def measure(repo: str) -> Dict[str, int]:
+    """在新的解释器中导入一次本包, 返回各模块的累计导入耗时, 单位为微秒"""
+    # `-c`模式下当前目录位于sys.path之首, 故须在代码目录中运行
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([repo] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import pyJianYingDraft"], cwd=repo,
+                          env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("导入失败:\n" + proc.stderr)
+
+    ret: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match is not None:
+            ret[match.group(3)] = int(match.group(2))
+    return ret
+
+def main() -> None:
+    args = _parse_args()
+    repo = os.path.abspath(args.repo)
+    runs: List[Dict[str, int]] = [measure(repo) for _ in range(args.runs)]
+
+    def median(module: str) -> float:
+        return statistics.median(run.get(module, 0) for run in runs) / 1000
+
+    print("代码目录: %s" % repo)
+    print("运行次数: %d, 以下均为累计耗时的中位数" % args.runs)
+    print("%-48s %10s" % ("模块", "耗时(ms)"))
+    for module in ("pyJianYingDraft", "pyJianYingDraft.metadata"):
+        print("%-48s %10.1f" % (module, median(module)))
+
+    print("\n累计耗时最多的%d个模块:" % args.top)
+    modules = sorted(set().union(*runs), key=median, reverse=True)
+    for module in [name for name in modules if name != "pyJianYingDraft"][:args.top]:
+        print("%-48s %10.1f" % (module, median(module)))
+
+if __name__ == "__main__":
+    main()
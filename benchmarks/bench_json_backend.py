@@ -0,0 +1,82 @@
+"""各JSON后端下草稿读写的基准测试
+
+构造一个含大量文本片段的草稿, 分别测试JSON编解码本身以及`ScriptFile.load_template`、`ScriptFile.dump`的耗时.
+未安装的后端会被跳过, 用法:
+
+    python benchmarks/bench_json_backend.py [--segments N] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import importlib
+
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import json_backend, trange
+
+def _best(func: Callable[[], object], repeat: int) -> float:
+    """返回多次调用中的最短耗时, 单位为秒"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def build_draft(segments: int) -> draft.ScriptFile:
+    script = draft.ScriptFile(1920, 1080, 30, True)
+    script.add_track(draft.TrackType.text)
+    for i in range(segments):
+        seg = draft.TextSegment("第%d条字幕" % i, trange(i * 100000, 100000),
+                                style=draft.TextStyle(color=(1.0, 1.0, 0.0)), border=draft.TextBorder())
+        script.add_segment(seg)
+    return script
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=20000, help="草稿中的文本片段数量")
+    parser.add_argument("--repeat", type=int, default=3, help="每项测试的重复次数, 取最短耗时")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, "draft_content.json")
+        out_path = os.path.join(tmp_dir, "out.json")
+        json_backend.set_backend("json")
+        build_draft(args.segments).dump(path)
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        obj = json_backend.loads(raw)
+        print("草稿大小: %.1f MB, %d个文本片段" % (len(raw.encode("utf-8")) / 2 ** 20, args.segments))
+
+        print("%-8s %10s %10s %10s %14s %10s %12s" %
+              ("后端", "loads", "dumps(4)", "dumps", "load_template", "dump", "dump紧凑"))
+        for backend in ("json", "ujson", "orjson"):
+            try:
+                importlib.import_module(backend)
+            except ImportError:
+                print("%-8s 未安装" % backend)
+                continue
+            json_backend.set_backend(backend)
+            template = draft.ScriptFile.load_template(path)
+            print("%-8s %10.3f %10.3f %10.3f %14.3f %10.3f %12.3f" % (
+                backend,
+                _best(lambda: json_backend.loads(raw), args.repeat),
+                _best(lambda: json_backend.dumps(obj, 4), args.repeat),
+                _best(lambda: json_backend.dumps(obj), args.repeat),
+                _best(lambda: draft.ScriptFile.load_template(path), args.repeat),
+                _best(lambda: template.dump(out_path), args.repeat),
+                _best(lambda: template.dump(out_path, compact=True), args.repeat),
+            ))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+if __name__ == "__main__":
+    main()
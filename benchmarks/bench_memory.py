@@ -0,0 +1,71 @@
+"""片段及时间线值对象的内存占用基准测试
+
+使用`tracemalloc`统计构造N个对象(及其附属的时间范围、关键帧等)所分配的内存, 输出每个对象的平均字节数. 用法:
+
+    python benchmarks/bench_memory.py [--count N] [--repo PATH]
+
+通过`--repo`指定其它版本的代码目录(如`git worktree add /tmp/base <commit>`), 即可得到修改前的对比数据
+"""
+
+import os
+import gc
+import sys
+import argparse
+import tracemalloc
+
+from typing import Any, Callable, List
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="每项测试构造的对象数量")
+    parser.add_argument("--repo", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="被测试的代码目录, 默认为本仓库")
+    return parser.parse_args()
+
+def measure(factory: Callable[[int], Any], count: int) -> float:
+    """返回通过`factory(i)`构造`count`个对象后仍被持有的内存, 按对象平均, 单位为字节"""
+    objects: List[Any] = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            objects.append(factory(i))
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / count
+
+def main() -> None:
+    args = _parse_args()
+    sys.path.insert(0, os.path.abspath(args.repo))
+    import pyJianYingDraft as draft
+
+    assets = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "readme_assets", "tutorial")
+    video = draft.VideoMaterial(os.path.join(assets, "video.mp4"))
+    audio = draft.AudioMaterial(os.path.join(assets, "audio.mp3"))
+
+    def video_with_keyframes(i: int) -> Any:
+        seg = draft.VideoSegment(video, draft.Timerange(i * 100000, 100000))
+        seg.add_keyframe(draft.KeyframeProperty.alpha, 0, 0.0)
+        seg.add_keyframe(draft.KeyframeProperty.alpha, 50000, 1.0)
+        return seg
+
+    cases = [
+        ("Timerange", lambda i: draft.Timerange(i * 100000, 100000)),
+        ("TextSegment", lambda i: draft.TextSegment("字幕", draft.Timerange(i * 100000, 100000))),
+        ("AudioSegment", lambda i: draft.AudioSegment(audio, draft.Timerange(i * 100000, 100000))),
+        ("VideoSegment", lambda i: draft.VideoSegment(video, draft.Timerange(i * 100000, 100000))),
+        ("VideoSegment+2关键帧", video_with_keyframes),
+    ]
+
+    print("代码目录: %s" % os.path.dirname(os.path.abspath(draft.__file__)))
+    print("对象数量: %d" % args.count)
+    print("%-24s %14s %14s" % ("对象", "字节/对象", "总计(MB)"))
+    for name, factory in cases:
+        per_object = measure(factory, args.count)
+        print("%-24s %14.0f %14.1f" % (name, per_object, per_object * args.count / 2 ** 20))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""`time_util`中时间解析函数的微基准测试
+
+对比正则快速路径与原有解析方式(`_parse_tim_fallback`, `_srt_tstamp_fallback`)的耗时, 用法:
+
+    python benchmarks/bench_time_util.py [--number N] [--stamps N]
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyJianYingDraft import time_util
+
+def _best(stmt, number: int, repeat: int = 5) -> float:
+    """返回单次调用的最短耗时, 单位为秒"""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+def _report(name: str, seconds: float, baseline: Optional[float] = None) -> None:
+    line = "%-36s %10.0f ns" % (name, seconds * 1e9)
+    if baseline is not None:
+        line += "  (x%.1f)" % (baseline / seconds)
+    print(line)
+
+def bench_tim(number: int) -> None:
+    for literal in ("0.5s", "1h52m3s", "-1m30.25s"):
+        baseline = _best(lambda: time_util._parse_tim_fallback(literal), number)
+        _report("tim(%r) 原解析方式" % literal, baseline)
+        _report("tim(%r) 正则, 无缓存" % literal, _best(lambda: time_util._parse_tim.__wrapped__(literal), number), baseline)
+        _report("tim(%r) 正则, 命中缓存" % literal, _best(lambda: time_util.tim(literal), number), baseline)
+
+def bench_srt_tstamp(number: int) -> None:
+    tstamp = "01:02:03,456"
+    baseline = _best(lambda: time_util._srt_tstamp_fallback(tstamp), number)
+    _report("srt_tstamp 原解析方式", baseline)
+    _report("srt_tstamp 正则", _best(lambda: time_util.srt_tstamp(tstamp), number), baseline)
+
+def bench_srt_tstamps(count: int) -> None:
+    tstamps = ["%02d:%02d:%02d,%03d" % (ms // 3600000, ms // 60000 % 60, ms // 1000 % 60, ms % 1000)
+               for ms in range(0, count * 1234, 1234)]
+    baseline = _best(lambda: [time_util._srt_tstamp_fallback(t) for t in tstamps], 1)
+    _report("%d个时间戳 原解析方式逐个解析" % count, baseline)
+    _report("%d个时间戳 逐个srt_tstamp" % count, _best(lambda: [time_util.srt_tstamp(t) for t in tstamps], 1), baseline)
+    _report("%d个时间戳 srt_tstamps" % count, _best(lambda: time_util.srt_tstamps(tstamps), 1), baseline)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000, help="单次调用类测试的循环次数")
+    parser.add_argument("--stamps", type=int, default=40000, help="批量解析测试的时间戳数量")
+    args = parser.parse_args()
+
+    bench_tim(args.number)
+    bench_srt_tstamp(args.number)
+    bench_srt_tstamps(args.stamps)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import warnings
 import sys
 
-from .local_materials import CropSettings, VideoMaterial, AudioMaterial
+from typing import TYPE_CHECKING, List, Any
+
+from .local_materials import CropSettings, VideoMaterial, AudioMaterial, load_materials
 from .keyframe import KeyframeProperty
 
 from .time_util import Timerange
@@ -10,13 +12,15 @@ from .video_segment import VideoSegment, StickerSegment, ClipSettings
 from .effect_segment import EffectSegment, FilterSegment
 from .text_segment import TextSegment, TextStyle, TextBorder, TextBackground, TextShadow
 
-from .metadata import FontType
-from .metadata import MaskType
-from .metadata import TransitionType, FilterType
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import TextIntro, TextOutro, TextLoopAnim
-from .metadata import AudioSceneEffectType
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType
+from . import metadata
+if TYPE_CHECKING:
+    from .metadata import FontType
+    from .metadata import MaskType
+    from .metadata import TransitionType, FilterType
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
+    from .metadata import AudioSceneEffectType
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType
 
 from .track import TrackType
 from .template_mode import ShrinkMode, ExtendMode
@@ -144,12 +148,18 @@ class Crop_settings:
 
 # 枚举类的向后兼容 - 使用代理类
 class _DeprecatedEnum:
-    """带deprecation警告的枚举代理类"""
+    """带deprecation警告的枚举代理类, `original_enum`为字符串时表示本包中延迟加载的同名枚举"""
     def __init__(self, original_enum, old_name, new_name):
-        self._enum = original_enum
+        self._original_enum = original_enum
         self._old_name = old_name
         self._new_name = new_name
 
+    @property
+    def _enum(self):
+        if isinstance(self._original_enum, str):
+            self._original_enum = getattr(sys.modules[__name__], self._original_enum)
+        return self._original_enum
+
     def __getattr__(self, name):
         # 当访问枚举成员时显示警告
         _deprecated_class_warning(self._old_name, self._new_name)
@@ -164,19 +174,19 @@ class _DeprecatedEnum:
         return f"<Deprecated {self._old_name} (use {self._new_name} instead)>"
 
 Track_type = _DeprecatedEnum(TrackType, "Track_type", "TrackType")
-Font_type = _DeprecatedEnum(FontType, "Font_type", "FontType")
-Mask_type = _DeprecatedEnum(MaskType, "Mask_type", "MaskType")
-Filter_type = _DeprecatedEnum(FilterType, "Filter_type", "FilterType")
-Transition_type = _DeprecatedEnum(TransitionType, "Transition_type", "TransitionType")
-Intro_type = _DeprecatedEnum(IntroType, "Intro_type", "IntroType")
-Outro_type = _DeprecatedEnum(OutroType, "Outro_type", "OutroType")
-Group_animation_type = _DeprecatedEnum(GroupAnimationType, "Group_animation_type", "GroupAnimationType")
-Text_intro = _DeprecatedEnum(TextIntro, "Text_intro", "TextIntro")
-Text_outro = _DeprecatedEnum(TextOutro, "Text_outro", "TextOutro")
-Text_loop_anim = _DeprecatedEnum(TextLoopAnim, "Text_loop_anim", "TextLoopAnim")
-Audio_scene_effect_type = _DeprecatedEnum(AudioSceneEffectType, "Audio_scene_effect_type", "AudioSceneEffectType")
-Video_scene_effect_type = _DeprecatedEnum(VideoSceneEffectType, "Video_scene_effect_type", "VideoSceneEffectType")
-Video_character_effect_type = _DeprecatedEnum(VideoCharacterEffectType, "Video_character_effect_type", "VideoCharacterEffectType")
+Font_type = _DeprecatedEnum("FontType", "Font_type", "FontType")
+Mask_type = _DeprecatedEnum("MaskType", "Mask_type", "MaskType")
+Filter_type = _DeprecatedEnum("FilterType", "Filter_type", "FilterType")
+Transition_type = _DeprecatedEnum("TransitionType", "Transition_type", "TransitionType")
+Intro_type = _DeprecatedEnum("IntroType", "Intro_type", "IntroType")
+Outro_type = _DeprecatedEnum("OutroType", "Outro_type", "OutroType")
+Group_animation_type = _DeprecatedEnum("GroupAnimationType", "Group_animation_type", "GroupAnimationType")
+Text_intro = _DeprecatedEnum("TextIntro", "Text_intro", "TextIntro")
+Text_outro = _DeprecatedEnum("TextOutro", "Text_outro", "TextOutro")
+Text_loop_anim = _DeprecatedEnum("TextLoopAnim", "Text_loop_anim", "TextLoopAnim")
+Audio_scene_effect_type = _DeprecatedEnum("AudioSceneEffectType", "Audio_scene_effect_type", "AudioSceneEffectType")
+Video_scene_effect_type = _DeprecatedEnum("VideoSceneEffectType", "Video_scene_effect_type", "VideoSceneEffectType")
+Video_character_effect_type = _DeprecatedEnum("VideoCharacterEffectType", "Video_character_effect_type", "VideoCharacterEffectType")
 Keyframe_property = _DeprecatedEnum(KeyframeProperty, "Keyframe_property", "KeyframeProperty")
 
 # 仅在Windows系统下定义jianying_controller相关的向后兼容类
@@ -208,6 +218,7 @@ __all__ = [
     "CropSettings",
     "VideoMaterial",
     "AudioMaterial",
+    "load_materials",
     "KeyframeProperty",
     "Timerange",
     "AudioSegment",
@@ -275,3 +286,21 @@ if ISWIN:
         "Export_resolution",
         "Export_framerate",
     ])
+
+_LAZY_METADATA = {
+    "FontType", "MaskType", "TransitionType", "FilterType",
+    "IntroType", "OutroType", "GroupAnimationType",
+    "TextIntro", "TextOutro", "TextLoopAnim",
+    "AudioSceneEffectType", "VideoSceneEffectType", "VideoCharacterEffectType",
+}
+"""由`metadata`包延迟加载的枚举类, 仅在首次访问时导入"""
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_METADATA:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(metadata, name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _LAZY_METADATA)
@@ -1,15 +1,16 @@
 """定义视频/文本动画相关类"""
 
-import uuid
-
-from typing import Union, Optional
+from typing import TYPE_CHECKING, Union, Optional
 from typing import Literal, Dict, List, Any
 
+from .id_generator import generate_id
 from .time_util import Timerange
 
 from .metadata import AnimationMeta
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import TextIntro, TextOutro, TextLoopAnim
+
+if TYPE_CHECKING:
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
 
 class Animation:
     """一个视频/文本动画效果"""
@@ -61,8 +62,9 @@ class VideoAnimation(Animation):
 
     animation_type: Literal["in", "out", "group"]
 
-    def __init__(self, animation_type: Union[IntroType, OutroType, GroupAnimationType],
+    def __init__(self, animation_type: Union["IntroType", "OutroType", "GroupAnimationType"],
                  start: int, duration: int):
+        from .metadata import IntroType, OutroType, GroupAnimationType
         super().__init__(animation_type.value, start, duration)
 
         if isinstance(animation_type, IntroType):
@@ -79,8 +81,9 @@ class Text_animation(Animation):
 
     animation_type: Literal["in", "out", "loop"]
 
-    def __init__(self, animation_type: Union[TextIntro, TextOutro, TextLoopAnim],
+    def __init__(self, animation_type: Union["TextIntro", "TextOutro", "TextLoopAnim"],
                  start: int, duration: int):
+        from .metadata import TextIntro, TextOutro, TextLoopAnim
         super().__init__(animation_type.value, start, duration)
 
         if isinstance(animation_type, TextIntro):
@@ -104,7 +107,7 @@ class SegmentAnimations:
     """动画列表"""
 
     def __init__(self):
-        self.animation_id = uuid.uuid4().hex
+        self.animation_id = generate_id()
         self.animations = []
 
     def get_animation_trange(self, animation_type: Literal["in", "out", "group", "loop"]) -> Optional[Timerange]:
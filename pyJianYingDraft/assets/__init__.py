@@ -2,7 +2,11 @@
 pyJianYingDraft 的资源管理模块，提供集中管理资源文件的方式，避免硬编码路径
 """
 
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
+
+from .. import json_backend
 
 # 获取当前模块所在目录
 ASSETS_DIR = Path(__file__).parent
@@ -38,8 +42,44 @@ def get_asset_path(asset_name: str) -> Path:
 
     return file_path
 
+@lru_cache(maxsize=None)
+def read_asset_bytes(asset_name: str) -> bytes:
+    """
+    读取指定资源文件的原始内容, 每个进程中每个资源只从磁盘读取一次
+
+    Args:
+        asset_name: 资源名称（ASSET_FILES中的key）
+
+    Returns:
+        bytes: 资源文件的内容
+
+    Raises:
+        KeyError: 资源名称不存在
+        FileNotFoundError: 文件不存在
+    """
+    return get_asset_path(asset_name).read_bytes()
+
+def load_asset_json(asset_name: str) -> Any:
+    """
+    解析指定的json资源文件, 文件内容经缓存后只读取一次, 每次调用均返回一份可自由修改的独立副本
+
+    Args:
+        asset_name: 资源名称（ASSET_FILES中的key）
+
+    Returns:
+        Any: 解析得到的json数据
+
+    Raises:
+        KeyError: 资源名称不存在
+        FileNotFoundError: 文件不存在
+    """
+    # 对这种小文件, 重新解析缓存的字节串比`deepcopy`已解析的对象更快
+    return json_backend.loads(read_asset_bytes(asset_name))
+
 # 导出主要接口
 __all__ = [
     'get_asset_path',
+    'read_asset_bytes',
+    'load_asset_json',
     'ASSET_FILES'
 ]
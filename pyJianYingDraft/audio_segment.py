@@ -3,19 +3,19 @@
 包含淡入淡出效果、音频特效等相关类
 """
 
-import uuid
-from copy import deepcopy
-
-from typing import Optional, Literal, Union
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Optional, Literal, Union
+from typing import Dict, List, Sequence, Any
 
+from .id_generator import generate_id
 from .time_util import tim, Timerange
 from .segment import MediaSegment, AudioFade
 from .local_materials import AudioMaterial
-from .keyframe import KeyframeProperty, KeyframeList
+from .keyframe import KeyframeProperty
 
 from .metadata import EffectParamInstance
-from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
+
+if TYPE_CHECKING:
+    from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
 
 
 class AudioEffect:
@@ -34,12 +34,13 @@ class AudioEffect:
 
     audio_adjust_params: List[EffectParamInstance]
 
-    def __init__(self, effect_meta: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
+    def __init__(self, effect_meta: Union["AudioSceneEffectType", "ToneEffectType", "SpeechToSongType"],
                  params: Optional[List[Optional[float]]] = None):
         """根据给定的音效元数据及参数列表构造一个音频特效对象, params的范围是0~100"""
+        from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
 
         self.name = effect_meta.value.name
-        self.effect_id = uuid.uuid4().hex
+        self.effect_id = generate_id()
         self.resource_id = effect_meta.value.resource_id
         self.audio_adjust_params = []
 
@@ -80,8 +81,10 @@ class AudioEffect:
 class AudioSegment(MediaSegment):
     """安放在轨道上的一个音频片段"""
 
+    __slots__ = ("material_instance", "fade", "effects")
+
     material_instance: AudioMaterial
-    """音频素材实例"""
+    """音频素材实例, 与使用同一素材的其它片段共享"""
 
     fade: Optional[AudioFade]
     """音频淡入淡出效果, 可能为空
@@ -101,7 +104,7 @@ class AudioSegment(MediaSegment):
         """利用给定的音频素材构建一个轨道片段, 并指定其时间信息及播放速度/音量
 
         Args:
-            material (`AudioMaterial` or `str`): 素材实例或素材路径, 若为路径则自动构造素材实例
+            material (`AudioMaterial` or `str`): 素材实例或素材路径, 若为路径则自动构造素材实例. 素材实例不会被复制而是被冻结
             target_timerange (`Timerange`): 片段在轨道上的目标时间范围
             source_timerange (`Timerange`, optional): 截取的素材片段的时间范围, 默认从开头根据`speed`截取与`target_timerange`等长的一部分
             speed (`float`, optional): 播放速度, 默认为1.0. 此项与`source_timerange`同时指定时, 将覆盖`target_timerange`中的时长
@@ -127,11 +130,12 @@ class AudioSegment(MediaSegment):
 
         super().__init__(material.material_id, source_timerange, target_timerange, speed, volume, change_pitch)
 
-        self.material_instance = deepcopy(material)
+        material.freeze()
+        self.material_instance = material
         self.fade = None
         self.effects = []
 
-    def add_effect(self, effect_type: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
+    def add_effect(self, effect_type: Union["AudioSceneEffectType", "ToneEffectType", "SpeechToSongType"],
                    params: Optional[List[Optional[float]]] = None) -> "AudioSegment":
         """为音频片段添加一个作用于整个片段的音频效果, 目前"声音成曲"效果不能自动被剪映所识别
 
@@ -182,14 +186,20 @@ class AudioSegment(MediaSegment):
             time_offset (`int`): 关键帧的时间偏移量, 单位为微秒
             volume (`float`): 音量在`time_offset`处的值
         """
-        _property = KeyframeProperty.volume
-        for kf_list in self.common_keyframes:
-            if kf_list.keyframe_property == _property:
-                kf_list.add_keyframe(time_offset, volume)
-                return self
-        kf_list = KeyframeList(_property)
-        kf_list.add_keyframe(time_offset, volume)
-        self.common_keyframes.append(kf_list)
+        self._get_keyframe_list(KeyframeProperty.volume).add_keyframe(time_offset, volume)
+        return self
+
+    def add_keyframes(self, time_offsets: Sequence[int], volumes: Sequence[float]) -> "AudioSegment":
+        """为音频片段批量创建*控制音量*的关键帧, 结果与逐个调用`add_keyframe`相同
+
+        Args:
+            time_offsets (`Sequence[int]`): 各关键帧的时间偏移量, 单位为微秒, 可以是NumPy数组
+            volumes (`Sequence[float]`): 音量在各时间偏移量处的值, 可以是NumPy数组
+
+        Raises:
+            `ValueError`: `time_offsets`与`volumes`的长度不一致
+        """
+        self._get_keyframe_list(KeyframeProperty.volume).add_keyframes(time_offsets, volumes)
         return self
 
     def export_json(self) -> Dict[str, Any]:
@@ -2,14 +2,75 @@
 
 import os
 import shutil
-import json
 import time
+import threading
+from collections import OrderedDict
 
-from typing import List
+from typing import Optional, List, Tuple
 
 from . import assets
+from . import json_backend
 from .script_file import ScriptFile
 
+class TemplateCache:
+    """进程级的模板草稿缓存, 以文件路径及其修改时间、大小为键保存已加载的模板, 并分发共享json数据的克隆(见`ScriptFile.clone`)
+
+    模板文件被修改后, 下次获取时会自动重新加载
+    """
+
+    max_entries: int
+    """最多缓存的模板数量, 超出时淘汰最久未使用的模板"""
+
+    _entries: "OrderedDict[str, Tuple[Tuple[int, int], ScriptFile]]"
+    _lock: threading.Lock
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load_template(self, json_path: str) -> ScriptFile:
+        """获取指定模板文件的一份克隆, 其保存路径即为`json_path`
+
+        Raises:
+            `FileNotFoundError`: JSON文件不存在
+        """
+        path = os.path.abspath(json_path)
+        if not os.path.exists(path):
+            raise FileNotFoundError("JSON文件 '%s' 不存在" % json_path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                prototype = entry[1]
+            else:
+                prototype = None
+        if prototype is None:
+            prototype = ScriptFile.load_template(path)
+            with self._lock:
+                self._entries[path] = (key, prototype)
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        ret = prototype.clone()
+        ret.save_path = json_path
+        return ret
+
+    def invalidate(self, json_path: Optional[str] = None) -> None:
+        """移除指定模板文件的缓存, 不指定路径时清空整个缓存"""
+        with self._lock:
+            if json_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(json_path), None)
+
+template_cache = TemplateCache()
+"""`DraftFolder`使用的进程级模板缓存"""
+
 class DraftFolder:
     """管理一个文件夹及其内的一系列草稿"""
 
@@ -69,7 +130,7 @@ class DraftFolder:
                 if os.path.exists(root_meta_file):
                     # 读取配置文件
                     with open(root_meta_file, 'r', encoding='utf-8') as f:
-                        root_meta = json.load(f)
+                        root_meta = json_backend.load(f)
 
                     # 查找并移除目标草稿
                     if "all_draft_store" in root_meta:
@@ -79,7 +140,7 @@ class DraftFolder:
                         # 写入临时文件
                         temp_file = root_meta_file + ".tmp"
                         with open(temp_file, 'w', encoding='utf-8') as f:
-                            json.dump(root_meta, f, ensure_ascii=False, indent=2)
+                            json_backend.dump(root_meta, f, indent=2)
 
                         # 备份原文件
                         backup_file = root_meta_file + ".bak"
@@ -121,7 +182,8 @@ class DraftFolder:
 
         # 创建草稿文件夹
         os.makedirs(draft_path)
-        shutil.copy(assets.get_asset_path("DRAFT_META_TEMPLATE"), os.path.join(draft_path, "draft_meta_info.json"))
+        with open(os.path.join(draft_path, "draft_meta_info.json"), "wb") as f:
+            f.write(assets.read_asset_bytes("DRAFT_META_TEMPLATE"))
 
         # 创建草稿文件
         script_file = ScriptFile(width, height, fps, maintrack_adsorb)
@@ -145,11 +207,12 @@ class DraftFolder:
         script_file = self.load_template(draft_name)
         script_file.inspect_material()
 
-    def load_template(self, draft_name: str) -> ScriptFile:
+    def load_template(self, draft_name: str, *, use_cache: bool = False) -> ScriptFile:
         """在文件夹中打开一个草稿作为模板, 并在其上进行编辑
 
         Args:
             draft_name (`str`): 草稿名称, 即相应文件夹名称
+            use_cache (`bool`, optional): 是否通过进程级的`template_cache`加载, 反复打开同一草稿时只需解析一次. 默认为否.
 
         Returns:
             `ScriptFile`: 以模板模式打开的草稿对象
@@ -161,15 +224,20 @@ class DraftFolder:
         if not os.path.exists(draft_path):
             raise FileNotFoundError(f"草稿文件夹 {draft_name} 不存在")
 
-        return ScriptFile.load_template(os.path.join(draft_path, "draft_content.json"))
+        json_path = os.path.join(draft_path, "draft_content.json")
+        if use_cache:
+            return template_cache.load_template(json_path)
+        return ScriptFile.load_template(json_path)
 
-    def duplicate_as_template(self, template_name: str, new_draft_name: str, allow_replace: bool = False) -> ScriptFile:
+    def duplicate_as_template(self, template_name: str, new_draft_name: str, allow_replace: bool = False, *,
+                              use_cache: bool = False) -> ScriptFile:
         """复制一份给定的草稿, 并在复制出的新草稿上进行编辑
 
         Args:
             template_name (`str`): 原草稿名称
             new_draft_name (`str`): 新草稿名称
             allow_replace (`bool`, optional): 是否允许覆盖与`new_draft_name`重名的草稿. 默认为否.
+            use_cache (`bool`, optional): 是否通过进程级的`template_cache`加载原草稿, 而非重新解析复制出的草稿文件. 默认为否.
 
         Returns:
             `ScriptFile`: 以模板模式打开的**复制后的**草稿对象
@@ -197,7 +265,7 @@ class DraftFolder:
             draft_meta_file = os.path.join(new_draft_path, "draft_meta_info.json")
             if os.path.exists(draft_meta_file):
                 with open(draft_meta_file, 'r', encoding='utf-8') as f:
-                    draft_meta = json.load(f)
+                    draft_meta = json_backend.load(f)
 
                 draft_meta["draft_name"] = new_draft_name
                 draft_meta["draft_id"] = new_draft_id
@@ -205,14 +273,14 @@ class DraftFolder:
                 draft_meta["tm_draft_create"] = current_time
 
                 with open(draft_meta_file, 'w', encoding='utf-8') as f:
-                    json.dump(draft_meta, f, ensure_ascii=False, indent=2)
+                    json_backend.dump(draft_meta, f, indent=2)
             drafts_folder = self.get_drafts_folder()
             if drafts_folder:
                 # 更新根目录的草稿列表文件
                 root_meta_file = os.path.join(drafts_folder, "root_meta_info.json")
                 if os.path.exists(root_meta_file):
                     with open(root_meta_file, 'r', encoding='utf-8') as f:
-                        root_meta = json.load(f)
+                        root_meta = json_backend.load(f)
 
                     # 创建新草稿的元数据
                     new_draft_meta = {
@@ -229,7 +297,7 @@ class DraftFolder:
                         # 写入临时文件
                         temp_file = root_meta_file + ".tmp"
                         with open(temp_file, 'w', encoding='utf-8') as f:
-                            json.dump(root_meta, f, ensure_ascii=False, indent=2)
+                            json_backend.dump(root_meta, f, indent=2)
 
                         # 备份原文件
                         backup_file = root_meta_file + ".bak"
@@ -246,6 +314,11 @@ class DraftFolder:
             raise Exception(f"更新草稿元数据失败: {str(e)}")
 
         # 打开草稿
+        if use_cache:
+            # 复制出的草稿文件与原草稿完全相同, 故可直接克隆缓存的原草稿
+            script_file = template_cache.load_template(os.path.join(template_path, "draft_content.json"))
+            script_file.save_path = os.path.join(new_draft_path, "draft_content.json")
+            return script_file
         return self.load_template(new_draft_name)
 
     def get_drafts_folder(self):
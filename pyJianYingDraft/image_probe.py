@@ -0,0 +1,170 @@
+"""直接解析文件头的图片快速探测, 支持PNG, JPEG, WebP, BMP及GIF
+
+仅读取确定尺寸(及GIF时长)所需的数据, 无法识别或结构异常的文件一律返回`None`, 由调用方回退到MediaInfo等完整的解析方式
+"""
+
+import struct
+
+from typing import Optional, Tuple
+
+PHOTO_DURATION = 10800000000
+"""图片素材的默认时长, 相当于3h"""
+
+_HEADER_SIZE = 64
+"""文件头的读取字节数, JPEG, PNG及GIF会在此之外按需继续读取"""
+
+def probe_image(path: str, *, allow_gif: bool = True) -> Optional[Tuple[str, int, int, int]]:
+    """根据文件头探测图片的类型、时长及尺寸
+
+    Args:
+        path (`str`): 图片文件路径
+        allow_gif (`bool`, optional): 是否将GIF文件作为动图("gif")处理, 为否时将其视为静态图片. 默认为是.
+
+    Returns:
+        `(material_type, duration, width, height)`, 其中`material_type`为"photo"或"gif"; 无法快速探测时返回`None`
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_HEADER_SIZE)
+            if head.startswith(b"GIF87a") or head.startswith(b"GIF89a"):
+                if not allow_gif:
+                    size = _gif_size(head)
+                    return None if size is None else ("photo", PHOTO_DURATION) + size
+                return _probe_gif(f, head)
+            if head.startswith(b"\xff\xd8"):
+                size = _jpeg_size(f)
+            elif head.startswith(b"\x89PNG\r\n\x1a\n"):
+                size = _png_size(f, head)
+            elif head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+                size = _webp_size(head)
+            elif head.startswith(b"BM"):
+                size = _bmp_size(head)
+            else:
+                return None
+    except (OSError, struct.error, IndexError):
+        return None
+
+    if size is None:
+        return None
+    return ("photo", PHOTO_DURATION) + size
+
+def _png_size(f, head: bytes) -> Optional[Tuple[int, int]]:
+    """读取IHDR中的尺寸, 并逐个跳过首个IDAT块之前的块, 以排除带acTL块的动态PNG"""
+    if head[12:16] != b"IHDR":
+        return None
+    size = struct.unpack(">II", head[16:24])
+    # acTL块可出现在IHDR与首个IDAT之间的任意位置, 其前面可能还有sRGB、gAMA、pHYs等块
+    f.seek(8)
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:  # 在IDAT之前遇到文件结束
+            return None
+        length, chunk_type = struct.unpack(">I4s", chunk)
+        if chunk_type == b"IDAT":
+            return size
+        if chunk_type == b"acTL":
+            return None
+        f.seek(length + 4, 1)  # 跳过数据及CRC
+
+def _jpeg_size(f) -> Optional[Tuple[int, int]]:
+    """逐个跳过JPEG段, 直到遇到记录尺寸的SOF段"""
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:  # 填充字节
+            code = f.read(1)[0]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7 or code == 0x01:  # 无长度字段的标记
+            continue
+        if code == 0xD9 or code == 0xDA:  # 在SOF之前遇到图像结束或扫描数据
+            return None
+        length = struct.unpack(">H", f.read(2))[0]
+        # SOF0-SOF15, 但排除DHT(C4), JPG(C8)及DAC(CC)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, 1)
+
+def _webp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    chunk = head[12:16]
+    if chunk == b"VP8 ":
+        if head[23:26] != b"\x9d\x01\x2a":
+            return None
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        if head[20] != 0x2F:
+            return None
+        bits = struct.unpack("<I", head[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        if head[20] & 0x02:  # 动态WebP
+            return None
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    return None
+
+def _bmp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    header_size = struct.unpack("<I", head[14:18])[0]
+    if header_size == 12:  # BITMAPCOREHEADER
+        return struct.unpack("<HH", head[18:22])
+    if header_size >= 40:  # BITMAPINFOHEADER及其扩展版本
+        width, height = struct.unpack("<ii", head[18:26])
+        return abs(width), abs(height)  # 高度为负表示自上而下存储
+    return None
+
+def _gif_size(data: bytes) -> Optional[Tuple[int, int]]:
+    return struct.unpack("<HH", data[6:10])
+
+def _probe_gif(f, head: bytes) -> Optional[Tuple[str, int, int, int]]:
+    """逐个跳过GIF的各个块, 统计帧数并读取首帧的延时, 只读取各块的头部而不读取图像数据
+
+    时长按`首帧延时 * 帧数`计算, 与通过imageio读取元数据的结果一致; 首帧没有延时信息的文件返回`None`
+    """
+    width, height, flags = struct.unpack("<HHB", head[6:11])
+    f.seek(13)
+    if flags & 0x80:  # 全局颜色表
+        f.seek(3 << ((flags & 0x07) + 1), 1)
+
+    frame_count = 0
+    first_delay: Optional[int] = None
+    pending_delay: Optional[int] = None
+    while True:
+        introducer = f.read(1)[0]
+        if introducer == 0x3B:  # 文件结束
+            break
+        if introducer == 0x21:  # 扩展块
+            label, size = struct.unpack("BB", f.read(2))
+            if label == 0xF9 and size == 4:  # 图形控制扩展, 延时单位为1/100秒
+                pending_delay = struct.unpack("<xHx", f.read(4))[0]
+            else:
+                f.seek(size, 1)
+            if size != 0:
+                _skip_sub_blocks(f)
+        elif introducer == 0x2C:  # 图像描述符
+            if frame_count == 0:
+                first_delay = pending_delay
+            frame_count += 1
+            pending_delay = None
+            local_flags = f.read(9)[8]
+            if local_flags & 0x80:  # 局部颜色表
+                f.seek(3 << ((local_flags & 0x07) + 1), 1)
+            f.seek(1, 1)  # LZW最小码长
+            _skip_sub_blocks(f)
+        else:
+            return None
+
+    if frame_count == 0 or not first_delay:
+        return None
+    return "gif", int(round(first_delay * 10 * frame_count * 1e3)), width, height
+
+def _skip_sub_blocks(f) -> None:
+    """跳过一系列以0长度块结尾的数据子块"""
+    while True:
+        size = f.read(1)[0]
+        if size == 0:
+            return
+        f.seek(size, 1)
@@ -0,0 +1,118 @@
+"""可替换的JSON编解码后端
+
+导入时若orjson可用则选择orjson, 否则使用标准库json, 也可通过`set_backend`手动指定(包括ujson).
+无论使用何种后端, 编码时均保持非ASCII字符原样输出(等价于`ensure_ascii=False`)且不改变键的顺序.
+自动选择的后端与标准库`json.dumps`的输出逐字节一致; ujson对浮点数的格式化可能与之不同, 因此不参与自动选择.
+"""
+
+import re
+import json
+
+from typing import Optional, Union, Callable
+from typing import Dict, Any, IO
+
+def _stdlib_loads(s: Union[str, bytes]) -> Any:
+    return json.loads(s)
+
+def _stdlib_dumps(obj: Any, indent: Optional[int]) -> str:
+    return json.dumps(obj, ensure_ascii=False, indent=indent, separators=(",", ":" if indent is None else ": "))
+
+_ORJSON_FLOAT_MISMATCH = re.compile(r"e-?\d+(?:[,\]}\n]|$)")
+"""匹配orjson以指数形式输出的数, 其格式(如`1e-7`)与标准库(`1e-07`)不同. 字符串中的类似内容也会被匹配, 此时仅多做一次回退"""
+
+def _orjson_loads(s: Union[str, bytes]) -> Any:
+    import orjson
+    return orjson.loads(s)
+
+def _orjson_dumps(obj: Any, indent: Optional[int]) -> str:
+    import orjson
+    try:
+        text = orjson.dumps(obj, option=0 if indent is None else orjson.OPT_INDENT_2).decode("utf-8")
+    except TypeError:  # 超出64位的整数、非字符串的键等orjson不支持的情况
+        return _stdlib_dumps(obj, indent)
+    # 标准库对绝对值小于1e-4的浮点数使用指数形式, orjson则在更大的范围内使用定点形式(如`0.00001`)
+    if "0.0000" in text or _ORJSON_FLOAT_MISMATCH.search(text):
+        return _stdlib_dumps(obj, indent)
+    if indent is None or indent == 2:
+        return text
+    # orjson只支持2空格缩进, 按层级换算为所需的缩进宽度. json字符串内的换行总是被转义, 故行首空格一定是缩进
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        depth = (len(line) - len(line.lstrip(" "))) // 2
+        if depth:
+            lines[i] = " " * (depth * indent) + line[depth * 2:]
+    return "\n".join(lines)
+
+def _ujson_loads(s: Union[str, bytes]) -> Any:
+    import ujson
+    try:
+        return ujson.loads(s)
+    except ValueError:  # 由标准库抛出带有位置信息的`json.JSONDecodeError`
+        return json.loads(s)
+
+def _ujson_dumps(obj: Any, indent: Optional[int]) -> str:
+    import ujson
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, indent=indent or 0)
+    except (TypeError, OverflowError):
+        return _stdlib_dumps(obj, indent)
+
+_BACKENDS: Dict[str, Dict[str, Callable[..., Any]]] = {
+    "orjson": {"loads": _orjson_loads, "dumps": _orjson_dumps},
+    "ujson": {"loads": _ujson_loads, "dumps": _ujson_dumps},
+    "json": {"loads": _stdlib_loads, "dumps": _stdlib_dumps},
+}
+
+_backend_name: str = "json"
+_loads: Callable[[Union[str, bytes]], Any] = _stdlib_loads
+_dumps: Callable[[Any, Optional[int]], str] = _stdlib_dumps
+
+def set_backend(name: str) -> None:
+    """指定使用的JSON后端
+
+    Args:
+        name (`str`): 后端名称, 可选"orjson", "ujson"或"json"(标准库)
+
+    Raises:
+        `ValueError`: 未知的后端名称
+        `ImportError`: 相应的库未安装
+    """
+    global _backend_name, _loads, _dumps
+    if name not in _BACKENDS:
+        raise ValueError(f"未知的JSON后端 '{name}', 可选值为 {list(_BACKENDS.keys())}")
+    if name != "json":
+        __import__(name)
+
+    _backend_name = name
+    _loads = _BACKENDS[name]["loads"]
+    _dumps = _BACKENDS[name]["dumps"]
+
+def get_backend() -> str:
+    """返回当前使用的JSON后端名称"""
+    return _backend_name
+
+def loads(s: Union[str, bytes]) -> Any:
+    """解析JSON字符串"""
+    return _loads(s)
+
+def load(fp: IO[Any]) -> Any:
+    """从文件对象中读取并解析JSON数据"""
+    return _loads(fp.read())
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """将对象编码为JSON字符串, 非ASCII字符原样输出, 键的顺序保持不变
+
+    Args:
+        obj (`Any`): 要编码的对象
+        indent (`int`, optional): 缩进空格数. 为`None`时输出不含任何空白的紧凑格式, 这也是默认值.
+    """
+    return _dumps(obj, indent)
+
+def dump(obj: Any, fp: IO[str], indent: Optional[int] = None) -> None:
+    """将对象编码为JSON字符串并写入文件对象, 参数含义同`dumps`"""
+    fp.write(_dumps(obj, indent))
+
+try:
+    set_backend("orjson")
+except ImportError:
+    pass
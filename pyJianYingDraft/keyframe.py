@@ -1,11 +1,13 @@
-import uuid
-
 from enum import Enum
-from typing import Dict, List, Any
+from typing import Dict, List, Sequence, Any
+
+from .id_generator import generate_id
 
 class Keyframe:
     """一个关键帧（关键点）, 目前只支持线性插值"""
 
+    __slots__ = ("kf_id", "time_offset", "values")
+
     kf_id: str
     """关键帧全局id, 自动生成"""
     time_offset: int
@@ -15,7 +17,7 @@ class Keyframe:
 
     def __init__(self, time_offset: int, value: float):
         """给定时间偏移量及关键值, 初始化关键帧"""
-        self.kf_id = uuid.uuid4().hex
+        self.kf_id = generate_id()
 
         self.time_offset = time_offset
         self.values = [value]
@@ -65,6 +67,8 @@ class KeyframeProperty(Enum):
 class KeyframeList:
     """关键帧列表, 记录与某个特定属性相关的一系列关键帧"""
 
+    __slots__ = ("list_id", "keyframe_property", "keyframes")
+
     list_id: str
     """关键帧列表全局id, 自动生成"""
     keyframe_property: KeyframeProperty
@@ -74,16 +78,68 @@ class KeyframeList:
 
     def __init__(self, keyframe_property: KeyframeProperty):
         """为给定的关键帧属性初始化关键帧列表"""
-        self.list_id = uuid.uuid4().hex
+        self.list_id = generate_id()
 
         self.keyframe_property = keyframe_property
         self.keyframes = []
 
     def add_keyframe(self, time_offset: int, value: float):
-        """给定时间偏移量及关键值, 向此关键帧列表中添加一个关键帧"""
+        """给定时间偏移量及关键值, 向此关键帧列表中添加一个关键帧
+
+        与已有关键帧的时间偏移量相同时, 新关键帧排在其后
+        """
         keyframe = Keyframe(time_offset, value)
-        self.keyframes.append(keyframe)
-        self.keyframes.sort(key=lambda x: x.time_offset)
+        keyframes = self.keyframes
+        if not keyframes or keyframes[-1].time_offset <= time_offset:  # 按时间顺序添加时无需查找
+            keyframes.append(keyframe)
+            return
+
+        # 二分查找插入位置, 相当于按time_offset进行的bisect_right
+        lo, hi = 0, len(keyframes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if time_offset < keyframes[mid].time_offset:
+                hi = mid
+            else:
+                lo = mid + 1
+        keyframes.insert(lo, keyframe)
+
+    def add_keyframes(self, time_offsets: Sequence[int], values: Sequence[float]):
+        """批量添加关键帧, 结果与按顺序逐个调用`add_keyframe`相同
+
+        Args:
+            time_offsets (`Sequence[int]`): 各关键帧的时间偏移量, 也可以是NumPy数组
+            values (`Sequence[float]`): 各关键帧的值, 也可以是NumPy数组
+
+        Raises:
+            `ValueError`: `time_offsets`与`values`的长度不一致
+        """
+        time_offsets, values = _as_list(time_offsets), _as_list(values)
+        if len(time_offsets) != len(values):
+            raise ValueError(f"时间偏移量的数量({len(time_offsets)})与关键值的数量({len(values)})不一致")
+
+        new_keyframes = [Keyframe(time_offset, value) for time_offset, value in zip(time_offsets, values)]
+        if not new_keyframes:
+            return
+        was_sorted = all(time_offsets[i] <= time_offsets[i + 1] for i in range(len(time_offsets) - 1))
+        if was_sorted and (not self.keyframes or self.keyframes[-1].time_offset <= time_offsets[0]):
+            self.keyframes.extend(new_keyframes)
+        else:
+            # 稳定排序保证时间偏移量相同的关键帧维持添加的先后顺序
+            self.keyframes.extend(new_keyframes)
+            self.keyframes.sort(key=lambda x: x.time_offset)
+
+    def evaluate(self, time_offsets: Sequence[int]) -> Any:
+        """按线性插值计算此关键帧列表在给定时间偏移量处的取值, 详见`keyframe_curve.KeyframeEvaluator`
+
+        Args:
+            time_offsets (`Sequence[int]`): 相对于片段起点的时间偏移量, 单位为微秒, 可以是NumPy数组
+
+        Returns:
+            `numpy.ndarray`: 与`time_offsets`同形的float64数组, 列表为空时全为NaN
+        """
+        from .keyframe_curve import KeyframeEvaluator
+        return KeyframeEvaluator([self]).evaluate(time_offsets)
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -92,3 +148,11 @@ class KeyframeList:
             "material_id": "",
             "property_type": self.keyframe_property.value
         }
+
+def _as_list(values: Sequence[Any]) -> List[Any]:
+    """将序列转换为列表, NumPy数组等带有`tolist`方法的对象会被转换为由Python原生数值构成的列表"""
+    if isinstance(values, list):
+        return values
+    if hasattr(values, "tolist"):
+        return values.tolist()  # type: ignore
+    return list(values)
@@ -0,0 +1,265 @@
+"""由连续曲线生成关键帧, 以及批量计算关键帧取值的辅助工具
+
+可对缓动曲线、音频包络、跟踪数据等逐帧采样, 再在给定的误差范围内精简为尽可能少的线性插值关键帧;
+也可按与导出的"Line"曲线相同的线性插值方式, 向量化地计算大量关键帧列表在任意时刻的取值.
+计算依赖NumPy(随imageio一同安装), 仅在调用时导入.
+"""
+
+from typing import Optional, Union, Callable
+from typing import List, Sequence, Any
+
+from .time_util import tim, SEC
+from .segment import BaseSegment
+from .keyframe import KeyframeList, KeyframeProperty, _as_list
+
+class SampledKeyframes:
+    """`sample_curve`的返回结果, 即精简后的一系列关键帧"""
+
+    time_offsets: List[int]
+    """各关键帧的时间偏移量, 单位为微秒"""
+    values: List[float]
+    """各关键帧的值"""
+    max_error: float
+    """在所有采样点上, 关键帧线性插值结果与采样值之差的最大绝对值"""
+    sample_count: int
+    """采样点数量"""
+
+    def __init__(self, time_offsets: List[int], values: List[float], max_error: float, sample_count: int):
+        self.time_offsets = time_offsets
+        self.values = values
+        self.max_error = max_error
+        self.sample_count = sample_count
+
+    def __len__(self) -> int:
+        return len(self.time_offsets)
+
+    def to_keyframe_list(self, keyframe_property: KeyframeProperty) -> KeyframeList:
+        """以这些关键帧构造一个控制给定属性的关键帧列表"""
+        kf_list = KeyframeList(keyframe_property)
+        kf_list.add_keyframes(self.time_offsets, self.values)
+        return kf_list
+
+    def __repr__(self) -> str:
+        return f"SampledKeyframes({len(self)} keyframes from {self.sample_count} samples, max_error={self.max_error:.6g})"
+
+def frame_times(duration: Union[str, int], fps: float = 30.0, start: Union[str, int] = 0) -> List[int]:
+    """生成从`start`开始、时长为`duration`的范围内逐帧的时间偏移量, 总是包含范围的终点
+
+    Args:
+        duration (`str` or `int`): 时长, 单位为微秒, 也可传入字符串由`tim()`解析
+        fps (`float`, optional): 帧率, 默认为30
+        start (`str` or `int`, optional): 起始时间偏移量, 默认为0
+
+    Raises:
+        `ValueError`: `duration`为负或`fps`不为正
+    """
+    duration, start = tim(duration), tim(start)
+    if duration < 0 or fps <= 0:
+        raise ValueError("duration不能为负且fps必须为正")
+    frame_count = int(duration * fps // SEC)
+    times = [start + round(i * SEC / fps) for i in range(frame_count + 1)]
+    if times[-1] != start + duration:
+        times.append(start + duration)
+    return times
+
+def sample_curve(curve: Union[Callable[[Any], Any], Sequence[float]], time_offsets: Sequence[int], *,
+                 tolerance: float = 1e-3) -> SampledKeyframes:
+    """对曲线进行采样, 并以Ramer-Douglas-Peucker算法将采样点精简为在误差范围内的少量关键帧
+
+    误差按剪映的线性插值方式计算, 即采样点处的值与相邻两个保留关键帧之间线性插值结果之差的绝对值.
+    首尾两个采样点总是保留.
+
+    Args:
+        curve (`Callable` or `Sequence[float]`): 曲线函数或采样值序列(可以是NumPy数组).
+            若为函数, 则首先以所有采样时刻(单位为微秒的NumPy数组)为参数调用一次, 当函数不支持数组输入时改为逐点调用.
+        time_offsets (`Sequence[int]`): 严格递增的采样时刻, 单位为微秒, 可以是NumPy数组, 可由`frame_times`生成
+        tolerance (`float`, optional): 允许的最大误差, 单位与属性值相同, 默认为0.001. 为0时仅去除(在浮点误差范围内)共线的采样点.
+
+    Returns:
+        `SampledKeyframes`: 精简后的关键帧及实际达到的最大误差
+
+    Raises:
+        `ValueError`: 采样时刻不是严格递增的, 采样值的数量与采样时刻不一致, 或采样值中含有NaN或无穷大
+    """
+    import numpy as np
+
+    times = np.rint(np.asarray(time_offsets, dtype=np.float64)).astype(np.int64)
+    if times.ndim != 1 or len(times) == 0:
+        raise ValueError("采样时刻应为非空的一维序列")
+    if np.any(np.diff(times) <= 0):
+        raise ValueError("采样时刻必须严格递增")
+
+    values = _evaluate_curve(curve, times)
+    if values.shape != times.shape:
+        raise ValueError(f"采样值的数量({values.size})与采样时刻的数量({len(times)})不一致")
+    if not np.all(np.isfinite(values)):
+        raise ValueError("采样值中含有NaN或无穷大")
+
+    # 放宽数个ulp, 以免浮点舍入误差使共线的采样点被保留
+    rounding_slack = 16 * np.finfo(np.float64).eps * max(1.0, float(np.max(np.abs(values))))
+    keep = _rdp_indices(times.astype(np.float64), values, max(tolerance, 0.0) + rounding_slack)
+    kept_times, kept_values = times[keep], values[keep]
+    max_error = float(np.max(np.abs(np.interp(times, kept_times, kept_values) - values)))
+    return SampledKeyframes(kept_times.tolist(), kept_values.tolist(), max_error, len(times))
+
+def _evaluate_curve(curve: Union[Callable[[Any], Any], Sequence[float]], times: Any) -> Any:
+    """计算曲线在各采样时刻的值, 返回float64类型的NumPy数组"""
+    import numpy as np
+
+    if not callable(curve):
+        return np.asarray(curve, dtype=np.float64).reshape(-1)
+
+    try:
+        values = np.asarray(curve(times.astype(np.float64)), dtype=np.float64)
+        if values.shape == times.shape:
+            return values
+    except (TypeError, ValueError):  # 函数仅支持标量输入
+        pass
+    return np.fromiter((curve(t) for t in times.tolist()), dtype=np.float64, count=len(times))
+
+def _rdp_indices(x: Any, y: Any, tolerance: float) -> Any:
+    """返回Ramer-Douglas-Peucker算法保留的采样点下标(升序), 误差为竖直方向的插值误差"""
+    import numpy as np
+
+    n = len(x)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        inner_x = x[first + 1:last]
+        slope = (y[last] - y[first]) / (x[last] - x[first])
+        errors = np.abs(y[first + 1:last] - (y[first] + slope * (inner_x - x[first])))
+        split = int(np.argmax(errors))
+        if errors[split] > tolerance:
+            split += first + 1
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+class KeyframeEvaluator:
+    """将一组关键帧列表打包为NumPy数组, 以向量化的方式批量计算其在任意时刻的取值
+
+    取值按剪映的线性插值("Line")方式计算: 第一个关键帧之前保持首个关键帧的值, 最后一个关键帧之后保持末个关键帧的值;
+    若有多个关键帧的时间偏移量相同, 则自该时刻起取其中最后一个的值.
+    没有任何关键帧的列表取值为NaN.
+    """
+
+    list_count: int
+    """关键帧列表的数量"""
+
+    _keys: Any
+    """(列表序号, 时间偏移量)编码得到的int64键, 各列表依次排列且各自有序"""
+    _times: Any
+    _values: Any
+    _bounds: Any
+    """各列表在`_keys`中的起止下标, 形状为(list_count + 1,)"""
+    _time_base: int
+    _time_span: int
+    _offsets: Any
+    """各列表的时间基准, 查询时刻减去此值后得到相对于列表的时间偏移量"""
+
+    def __init__(self, kf_lists: Sequence[Optional[KeyframeList]], segment_starts: Optional[Sequence[int]] = None):
+        """打包给定的关键帧列表
+
+        Args:
+            kf_lists (`Sequence[KeyframeList]`): 关键帧列表, 元素为`None`时视为没有关键帧
+            segment_starts (`Sequence[int]`, optional): 各列表所属片段在轨道上的起始时间. 若指定, 则查询时刻视为轨道上的绝对时间,
+                否则视为相对于片段起点的时间偏移量(即关键帧的`time_offset`)
+
+        Raises:
+            `ValueError`: `segment_starts`与`kf_lists`的长度不一致
+        """
+        import numpy as np
+
+        self.list_count = len(kf_lists)
+        if segment_starts is not None and len(segment_starts) != self.list_count:
+            raise ValueError(f"segment_starts的长度({len(segment_starts)})与关键帧列表的数量({self.list_count})不一致")
+
+        lengths = np.fromiter((len(kf_list.keyframes) if kf_list is not None else 0 for kf_list in kf_lists),
+                              dtype=np.int64, count=self.list_count)
+        self._bounds = np.concatenate(([0], np.cumsum(lengths)))
+        keyframes = [kf for kf_list in kf_lists if kf_list is not None for kf in kf_list.keyframes]
+        self._times = np.fromiter((kf.time_offset for kf in keyframes), dtype=np.int64, count=len(keyframes))
+        self._values = np.fromiter((kf.values[0] for kf in keyframes), dtype=np.float64, count=len(keyframes))
+        self._offsets = np.zeros(self.list_count, dtype=np.int64) if segment_starts is None \
+            else np.asarray(_as_list(segment_starts), dtype=np.int64)
+
+        # 将(列表序号, 时间)编码为单个有序的键, 以便对所有列表统一进行searchsorted
+        self._time_base = int(self._times.min()) if len(keyframes) else 0
+        self._time_span = int(self._times.max()) - self._time_base + 1 if len(keyframes) else 1
+        list_index = np.repeat(np.arange(self.list_count, dtype=np.int64), lengths)
+        self._keys = list_index * self._time_span + (self._times - self._time_base)
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[BaseSegment], keyframe_property: KeyframeProperty) -> "KeyframeEvaluator":
+        """为一组片段的指定属性构造求值器, 查询时刻为轨道上的绝对时间
+
+        Args:
+            segments (`Sequence[BaseSegment]`): 片段列表, 未设置该属性关键帧的片段取值为NaN
+            keyframe_property (`KeyframeProperty`): 要计算的属性
+        """
+        kf_lists: List[Optional[KeyframeList]] = []
+        for segment in segments:
+            kf_lists.append(next((kf_list for kf_list in segment.common_keyframes
+                                  if kf_list.keyframe_property == keyframe_property), None))
+        return cls(kf_lists, [segment.start for segment in segments])
+
+    def evaluate(self, times: Union[int, Sequence[int]], list_indices: Optional[Union[int, Sequence[int]]] = None) -> Any:
+        """计算关键帧列表在给定时刻的取值
+
+        Args:
+            times (`int` or `Sequence[int]`): 查询时刻, 单位为微秒, 可以是NumPy数组
+            list_indices (`int` or `Sequence[int]`, optional): 各查询时刻对应的列表序号, 须可与`times`广播.
+                默认对每个列表都计算所有时刻, 此时返回形状为`(list_count, len(times))`的数组; 若只有一个列表, 则返回与`times`同形的数组.
+
+        Returns:
+            `numpy.ndarray`: float64类型的取值
+        """
+        import numpy as np
+
+        query_times = np.asarray(times, dtype=np.int64)
+        if list_indices is None:
+            if self.list_count == 1:
+                list_indices = 0
+            else:
+                lists = np.arange(self.list_count, dtype=np.int64).reshape((-1,) + (1,) * query_times.ndim)
+                query_times, lists = np.broadcast_arrays(query_times, lists)
+                return self.__evaluate(query_times, lists)
+        query_times, lists = np.broadcast_arrays(query_times, np.asarray(list_indices, dtype=np.int64))
+        return self.__evaluate(query_times, lists)
+
+    def __evaluate(self, query_times: Any, lists: Any) -> Any:
+        import numpy as np
+
+        if np.any((lists < 0) | (lists >= self.list_count)):
+            raise IndexError("列表序号超出范围")
+        shape = query_times.shape
+        query_times, lists = query_times.reshape(-1), lists.reshape(-1)
+        result = np.full(query_times.shape, np.nan)
+
+        first, last = self._bounds[lists], self._bounds[lists + 1] - 1
+        valid = last >= first
+        query_times, lists, first, last = query_times[valid], lists[valid], first[valid], last[valid]
+        local_times = query_times - self._offsets[lists]
+
+        # 将查询时刻限制在列表的时间范围内再编码, 以免查找到相邻的列表中
+        clamped = np.clip(local_times, self._times[first], self._times[last])
+        keys = lists * self._time_span + (clamped - self._time_base)
+        hi = np.searchsorted(self._keys, keys, side="right")
+        hi = np.clip(hi, first + 1, last)
+        lo = hi - 1
+
+        x0, x1 = self._times[lo], self._times[hi]
+        y0, y1 = self._values[lo], self._values[hi]
+        dx = x1 - x0
+        weight = np.where(dx > 0, (clamped - x0) / np.where(dx > 0, dx, 1), 1.0)
+        values = y0 + np.clip(weight, 0.0, 1.0) * (y1 - y0)
+
+        before = (local_times < self._times[first]) | (first == last)  # 首个关键帧之前, 或只有一个关键帧的列表
+        values[before] = self._values[first[before]]
+        result[valid] = values
+        return result.reshape(shape)
@@ -1,12 +1,22 @@
 import os
-import uuid
 import pymediainfo
 
-from typing import Optional, Literal
-from typing import Dict, Any
+from copy import copy
+
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from typing import Optional, Literal, Union, Callable
+from typing import Dict, List, Sequence, Any
+
+from .id_generator import generate_id
+from .image_probe import probe_image, PHOTO_DURATION
+from .probe_cache import ProbeResult, ProbeKind, get_probe_cache, enable_probe_cache
 
 class CropSettings:
-    """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角"""
+    """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角
+
+    裁剪设置创建后即不可修改, 因为它可能被多个片段通过同一素材共享; 如需不同的裁剪设置请创建新的实例
+    """
 
     upper_left_x: float
     upper_left_y: float
@@ -17,6 +27,8 @@ class CropSettings:
     lower_right_x: float
     lower_right_y: float
 
+    _frozen: bool = False
+
     def __init__(self, *, upper_left_x: float = 0.0, upper_left_y: float = 0.0,
                  upper_right_x: float = 1.0, upper_right_y: float = 0.0,
                  lower_left_x: float = 0.0, lower_left_y: float = 1.0,
@@ -30,6 +42,12 @@ class CropSettings:
         self.lower_left_y = lower_left_y
         self.lower_right_x = lower_right_x
         self.lower_right_y = lower_right_y
+        self._frozen = True
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise AttributeError(f"CropSettings是只读的, 无法修改属性 '{name}', 请创建新的实例")
+        super().__setattr__(name, value)
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -43,8 +61,33 @@ class CropSettings:
             "lower_right_y": self.lower_right_y
         }
 
-class VideoMaterial:
-    """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用"""
+class SharedMaterial:
+    """可被多个片段共享的素材的基类
+
+    素材在用于创建片段时被冻结, 此后修改其属性会引发`AttributeError`, 以免影响共享此素材的其它片段
+    """
+
+    _frozen: bool = False
+
+    @property
+    def frozen(self) -> bool:
+        """素材是否已被冻结"""
+        return self._frozen
+
+    def freeze(self) -> None:
+        """冻结素材, 此后不能再修改其属性. 由片段在创建时自动调用"""
+        object.__setattr__(self, "_frozen", True)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise AttributeError(f"素材 '{self.material_name}' 已被片段使用, 无法修改属性 '{name}'")  # type: ignore
+        super().__setattr__(name, value)
+
+class VideoMaterial(SharedMaterial):
+    """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用
+
+    使用同一素材的各片段共享同一个素材实例, 因此素材在用于创建片段后即被冻结, 不能再修改; 如需不同的裁剪设置, 请使用`with_crop_settings`
+    """
 
     material_id: str
     """素材全局id, 自动生成"""
@@ -65,7 +108,7 @@ class VideoMaterial:
     material_type: Literal["video", "photo"]
     """素材类型: 视频或图片"""
 
-    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: CropSettings = CropSettings()):
+    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: Optional[CropSettings] = None):
         """从指定位置加载视频（或图片）素材
 
         Args:
@@ -78,80 +121,33 @@ class VideoMaterial:
             `ValueError`: 不支持的素材文件类型.
         """
         path = os.path.abspath(path)
-        postfix = os.path.splitext(path)[1]
         if not os.path.exists(path):
             raise FileNotFoundError(f"找不到 {path}")
 
         self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid4().hex
+        self.material_id = generate_id()
         self.path = path
-        self.crop_settings = crop_settings
+        self.crop_settings = crop_settings if crop_settings is not None else CropSettings()
         self.local_material_id = ""
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError(f"不支持的视频素材类型 '{postfix}'")
-
-        info: pymediainfo.MediaInfo = \
-            pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
-        # 有视频轨道的视为视频素材
-        if len(info.video_tracks):
-            self.material_type = "video"
-            # Handle case where duration might be a list or tuple
-            duration_value = info.video_tracks[0].duration
-            if isinstance(duration_value, (list, tuple)):
-                # If it's a list or tuple, take the first element
-                duration_value = duration_value[0] if duration_value else 0
-            # Convert to float if it's a string
-            if isinstance(duration_value, str):
-                try:
-                    duration_value = float(duration_value)
-                except (ValueError, TypeError):
-                    duration_value = 0
-            self.duration = int(float(duration_value) * 1e3)  # type: ignore
-            # Handle width and height which might also be strings or lists/tuples
-            width_value = info.video_tracks[0].width
-            height_value = info.video_tracks[0].height
-            
-            if isinstance(width_value, (list, tuple)):
-                width_value = width_value[0] if width_value else 0
-            if isinstance(width_value, str):
-                try:
-                    width_value = int(width_value)
-                except (ValueError, TypeError):
-                    width_value = 0
-            
-            if isinstance(height_value, (list, tuple)):
-                height_value = height_value[0] if height_value else 0
-            if isinstance(height_value, str):
-                try:
-                    height_value = int(height_value)
-                except (ValueError, TypeError):
-                    height_value = 0
-            
-            self.width, self.height = int(width_value), int(height_value)
-        # gif文件使用imageio库获取长度
-        elif postfix.lower() == ".gif":
-            import imageio
-            gif = imageio.get_reader(path)
+        probe_result = _probe_with_cache(path, "video", lambda: _probe_video(path))
+        self.material_type = probe_result.material_type  # type: ignore
+        self.duration = probe_result.duration
+        self.width, self.height = probe_result.width, probe_result.height
 
-            self.material_type = "gif"
-            try:
-                # 尝试从元数据获取duration
-                meta_data = gif.get_meta_data()
-                duration_per_frame = meta_data.get('duration', 0.1)  # 默认100ms每帧
-                self.duration = int(round(duration_per_frame * gif.get_length() * 1e3))
-                
-            except (KeyError, AttributeError):
-                # 如果获取失败，使用默认值：假设每帧100ms
-                self.duration = int(round(0.1 * gif.get_length() * 1e3))
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-            gif.close()
-        elif len(info.image_tracks):
-            self.material_type = "photo"
-            self.duration = 10800000000  # 相当于3h
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-        else:
-            raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+    def with_crop_settings(self, crop_settings: CropSettings) -> "VideoMaterial":
+        """创建一个使用给定裁剪设置的素材副本, 副本具有新的素材id且未被冻结, 原素材不受影响
+
+        副本与原素材共享探测得到的时长、尺寸等信息, 不会重新读取素材文件
+
+        Args:
+            crop_settings (`CropSettings`): 副本的裁剪设置
+        """
+        material = copy(self)
+        object.__setattr__(material, "_frozen", False)
+        material.material_id = generate_id()
+        material.crop_settings = crop_settings
+        return material
 
     def export_json(self) -> Dict[str, Any]:
         video_material_json = {
@@ -175,8 +171,8 @@ class VideoMaterial:
         }
         return video_material_json
 
-class AudioMaterial:
-    """本地音频素材"""
+class AudioMaterial(SharedMaterial):
+    """本地音频素材, 一份素材可以在多个片段中使用, 用于创建片段后即被冻结"""
 
     material_id: str
     """素材全局id, 自动生成"""
@@ -204,27 +200,10 @@ class AudioMaterial:
             raise FileNotFoundError(f"找不到 {path}")
 
         self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid4().hex
+        self.material_id = generate_id()
         self.path = path
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
-        info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
-        if len(info.video_tracks):
-            raise ValueError("音频素材不应包含视频轨道")
-        if not len(info.audio_tracks):
-            raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
-        # Handle case where duration might be a list or tuple
-        duration_value = info.audio_tracks[0].duration
-        if isinstance(duration_value, (list, tuple)):
-            duration_value = duration_value[0] if duration_value else 0
-        # Convert to float if it's a string
-        if isinstance(duration_value, str):
-            try:
-                duration_value = float(duration_value)
-            except (ValueError, TypeError):
-                duration_value = 0
-        self.duration = int(float(duration_value) * 1e3)  # type: ignore
+        self.duration = _probe_with_cache(path, "audio", lambda: _probe_audio(path)).duration
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -245,3 +224,201 @@ class AudioMaterial:
             "type": "extract_music",
             "wave_points": []
         }
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".aac", ".m4a", ".flac", ".ogg", ".opus", ".wma", ".aiff", ".ape"}
+"""`load_materials`在自动模式下视为音频素材的文件扩展名"""
+
+class LoadMaterialsResult:
+    """`load_materials`的返回结果"""
+
+    materials: List[Optional[Union[VideoMaterial, AudioMaterial]]]
+    """与输入路径一一对应的素材, 加载失败的位置为`None`"""
+    errors: Dict[int, Exception]
+    """加载失败的路径下标及相应的异常"""
+
+    def __init__(self, materials: List[Optional[Union[VideoMaterial, AudioMaterial]]], errors: Dict[int, Exception]):
+        self.materials = materials
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        """是否所有素材均加载成功"""
+        return len(self.errors) == 0
+
+def load_materials(paths: Sequence[str], workers: Optional[int] = None, *,
+                   material_type: Literal["auto", "video", "audio"] = "auto",
+                   use_threads: bool = False) -> LoadMaterialsResult:
+    """并发地加载一批本地素材, 单个文件加载失败不会影响其它文件
+
+    Args:
+        paths (`Sequence[str]`): 素材文件路径列表
+        workers (`int`, optional): 并发数, 默认由`concurrent.futures`根据CPU核数决定.
+        material_type (`str`, optional): 素材类型, "video"及"audio"分别表示全部作为视频(图片)或音频素材加载,
+            默认的"auto"根据扩展名判断, 扩展名在`AUDIO_EXTENSIONS`中的文件作为音频素材, 其余作为视频素材.
+        use_threads (`bool`, optional): 是否使用线程池而非进程池. 默认为否, 因为MediaInfo库并发解析时可能死锁或崩溃,
+            仅当确认所用的MediaInfo库是线程安全的时才应开启.
+
+    注意: 使用进程池时, 在Windows等以spawn方式创建子进程的平台上, 调用方脚本的主体代码须置于`if __name__ == "__main__":`之下.
+
+    Returns:
+        `LoadMaterialsResult`: 按输入顺序排列的素材及各文件的加载错误
+    """
+    materials: List[Optional[Union[VideoMaterial, AudioMaterial]]] = [None] * len(paths)
+    errors: Dict[int, Exception] = {}
+    if len(paths) == 0:
+        return LoadMaterialsResult(materials, errors)
+
+    if use_threads:
+        executor: Executor = ThreadPoolExecutor(workers)
+    else:
+        cache = get_probe_cache()
+        cache_dir = os.path.dirname(cache.db_path) if cache is not None else None
+        executor = ProcessPoolExecutor(workers, initializer=_init_load_worker, initargs=(cache_dir,))
+    with executor:
+        futures = {executor.submit(_load_material, path, material_type): ind for ind, path in enumerate(paths)}
+        for future in as_completed(futures):
+            ind = futures[future]
+            try:
+                materials[ind] = future.result()
+            except Exception as e:
+                errors[ind] = e
+
+    # 工作进程中生成的id可能与主进程重复(如deterministic模式下), 且顺序依赖于调度, 故按输入顺序重新分配
+    for material in materials:
+        if material is not None:
+            material.material_id = generate_id()
+
+    return LoadMaterialsResult(materials, errors)
+
+def _load_material(path: str, material_type: Literal["auto", "video", "audio"]) -> Union[VideoMaterial, AudioMaterial]:
+    if material_type == "audio" or \
+            (material_type == "auto" and os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS):
+        return AudioMaterial(path)
+    return VideoMaterial(path)
+
+def _init_load_worker(cache_dir: Optional[str]) -> None:
+    """进程池工作进程的初始化函数, 沿用主进程的探测缓存设置"""
+    if cache_dir is not None:
+        enable_probe_cache(cache_dir)
+
+def _probe_with_cache(path: str, kind: ProbeKind, probe: Callable[[], ProbeResult]) -> ProbeResult:
+    """若启用了探测缓存则优先从中读取结果, 否则调用`probe`进行探测并写入缓存"""
+    cache = get_probe_cache()
+    if cache is None:
+        return probe()
+    # 在探测之前获取文件状态, 以免探测期间文件被修改时将旧的结果与新的状态一同写入
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return probe()
+    result = cache.get(path, kind, stat)
+    if result is None:
+        result = probe()
+        cache.put(path, kind, result, stat)
+    return result
+
+def _probe_video(path: str) -> ProbeResult:
+    """使用MediaInfo探测视频或图片素材的类型、时长及尺寸
+
+    Raises:
+        `ValueError`: 不支持的素材文件类型.
+    """
+    postfix = os.path.splitext(path)[1]
+    # 常见图片格式直接解析文件头即可
+    image_info = probe_image(path, allow_gif=(postfix.lower() == ".gif"))
+    if image_info is not None:
+        material_type, duration, width, height = image_info
+        return ProbeResult(material_type=material_type, duration=duration, width=width, height=height)
+
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError(f"不支持的视频素材类型 '{postfix}'")
+
+    info: pymediainfo.MediaInfo = \
+        pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
+    # 有视频轨道的视为视频素材
+    if len(info.video_tracks):
+        material_type = "video"
+        # Handle case where duration might be a list or tuple
+        duration_value = info.video_tracks[0].duration
+        if isinstance(duration_value, (list, tuple)):
+            # If it's a list or tuple, take the first element
+            duration_value = duration_value[0] if duration_value else 0
+        # Convert to float if it's a string
+        if isinstance(duration_value, str):
+            try:
+                duration_value = float(duration_value)
+            except (ValueError, TypeError):
+                duration_value = 0
+        duration = int(float(duration_value) * 1e3)  # type: ignore
+        # Handle width and height which might also be strings or lists/tuples
+        width_value = info.video_tracks[0].width
+        height_value = info.video_tracks[0].height
+        
+        if isinstance(width_value, (list, tuple)):
+            width_value = width_value[0] if width_value else 0
+        if isinstance(width_value, str):
+            try:
+                width_value = int(width_value)
+            except (ValueError, TypeError):
+                width_value = 0
+        
+        if isinstance(height_value, (list, tuple)):
+            height_value = height_value[0] if height_value else 0
+        if isinstance(height_value, str):
+            try:
+                height_value = int(height_value)
+            except (ValueError, TypeError):
+                height_value = 0
+        
+        width, height = int(width_value), int(height_value)
+    # gif文件使用imageio库获取长度
+    elif postfix.lower() == ".gif":
+        import imageio
+        gif = imageio.get_reader(path)
+
+        material_type = "gif"
+        try:
+            # 尝试从元数据获取duration
+            meta_data = gif.get_meta_data()
+            duration_per_frame = meta_data.get('duration', 0.1)  # 默认100ms每帧
+            duration = int(round(duration_per_frame * gif.get_length() * 1e3))
+            
+        except (KeyError, AttributeError):
+            # 如果获取失败，使用默认值：假设每帧100ms
+            duration = int(round(0.1 * gif.get_length() * 1e3))
+        width, height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
+        gif.close()
+    elif len(info.image_tracks):
+        material_type = "photo"
+        duration = PHOTO_DURATION
+        width, height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
+    else:
+        raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+
+    return ProbeResult(material_type=material_type, duration=duration, width=width, height=height)
+
+def _probe_audio(path: str) -> ProbeResult:
+    """使用MediaInfo探测音频素材的时长
+
+    Raises:
+        `ValueError`: 不支持的素材文件类型.
+    """
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
+    info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
+    if len(info.video_tracks):
+        raise ValueError("音频素材不应包含视频轨道")
+    if not len(info.audio_tracks):
+        raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
+    # Handle case where duration might be a list or tuple
+    duration_value = info.audio_tracks[0].duration
+    if isinstance(duration_value, (list, tuple)):
+        duration_value = duration_value[0] if duration_value else 0
+    # Convert to float if it's a string
+    if isinstance(duration_value, str):
+        try:
+            duration_value = float(duration_value)
+        except (ValueError, TypeError):
+            duration_value = 0
+    duration = int(float(duration_value) * 1e3)  # type: ignore
+    return ProbeResult(material_type="audio", duration=duration, width=0, height=0)
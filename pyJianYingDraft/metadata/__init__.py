@@ -3,33 +3,69 @@
 音频相关元数据更新时间：2024
 其余元数据更新时间：2026-03
 """
+import importlib
+
+from typing import TYPE_CHECKING, List, Any
+
 from .effect_meta import EffectMeta, EffectParamInstance
-from .effect_meta import AnimationMeta
-
-# 视频特效
-from .video_scene_effect import VideoSceneEffectType
-from .video_character_effect import VideoCharacterEffectType
-
-# 视频动画
-from .video_intro import IntroType
-from .video_outro import OutroType
-from .video_group_animation import GroupAnimationType
-# 音频特效
-from .audio_scene_effect import AudioSceneEffectType
-from .tone_effect import ToneEffectType
-from .speech_to_song import SpeechToSongType
-
-# 文本动画
-from .text_intro import TextIntro
-from .text_outro import TextOutro
-from .text_loop import TextLoopAnim
-
-# 其它
-from .font_meta import FontType
-from .mask_meta import MaskType, MaskMeta
-from .filter_meta import FilterType
-from .transition_meta import TransitionType
-from .mix_mode_meta import MixModeType
+from .effect_meta import AnimationMeta, MaskMeta
+
+if TYPE_CHECKING:
+    # 视频特效
+    from .video_scene_effect import VideoSceneEffectType
+    from .video_character_effect import VideoCharacterEffectType
+
+    # 视频动画
+    from .video_intro import IntroType
+    from .video_outro import OutroType
+    from .video_group_animation import GroupAnimationType
+    # 音频特效
+    from .audio_scene_effect import AudioSceneEffectType
+    from .tone_effect import ToneEffectType
+    from .speech_to_song import SpeechToSongType
+
+    # 文本动画
+    from .text_intro import TextIntro
+    from .text_outro import TextOutro
+    from .text_loop import TextLoopAnim
+
+    # 其它
+    from .font_meta import FontType
+    from .mask_meta import MaskType
+    from .filter_meta import FilterType
+    from .transition_meta import TransitionType
+    from .mix_mode_meta import MixModeType
+
+_LAZY_ENUMS = {
+    "VideoSceneEffectType": "video_scene_effect",
+    "VideoCharacterEffectType": "video_character_effect",
+    "IntroType": "video_intro",
+    "OutroType": "video_outro",
+    "GroupAnimationType": "video_group_animation",
+    "AudioSceneEffectType": "audio_scene_effect",
+    "ToneEffectType": "tone_effect",
+    "SpeechToSongType": "speech_to_song",
+    "TextIntro": "text_intro",
+    "TextOutro": "text_outro",
+    "TextLoopAnim": "text_loop",
+    "FontType": "font_meta",
+    "MaskType": "mask_meta",
+    "FilterType": "filter_meta",
+    "TransitionType": "transition_meta",
+    "MixModeType": "mix_mode_meta",
+}
+"""各特效枚举所在的子模块; 这些子模块包含数以千计的元数据对象, 仅在首次访问相应枚举时才导入"""
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ENUMS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ENUMS))
 
 __all__ = [
     "AnimationMeta",
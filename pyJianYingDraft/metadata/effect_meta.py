@@ -2,12 +2,14 @@
 
 from enum import Enum
 
-from typing import List, Dict, Any
-from typing import TypeVar, Optional
+from typing import List, Dict, Tuple, Any
+from typing import TypeVar, Optional, Literal
 
 class EffectParam:
     """特效参数信息"""
 
+    __slots__ = ("name", "default_value", "min_value", "max_value")
+
     name: str
     """参数名称"""
     default_value: float
@@ -26,6 +28,8 @@ class EffectParam:
 class EffectParamInstance(EffectParam):
     """特效参数实例"""
 
+    __slots__ = ("index", "value")
+
     index: int
     """参数索引"""
     value: float
@@ -92,8 +96,18 @@ class EffectMeta:
 
 EffectEnumSubclass = TypeVar("EffectEnumSubclass", bound="EffectEnum")
 
+_EffectIndex = Dict[str, "EffectEnum"]
+_effect_indexes: Dict[Tuple[type, str], _EffectIndex] = {}
+"""各特效枚举的查找表, 以`(枚举类, 索引类型)`为键, 在首次查找时构建"""
+
+def _normalize_name(name: str) -> str:
+    return name.lower().replace(" ", "").replace("_", "")
+
 class EffectEnum(Enum):
-    """特效枚举基类, 提供一个`from_name`方法用于根据名称获取特效元数据"""
+    """特效枚举基类, 提供`from_name`等方法用于根据名称或ID获取特效元数据
+
+    各查找方法所用的索引在对应枚举首次查找时构建, 此后的查找均为O(1)
+    """
 
     @classmethod
     def from_name(cls: "type[EffectEnumSubclass]", name: str) -> EffectEnumSubclass:
@@ -105,11 +119,59 @@ class EffectEnum(Enum):
         Raises:
             `ValueError`: 特效名称不存在
         """
-        name = name.lower().replace(" ", "").replace("_", "")
+        name = _normalize_name(name)
+        effect = cls._get_index("name").get(name)
+        if effect is None:
+            raise ValueError(f"Effect named '{name}' not found")
+        return effect  # type: ignore
+
+    @classmethod
+    def from_resource_id(cls: "type[EffectEnumSubclass]", resource_id: str) -> EffectEnumSubclass:
+        """根据资源ID获取特效元数据, 可用于将模板中导入的特效对应回枚举成员
+
+        Args:
+            resource_id (str): 资源ID
+
+        Raises:
+            `ValueError`: 资源ID不存在
+        """
+        effect = cls._get_index("resource_id").get(str(resource_id))
+        if effect is None:
+            raise ValueError(f"Effect with resource_id '{resource_id}' not found")
+        return effect  # type: ignore
+
+    @classmethod
+    def from_effect_id(cls: "type[EffectEnumSubclass]", effect_id: str) -> EffectEnumSubclass:
+        """根据效果ID获取特效元数据, 可用于将模板中导入的特效对应回枚举成员
+
+        Args:
+            effect_id (str): 效果ID
+
+        Raises:
+            `ValueError`: 效果ID不存在
+        """
+        effect = cls._get_index("effect_id").get(str(effect_id))
+        if effect is None:
+            raise ValueError(f"Effect with effect_id '{effect_id}' not found")
+        return effect  # type: ignore
+
+    @classmethod
+    def _get_index(cls, kind: Literal["name", "resource_id", "effect_id"]) -> _EffectIndex:
+        """返回此枚举指定类型的查找表, 必要时构建; 有重复键时保留定义在前的成员"""
+        index = _effect_indexes.get((cls, kind))
+        if index is not None:
+            return index
+
+        index = {}
         for effect in cls:
-            if effect.name.lower().replace(" ", "").replace("_", "") == name:
-                return effect
-        raise ValueError(f"Effect named '{name}' not found")
+            if kind == "name":
+                key = _normalize_name(effect.name)
+            else:
+                key = getattr(effect.value, kind, None)
+                if key is None: continue
+            index.setdefault(key, effect)
+        _effect_indexes[(cls, kind)] = index
+        return index
 
 # 动画元数据
 class AnimationMeta:
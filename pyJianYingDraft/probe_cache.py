@@ -0,0 +1,212 @@
+"""本地素材探测结果的持久化缓存
+
+探测结果以素材的绝对路径为键, 连同文件大小及修改时间一同保存在SQLite数据库中, 文件被修改后相应的缓存自动失效.
+缓存默认关闭, 可通过`enable_probe_cache`启用; 数据库以WAL模式打开, 可被多个进程同时读写.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+from typing import Optional, Literal
+
+ProbeKind = Literal["video", "audio"]
+
+@dataclass
+class ProbeResult:
+    """一次素材探测的结果"""
+
+    material_type: str
+    """素材类型, 对视频素材为"video", "photo"或"gif", 对音频素材为"audio\""""
+    duration: int
+    """素材时长, 单位为微秒"""
+    width: Optional[int]
+    """素材宽度, 音频素材为0, 未能探测到时为`None`"""
+    height: Optional[int]
+    """素材高度, 音频素材为0, 未能探测到时为`None`"""
+
+class ProbeCache:
+    """基于SQLite的素材探测结果缓存"""
+
+    db_path: str
+    """数据库文件路径"""
+
+    _lock: threading.Lock
+    _conn: Optional[sqlite3.Connection]
+    _pid: int
+
+    DB_NAME = "probe_cache.sqlite3"
+    """数据库文件名"""
+    SCHEMA_VERSION = 2
+    """数据库结构的版本号, 与已有数据库不符时丢弃其中的缓存记录"""
+
+    def __init__(self, directory: str):
+        """打开(必要时创建)位于指定目录下的缓存数据库
+
+        Args:
+            directory (`str`): 存放缓存数据库的目录, 不存在时自动创建
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = os.path.join(os.path.abspath(directory), self.DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = -1
+
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                    conn.execute("DROP TABLE IF EXISTS probes")
+                    conn.execute("PRAGMA user_version = %d" % self.SCHEMA_VERSION)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS probes ("
+                    "path TEXT NOT NULL, kind TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                    "material_type TEXT NOT NULL, duration INTEGER NOT NULL, width INTEGER, height INTEGER, "
+                    "updated_at REAL NOT NULL, PRIMARY KEY (path, kind))")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _connection(self) -> sqlite3.Connection:
+        """返回当前进程的数据库连接, 调用者须持有`_lock`"""
+        # fork得到的子进程不能沿用父进程的连接
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, path: str, kind: ProbeKind, stat: Optional[os.stat_result] = None) -> Optional[ProbeResult]:
+        """查询指定文件的探测结果, 文件不存在、未缓存或缓存已过期时返回`None`
+
+        Args:
+            path (`str`): 素材文件路径
+            kind (`str`): 探测方式, "video"或"audio"
+            stat (`os.stat_result`, optional): 调用方已取得的文件状态, 不指定时自动获取
+        """
+        path = os.path.abspath(path)
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT size, mtime_ns, material_type, duration, width, height FROM probes WHERE path = ? AND kind = ?",
+                (path, kind)).fetchone()
+        if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            return None
+        return ProbeResult(material_type=row[2], duration=row[3], width=row[4], height=row[5])
+
+    def put(self, path: str, kind: ProbeKind, result: ProbeResult, stat: Optional[os.stat_result] = None) -> None:
+        """写入指定文件的探测结果, 覆盖已有的记录
+
+        Args:
+            path (`str`): 素材文件路径
+            kind (`str`): 探测方式, "video"或"audio"
+            result (`ProbeResult`): 探测结果
+            stat (`os.stat_result`, optional): 探测之前取得的文件状态. 若文件在探测期间被修改, 记录会因状态不符而在下次查询时失效,
+                而不会将旧文件的探测结果与新文件的状态一同保存. 不指定时在写入时获取.
+        """
+        path = os.path.abspath(path)
+        if stat is None:
+            stat = os.stat(path)
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, kind, stat.st_size, stat.st_mtime_ns, result.material_type, int(result.duration),
+                 None if result.width is None else int(result.width), None if result.height is None else int(result.height),
+                 time.time()))
+
+    def invalidate(self, path: Optional[str] = None) -> int:
+        """删除指定文件的缓存记录, 不指定路径时清空整个缓存
+
+        Returns:
+            `int`: 删除的记录数
+        """
+        with self._lock:
+            if path is None:
+                cursor = self._connection().execute("DELETE FROM probes")
+            else:
+                cursor = self._connection().execute("DELETE FROM probes WHERE path = ?", (os.path.abspath(path),))
+        return cursor.rowcount
+
+    def prune(self, max_age: Optional[float] = None) -> int:
+        """清理失效的缓存记录, 即对应文件已不存在或已被修改的记录
+
+        Args:
+            max_age (`float`, optional): 若指定, 则同时删除写入时间早于此秒数之前的记录
+
+        Returns:
+            `int`: 删除的记录数
+        """
+        with self._lock:
+            rows = self._connection().execute("SELECT path, kind, size, mtime_ns, updated_at FROM probes").fetchall()
+
+        now = time.time()
+        stale = []
+        for path, kind, size, mtime_ns, updated_at in rows:
+            if max_age is not None and now - updated_at > max_age:
+                stale.append((path, kind))
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stale.append((path, kind))
+                continue
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                stale.append((path, kind))
+
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("DELETE FROM probes WHERE path = ? AND kind = ?", stale)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(stale)
+
+    def close(self) -> None:
+        """关闭数据库连接, 之后的操作会自动重新打开连接"""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+_probe_cache: Optional[ProbeCache] = None
+
+def enable_probe_cache(directory: Optional[str] = None) -> ProbeCache:
+    """启用素材探测缓存, 此后创建的`VideoMaterial`及`AudioMaterial`将优先使用缓存的探测结果
+
+    Args:
+        directory (`str`, optional): 存放缓存数据库的目录, 默认为`~/.cache/pyJianYingDraft`.
+
+    Returns:
+        `ProbeCache`: 启用的缓存对象, 可用于调用`invalidate`或`prune`
+    """
+    global _probe_cache
+    if directory is None:
+        directory = os.path.join(os.path.expanduser("~"), ".cache", "pyJianYingDraft")
+    if _probe_cache is not None:
+        _probe_cache.close()
+    _probe_cache = ProbeCache(directory)
+    return _probe_cache
+
+def disable_probe_cache() -> None:
+    """关闭素材探测缓存, 已写入的数据仍保留在磁盘上"""
+    global _probe_cache
+    if _probe_cache is not None:
+        _probe_cache.close()
+    _probe_cache = None
+
+def get_probe_cache() -> Optional[ProbeCache]:
+    """返回当前启用的素材探测缓存, 未启用时返回`None`"""
+    return _probe_cache
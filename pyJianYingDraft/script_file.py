@@ -1,17 +1,23 @@
 import os
+import re
 import json
 import math
+import bisect
 import sys
 import warnings
-from copy import deepcopy
+from copy import copy, deepcopy
+from itertools import chain
 
-from typing import Optional, Literal, Union, overload
-from typing import Type, Dict, List, Any
+from typing import TYPE_CHECKING, Optional, Literal, Union, overload
+from typing import Type, Dict, List, Tuple, Any
+from typing import TypeVar, Generic, Iterable, Iterator
 
 from . import util
+from . import json_backend
 from . import assets
 from . import exceptions
 from .template_mode import ImportedTrack, EditableTrack, ImportedMediaTrack, ImportedTextTrack, ShrinkMode, ExtendMode, import_track
+from .template_mode import ImportedMaterialIndex
 from .time_util import Timerange, tim, srt_tstamp
 from .local_materials import VideoMaterial, AudioMaterial
 from .segment import BaseSegment, Speed, ClipSettings
@@ -20,62 +26,180 @@ from .video_segment import VideoSegment, StickerSegment, SegmentAnimations, Vide
 from .effect_segment import EffectSegment, FilterSegment
 from .text_segment import TextSegment, TextStyle, TextBubble
 from .track import TrackType, BaseTrack, Track
+from .timeline_index import TimelineIndex
 
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType, FilterType
+if TYPE_CHECKING:
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType, FilterType
 from social_auto_upload.conf import BASE_DIR
 
 
+Material_type = TypeVar("Material_type")
+class MaterialList(Generic[Material_type]):
+    """以素材id为索引、保持插入顺序的素材列表
+
+    用法与`list`基本一致, 但成员判断、按id查找以及删除均为O(1)操作.
+    按下标访问在增删素材后的首次访问时需O(n)重建下标列表, 此后均为O(1).
+    同一id的素材只会被记录一次, 重复添加时保留最早加入的素材.
+    """
+
+    id_attr: Optional[str]
+    """素材对象中记录id的属性名, 为`None`时表示素材为json字典, 以其"id"字段为索引"""
+
+    _items: Dict[str, Material_type]
+    _values: Optional[List[Material_type]]
+    """按插入顺序排列的素材, 用于按下标访问, 为`None`表示需要重建"""
+    _export_cache: Optional[List[Any]]
+    """上次增量导出的结果, 为`None`表示列表自上次增量导出以来已被修改"""
+
+    def __init__(self, id_attr: Optional[str] = None):
+        self.id_attr = id_attr
+        self._items = {}
+        self._values = None
+        self._export_cache = None
+
+    def _key(self, item: Material_type) -> str:
+        if self.id_attr is None:
+            return item["id"]  # type: ignore
+        return getattr(item, self.id_attr)
+
+    def append(self, item: Material_type) -> None:
+        """添加一个素材, 若已存在同id的素材则忽略"""
+        key = self._key(item)
+        if key not in self._items:
+            self._items[key] = item
+            self._values = None
+            self._export_cache = None
+
+    def extend(self, items: Iterable[Material_type]) -> None:
+        """依次添加一系列素材"""
+        for item in items:
+            self.append(item)
+
+    def get(self, material_id: str) -> Optional[Material_type]:
+        """根据素材id获取素材, 不存在时返回`None`"""
+        return self._items.get(material_id)
+
+    def remove(self, item: Union[str, Material_type]) -> None:
+        """根据素材id或素材本身删除素材
+
+        Raises:
+            `KeyError`: 素材不存在
+        """
+        del self._items[item if isinstance(item, str) else self._key(item)]
+        self._values = None
+        self._export_cache = None
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._values = None
+        self._export_cache = None
+
+    @property
+    def dirty(self) -> bool:
+        """列表自上次增量导出以来是否被修改过"""
+        return self._export_cache is None
+
+    def mark_dirty(self) -> None:
+        """标记列表中的素材已被修改, 使下次增量导出时重新导出
+
+        增删素材时会自动标记, 仅在直接修改了列表中某个素材的属性后需要手动调用
+        """
+        self._export_cache = None
+
+    def export_json_cached(self) -> List[Any]:
+        """增量导出列表中各素材的json数据, 若列表自上次调用以来未被修改则直接返回上次的结果
+
+        返回值会被缓存, 不应修改
+        """
+        if self._export_cache is None:
+            self._export_cache = [item.export_json() if self.id_attr is not None else item
+                                  for item in self._items.values()]  # type: ignore
+        return self._export_cache
+
+    def __contains__(self, item: object) -> bool:
+        return (item if isinstance(item, str) else self._key(item)) in self._items  # type: ignore
+
+    def __iter__(self) -> Iterator[Material_type]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> Material_type:
+        if self._values is None:
+            self._values = list(self._items.values())
+        return self._values[index]
+
+    def __repr__(self) -> str:
+        return "MaterialList(%s)" % list(self._items.values())
+
 class ScriptMaterial:
     """草稿文件中的素材信息部分"""
 
-    audios: List[AudioMaterial]
+    audios: MaterialList[AudioMaterial]
     """音频素材列表"""
-    videos: List[VideoMaterial]
+    videos: MaterialList[VideoMaterial]
     """视频素材列表"""
-    stickers: List[Dict[str, Any]]
+    stickers: MaterialList[Dict[str, Any]]
     """贴纸素材列表"""
-    texts: List[Dict[str, Any]]
+    texts: MaterialList[Dict[str, Any]]
     """文本素材列表"""
 
-    audio_effects: List[AudioEffect]
+    audio_effects: MaterialList[AudioEffect]
     """音频特效列表"""
-    audio_fades: List[AudioFade]
+    audio_fades: MaterialList[AudioFade]
     """音频淡入淡出效果列表"""
-    animations: List[SegmentAnimations]
+    animations: MaterialList[SegmentAnimations]
     """动画素材列表"""
-    video_effects: List[VideoEffect]
+    video_effects: MaterialList[VideoEffect]
     """视频特效列表"""
 
-    speeds: List[Speed]
+    speeds: MaterialList[Speed]
     """变速列表"""
-    masks: List[Dict[str, Any]]
+    masks: MaterialList[Dict[str, Any]]
     """蒙版列表"""
-    transitions: List[Transition]
+    transitions: MaterialList[Transition]
     """转场效果列表"""
-    filters: List[Union[Filter, TextBubble]]
+    filters: MaterialList[Union[Filter, TextBubble]]
     """滤镜/文本花字/文本气泡列表, 导出到`effects`中"""
-    mix_modes: List[MixMode]
+    mix_modes: MaterialList[MixMode]
     """混合模式列表, 导出到`effects`中"""
-    canvases: List[BackgroundFilling]
+    canvases: MaterialList[BackgroundFilling]
     """背景填充列表"""
 
+    __CATEGORY_OF_TYPE: Dict[type, str] = {
+        VideoMaterial: "videos",
+        AudioMaterial: "audios",
+        AudioFade: "audio_fades",
+        AudioEffect: "audio_effects",
+        SegmentAnimations: "animations",
+        VideoEffect: "video_effects",
+        Transition: "transitions",
+        Filter: "filters",
+        TextBubble: "filters",
+        MixMode: "mix_modes",
+        Speed: "speeds",
+        BackgroundFilling: "canvases",
+    }
+    """素材类型到相应素材列表的映射, 用于成员判断"""
+
     def __init__(self):
-        self.audios = []
-        self.videos = []
-        self.stickers = []
-        self.texts = []
-
-        self.audio_effects = []
-        self.audio_fades = []
-        self.animations = []
-        self.video_effects = []
-
-        self.speeds = []
-        self.masks = []
-        self.transitions = []
-        self.filters = []
-        self.mix_modes = []
-        self.canvases = []
+        self.audios = MaterialList("material_id")
+        self.videos = MaterialList("material_id")
+        self.stickers = MaterialList()
+        self.texts = MaterialList()
+
+        self.audio_effects = MaterialList("effect_id")
+        self.audio_fades = MaterialList("fade_id")
+        self.animations = MaterialList("animation_id")
+        self.video_effects = MaterialList("global_id")
+
+        self.speeds = MaterialList("global_id")
+        self.masks = MaterialList()
+        self.transitions = MaterialList("global_id")
+        self.filters = MaterialList("global_id")
+        self.mix_modes = MaterialList("global_id")
+        self.canvases = MaterialList("global_id")
 
     @overload
     def __contains__(self, item: Union[VideoMaterial, AudioMaterial]) -> bool: ...
@@ -85,42 +209,43 @@ class ScriptMaterial:
     def __contains__(self, item: Union[SegmentAnimations, VideoEffect, Transition, Filter]) -> bool: ...
 
     def __contains__(self, item) -> bool:
-        if isinstance(item, VideoMaterial):
-            return item.material_id in [video.material_id for video in self.videos]
-        elif isinstance(item, AudioMaterial):
-            return item.material_id in [audio.material_id for audio in self.audios]
-        elif isinstance(item, AudioFade):
-            return item.fade_id in [fade.fade_id for fade in self.audio_fades]
-        elif isinstance(item, AudioEffect):
-            return item.effect_id in [effect.effect_id for effect in self.audio_effects]
-        elif isinstance(item, SegmentAnimations):
-            return item.animation_id in [ani.animation_id for ani in self.animations]
-        elif isinstance(item, VideoEffect):
-            return item.global_id in [effect.global_id for effect in self.video_effects]
-        elif isinstance(item, Transition):
-            return item.global_id in [transition.global_id for transition in self.transitions]
-        elif isinstance(item, Filter):
-            return item.global_id in [filter_.global_id for filter_ in self.filters]
-        elif isinstance(item, MixMode):
-            return item.global_id in [mix_mode.global_id for mix_mode in self.mix_modes]
-        else:
-            raise TypeError("Invalid argument type '%s'" % type(item))
+        for cls in type(item).__mro__:
+            if cls in self.__CATEGORY_OF_TYPE:
+                return item in getattr(self, self.__CATEGORY_OF_TYPE[cls])
+        raise TypeError("Invalid argument type '%s'" % type(item))
+
+    def mark_dirty(self) -> None:
+        """标记所有素材均已被修改, 使下次增量导出时全部重新导出"""
+        for value in vars(self).values():
+            if isinstance(value, MaterialList):
+                value.mark_dirty()
+
+    def export_json(self, lazy: bool = False, incremental: bool = False) -> Dict[str, List[Any]]:
+        """导出素材信息部分的json数据
+
+        Args:
+            lazy (`bool`, optional): 为真时返回`StreamingDict`, 其中的各类素材以生成器形式逐个导出, 供`util.write_json`流式写入. 默认为否.
+            incremental (`bool`, optional): 是否增量导出, 即跳过自上次增量导出以来未被修改的素材列表, 直接使用上次的导出结果. 默认为否.
+        """
+        def _export(materials: MaterialList) -> Iterable[Any]:
+            if incremental:
+                return materials.export_json_cached()
+            return (item.export_json() for item in materials) if materials.id_attr is not None else iter(materials)
 
-    def export_json(self) -> Dict[str, List[Any]]:
-        return {
+        ret: Dict[str, Iterable[Any]] = {
             "ai_translates": [],
             "audio_balances": [],
-            "audio_effects": [effect.export_json() for effect in self.audio_effects],
-            "audio_fades": [fade.export_json() for fade in self.audio_fades],
+            "audio_effects": _export(self.audio_effects),
+            "audio_fades": _export(self.audio_fades),
             "audio_track_indexes": [],
-            "audios": [audio.export_json() for audio in self.audios],
+            "audios": _export(self.audios),
             "beats": [],
-            "canvases": [canvas.export_json() for canvas in self.canvases],
+            "canvases": _export(self.canvases),
             "chromas": [],
             "color_curves": [],
             "digital_humans": [],
             "drafts": [],
-            "effects": [_filter.export_json() for _filter in self.filters] + [mix_mode.export_json() for mix_mode in self.mix_modes],
+            "effects": chain(_export(self.filters), _export(self.mix_modes)),
             "flowers": [],
             "green_screens": [],
             "handwrites": [],
@@ -129,8 +254,8 @@ class ScriptMaterial:
             "log_color_wheels": [],
             "loudnesses": [],
             "manual_deformations": [],
-            "masks": self.masks,
-            "material_animations": [ani.export_json() for ani in self.animations],
+            "masks": _export(self.masks),
+            "material_animations": _export(self.animations),
             "material_colors": [],
             "multi_language_refs": [],
             "placeholders": [],
@@ -141,19 +266,22 @@ class ScriptMaterial:
             "smart_crops": [],
             "smart_relights": [],
             "sound_channel_mappings": [],
-            "speeds": [spd.export_json() for spd in self.speeds],
-            "stickers": self.stickers,
+            "speeds": _export(self.speeds),
+            "stickers": _export(self.stickers),
             "tail_leaders": [],
             "text_templates": [],
-            "texts": self.texts,
+            "texts": _export(self.texts),
             "time_marks": [],
-            "transitions": [transition.export_json() for transition in self.transitions],
-            "video_effects": [effect.export_json() for effect in self.video_effects],
+            "transitions": _export(self.transitions),
+            "video_effects": _export(self.video_effects),
             "video_trackings": [],
-            "videos": [video.export_json() for video in self.videos],
+            "videos": _export(self.videos),
             "vocal_beautifys": [],
             "vocal_separations": []
         }
+        if lazy:
+            return util.StreamingDict((key, iter(value)) for key, value in ret.items())
+        return {key: list(value) for key, value in ret.items()}
 
 class ScriptFile:
     """剪映草稿文件, 大部分接口定义在此"""
@@ -185,6 +313,9 @@ class ScriptFile:
     imported_tracks: List[ImportedTrack]
     """导入的轨道信息"""
 
+    _imported_material_index: Optional[ImportedMaterialIndex] = None
+    _timeline_index: Optional[TimelineIndex] = None
+
     def __init__(self, width: int, height: int, fps: int, maintrack_adsorb: bool):
         """**创建剪映草稿推荐使用`DraftFolder.create_draft()`而非此方法**
 
@@ -208,9 +339,7 @@ class ScriptFile:
         self.imported_materials = {}
         self.imported_tracks = []
 
-
-        with open(assets.get_asset_path('DRAFT_CONTENT_TEMPLATE'), "r", encoding="utf-8") as f:
-            self.content = json.load(f)
+        self.content = assets.load_asset_json('DRAFT_CONTENT_TEMPLATE')
 
     @staticmethod
     def load_template(json_path: str) -> "ScriptFile":
@@ -226,18 +355,71 @@ class ScriptFile:
         obj.save_path = json_path
         if not os.path.exists(json_path):
             raise FileNotFoundError("JSON文件 '%s' 不存在" % json_path)
-        with open(json_path, "r", encoding="utf-8") as f:
-            obj.content = json.load(f)
+        with open(json_path, "rb") as f:
+            obj.content = json_backend.load(f)
 
         util.assign_attr_with_json(obj, ["fps", "duration"], obj.content)
         util.assign_attr_with_json(obj, ["maintrack_adsorb"], obj.content["config"])
         util.assign_attr_with_json(obj, ["width", "height"], obj.content["canvas_config"])
 
-        obj.imported_materials = deepcopy(obj.content["materials"])
+        # 导入的素材及轨道均直接引用解析得到的json数据, 修改时再按需拷贝
+        obj.imported_materials = {material_type: list(material_list)
+                                  for material_type, material_list in obj.content["materials"].items()}
         obj.imported_tracks = [import_track(track_data) for track_data in obj.content["tracks"]]
 
         return obj
 
+    def clone(self) -> "ScriptFile":
+        """创建草稿的副本, 适合于从同一模板反复生成大量变体
+
+        副本与原草稿共享导入素材及导入轨道的json数据, 本库的各种替换方法均会在修改前先拷贝相应的素材,
+        因而克隆的开销只与导入素材及片段的数量有关, 而与json数据的规模无关.
+        注意: 若要直接修改`imported_materials`中的素材, 请先用其浅拷贝替换之, 以免影响共享数据的其它草稿.
+        """
+        obj = copy(self)
+        obj.materials = deepcopy(self.materials)
+        obj.tracks = deepcopy(self.tracks)
+        obj.imported_materials = {material_type: list(material_list)
+                                  for material_type, material_list in self.imported_materials.items()}
+        obj.imported_tracks = [track.clone() for track in self.imported_tracks]
+        obj._imported_material_index = None
+        obj._timeline_index = None
+        return obj
+
+    def get_timeline_index(self) -> TimelineIndex:
+        """获取草稿中所有轨道(包括导入的轨道)上片段的区间索引, 可用于查询某一时刻或时间范围内的片段
+
+        索引在首次调用时构建, 并在通过本类的方法添加片段、导入轨道或替换素材后自动失效重建.
+        若绕过本类直接修改了片段的时间范围, 请先调用`invalidate_timeline_index`.
+        """
+        tracks = list(chain(self.tracks.values(), self.imported_tracks))
+        if self._timeline_index is None or not self._timeline_index.is_current(tracks):
+            self._timeline_index = TimelineIndex(tracks)
+        return self._timeline_index
+
+    def invalidate_timeline_index(self) -> None:
+        """使`get_timeline_index`返回的索引失效, 下次获取时重新构建"""
+        self._timeline_index = None
+
+    def _material_index(self) -> ImportedMaterialIndex:
+        """获取`imported_materials`的id及名称索引, 首次使用或`imported_materials`被整体替换后重新构建"""
+        if self._imported_material_index is None or self._imported_material_index.materials is not self.imported_materials:
+            self._imported_material_index = ImportedMaterialIndex(self.imported_materials)
+        return self._imported_material_index
+
+    def _append_imported_material(self, material_type: str, material: Dict[str, Any]) -> None:
+        """向`imported_materials`中追加一个素材, 并同步更新索引"""
+        self.imported_materials.setdefault(material_type, []).append(material)
+        if self._imported_material_index is not None and self._imported_material_index.materials is self.imported_materials:
+            self._imported_material_index.add(material_type, material)
+
+    def _writable_imported_material(self, material_type: str, index: int) -> Dict[str, Any]:
+        """将`imported_materials[material_type][index]`替换为其浅拷贝并返回, 以便在不影响共享该素材的其它草稿的前提下修改它"""
+        material_list = self.imported_materials[material_type]
+        material = dict(material_list[index])
+        material_list[index] = material
+        return material
+
     def add_material(self, material: Union[VideoMaterial, AudioMaterial]) -> "ScriptFile":
         """向草稿文件中添加一个素材"""
         if material in self.materials:  # 素材已存在
@@ -253,7 +435,7 @@ class ScriptFile:
         """向草稿文件中添加一个素材"""
         if vocal_separation in self.imported_materials["vocal_separations"]:  # 素材已存在
             return self
-        self.imported_materials["vocal_separations"].append(vocal_separation)
+        self._append_imported_material("vocal_separations", vocal_separation)
         return self
 
     def add_track(self, track_type: TrackType, track_name: Optional[str] = None, *,
@@ -322,6 +504,7 @@ class ScriptFile:
         # 加入轨道并更新时长
         target.add_segment(segment)
         self.duration = max(self.duration, segment.end)
+        self._timeline_index = None
 
         # 自动添加相关素材
         if isinstance(segment, VideoSegment):
@@ -383,7 +566,7 @@ class ScriptFile:
 
         return self
 
-    def add_effect(self, effect: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def add_effect(self, effect: Union["VideoSceneEffectType", "VideoCharacterEffectType"],
                    t_range: Timerange, track_name: Optional[str] = None, *,
                    params: Optional[List[Optional[float]]] = None) -> "ScriptFile":
         """向指定的特效轨道中添加一个特效片段
@@ -406,13 +589,14 @@ class ScriptFile:
         segment = EffectSegment(effect, t_range, params)
         target.add_segment(segment)
         self.duration = max(self.duration, t_range.start + t_range.duration)
+        self._timeline_index = None
 
         # 自动添加相关素材
         if segment.effect_inst not in self.materials:
             self.materials.video_effects.append(segment.effect_inst)
         return self
 
-    def add_filter(self, filter_meta: FilterType, t_range: Timerange,
+    def add_filter(self, filter_meta: "FilterType", t_range: Timerange,
                    track_name: Optional[str] = None, intensity: float = 100.0) -> "ScriptFile":
         """向指定的滤镜轨道中添加一个滤镜片段
 
@@ -433,6 +617,7 @@ class ScriptFile:
         segment = FilterSegment(filter_meta, t_range, intensity / 100.0)  # 转换为0-1范围
         target.add_segment(segment)
         self.duration = max(self.duration, t_range.end)
+        self._timeline_index = None
 
         # 自动添加相关素材
         self.materials.filters.append(segment.material)
@@ -568,7 +753,7 @@ class ScriptFile:
             relative_index (`int`, optional): 相对索引，用于调整导入轨道的渲染层级. 默认保持原有层级.
         """
         # 直接拷贝原始轨道结构, 按需修改渲染层级
-        imported_track = deepcopy(track)
+        imported_track = track.clone()
         if relative_index is not None:
             imported_track.render_index = track.track_type.value.render_index + relative_index
         if new_name is not None:
@@ -580,6 +765,7 @@ class ScriptFile:
             for seg in imported_track.segments:
                 seg.target_timerange.start = max(0, seg.target_timerange.start + offset_us)
         self.imported_tracks.append(imported_track)
+        self._timeline_index = None
 
         # 收集所有需要复制的素材ID
         material_ids = set()
@@ -594,16 +780,23 @@ class ScriptFile:
             extra_refs: List[str] = segment.get("extra_material_refs", [])
             material_ids.update(extra_refs)
 
-        # 复制素材
-        for material_type, material_list in source_file.imported_materials.items():
-            for material in material_list:
-                if material.get("id") in material_ids:
-                    if material_type not in self.imported_materials:
-                        self.imported_materials[material_type] = []
-                    self.imported_materials[material_type].append(deepcopy(material))
-                    material_ids.remove(material.get("id"))
+        # 复制素材, 保持素材在源文件中的先后顺序
+        source_index = source_file._material_index()
+        type_order = {material_type: i for i, material_type in enumerate(source_file.imported_materials)}
+        found: List[Tuple[int, int, str]] = []
+        missing_ids = set()
+        for material_id in material_ids:
+            entries = source_index.find_by_id(material_id)
+            if not entries:
+                missing_ids.add(material_id)
+                continue
+            material_type, index = min(entries, key=lambda entry: (type_order[entry[0]], entry[1]))
+            found.append((type_order[material_type], index, material_type))
 
-        assert len(material_ids) == 0, "未找到以下素材: %s" % material_ids
+        assert len(missing_ids) == 0, "未找到以下素材: %s" % missing_ids
+
+        for _, index, material_type in sorted(found):
+            self._append_imported_material(material_type, source_file.imported_materials[material_type][index])
 
         # 更新总时长
         self.duration = max(self.duration, track.end_time)
@@ -627,25 +820,24 @@ class ScriptFile:
         """
         video_mode = isinstance(material, VideoMaterial)
         # 查找素材
-        target_json_obj: Optional[Dict[str, Any]] = None
-        target_material_list = self.imported_materials["videos" if video_mode else "audios"]
+        material_type = "videos" if video_mode else "audios"
         name_key = "material_name" if video_mode else "name"
-        for mat in target_material_list:
-            if mat[name_key] == material_name:
-                if target_json_obj is not None:
-                    raise exceptions.AmbiguousMaterial(
-                        "找到多个名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
-                target_json_obj = mat
-        if target_json_obj is None:
+        indices = self._material_index().find_by_name(material_type, material_name)
+        if len(indices) > 1:
+            raise exceptions.AmbiguousMaterial("找到多个名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
+        if len(indices) == 0:
             raise exceptions.MaterialNotFound("没有找到名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
 
         # 更新素材信息
+        old_json_obj = self.imported_materials[material_type][indices[0]]
+        target_json_obj = self._writable_imported_material(material_type, indices[0])
         target_json_obj.update({name_key: material.material_name, "path": material.path, "duration": material.duration})
         if video_mode:
             target_json_obj.update(
                 {"width": material.width, "height": material.height, "material_type": material.material_type})
             if replace_crop:
                 target_json_obj.update({"crop": material.crop_settings.export_json()})
+        self._material_index().update(material_type, indices[0], old_json_obj)
 
         return self
 
@@ -669,30 +861,62 @@ class ScriptFile:
             `TypeError`: 轨道或素材类型不正确
             `ExtensionFailed`: 新素材比原素材长时处理失败
         """
+        return self.replace_materials_by_seg(track, [(segment_index, material, source_timerange)],
+                                             handle_shrink=handle_shrink, handle_extend=handle_extend)
+
+    def replace_materials_by_seg(self, track: EditableTrack,
+                                 replacements: List[Tuple[int, Union[VideoMaterial, AudioMaterial], Optional[Timerange]]], *,
+                                 handle_shrink: ShrinkMode = ShrinkMode.cut_tail,
+                                 handle_extend: Union[ExtendMode, List[ExtendMode]] = ExtendMode.cut_material_tail) -> "ScriptFile":
+        """批量替换指定音视频轨道上多个片段的素材, 结果与按片段下标升序逐个调用`replace_material_by_seg`相同
+
+        后续片段的平移(`ShrinkMode.cut_tail_align`及`ExtendMode.push_tail`)在一次遍历中完成, 故替换整条轨道的开销与片段数成线性关系
+
+        Args:
+            track (`EditableTrack`): 要替换素材的轨道, 由`get_imported_track`获取
+            replacements (`List[Tuple[int, VideoMaterial | AudioMaterial, Optional[Timerange]]]`): 每项为`(片段下标, 新素材, 截取的素材时间范围)`,
+                各项含义同`replace_material_by_seg`的相应参数, 时间范围为`None`时取默认值.
+            handle_shrink (`Shrink_mode`, optional): 新素材比原素材短时的处理方式, 默认为裁剪尾部, 使片段长度与素材一致.
+            handle_extend (`Extend_mode` or `List[Extend_mode]`, optional): 新素材比原素材长时的处理方式, 将按顺序逐个尝试直至成功或抛出异常.
+                默认为截断素材尾部, 使片段维持原长不变
+
+        Raises:
+            `IndexError`: 片段下标越界
+            `TypeError`: 轨道或素材类型不正确
+            `ExtensionFailed`: 新素材比原素材长时处理失败
+        """
         if not isinstance(track, ImportedMediaTrack):
             raise TypeError("指定的轨道(类型为 %s)不支持素材替换" % track.track_type)
-        if not 0 <= segment_index < len(track):
-            raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
-        if not track.check_material_type(material):
-            raise TypeError("指定的素材类型 %s 不匹配轨道类型 %s", (type(material), track.track_type))
-        seg = track.segments[segment_index]
+        for segment_index, material, _ in replacements:
+            if not 0 <= segment_index < len(track):
+                raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
+            if not track.check_material_type(material):
+                raise TypeError("指定的素材类型 %s 不匹配轨道类型 %s", (type(material), track.track_type))
 
         if isinstance(handle_extend, ExtendMode):
             handle_extend = [handle_extend]
-        if source_timerange is None:
-            if isinstance(material, VideoMaterial) and (material.material_type == "photo"):
-                source_timerange = Timerange(0, seg.duration)
-            else:
-                source_timerange = Timerange(0, material.duration)
+        timeranges: List[Tuple[int, Timerange]] = []
+        for segment_index, material, source_timerange in replacements:
+            if source_timerange is None:
+                if isinstance(material, VideoMaterial) and (material.material_type == "photo"):
+                    source_timerange = Timerange(0, track.segments[segment_index].duration)
+                else:
+                    source_timerange = Timerange(0, material.duration)
+            timeranges.append((segment_index, source_timerange))
 
         # 处理时间变化
-        track.process_timerange(segment_index, source_timerange, handle_shrink, handle_extend)
-
-        # 最后替换素材链接
-        track.segments[segment_index].material_id = material.material_id
-        self.add_material(material)
+        try:
+            track.process_timeranges(timeranges, handle_shrink, handle_extend)
+        finally:
+            # 最后替换素材链接, 若中途失败则只替换已处理完成(即写入了新时间范围)的片段
+            for (segment_index, material, _), (_, source_timerange) in zip(replacements, timeranges):
+                if track.segments[segment_index].source_timerange is source_timerange:
+                    track.segments[segment_index].material_id = material.material_id
+                    self.add_material(material)
+            # 更新总长
+            self.duration = max([t.end_time for t in chain(self.imported_tracks, self.tracks.values())], default=0)
+            self._timeline_index = None
 
-        # TODO: 更新总长
         return self
 
     def replace_text(self, track: EditableTrack, segment_index: int, text: Union[str, List[str]],
@@ -726,60 +950,51 @@ class ScriptFile:
                     new_styles.append(style)
             return new_styles
 
-        replaced: bool = False
+        material_index = self._material_index()
         material_id: str = track.segments[segment_index].material_id
         # 尝试在文本素材中替换
-        for mat in self.imported_materials["texts"]:
-            if mat["id"] != material_id:
-                continue
-
+        ind = material_index.find_id_in("texts", material_id)
+        if ind is not None:
+            mat = self._writable_imported_material("texts", ind)
             if isinstance(text, list):
                 if len(text) != 1:
                     raise ValueError(f"正常文本片段只能有一个文字内容, 但替换内容是 {text}")
                 text = text[0]
 
-            content = json.loads(mat["content"])
+            content = json_backend.loads(mat["content"])
             if recalc_style:
                 content["styles"] = __recalc_style_range(len(content["text"]), len(text), content["styles"])
             content["text"] = text
-            mat["content"] = json.dumps(content, ensure_ascii=False)
-            replaced = True
-            break
-        if replaced:
+            mat["content"] = json_backend.dumps(content)
             return self
 
         # 尝试在文本模板中替换
-        for template in self.imported_materials["text_templates"]:
-            if template["id"] != material_id:
+        template_ind = material_index.find_id_in("text_templates", material_id)
+        assert template_ind is not None, f"未找到指定片段的素材 {material_id}"
+        template = self.imported_materials["text_templates"][template_ind]
+
+        resources = template["text_info_resources"]
+        if isinstance(text, str):
+            text = [text]
+        if len(text) > len(resources):
+            raise ValueError(f"文字模板'{template['name']}'只有{len(resources)}段文本, 但提供了{len(text)}段替换内容")
+
+        for sub_material_id, new_text in zip(map(lambda x: x["text_material_id"], resources), text):
+            ind = material_index.find_id_in("texts", sub_material_id)
+            if ind is None:
                 continue
 
-            resources = template["text_info_resources"]
-            if isinstance(text, str):
-                text = [text]
-            if len(text) > len(resources):
-                raise ValueError(f"文字模板'{template['name']}'只有{len(resources)}段文本, 但提供了{len(text)}段替换内容")
-
-            for sub_material_id, new_text in zip(map(lambda x: x["text_material_id"], resources), text):
-                for mat in self.imported_materials["texts"]:
-                    if mat["id"] != sub_material_id:
-                        continue
-
-                    try:
-                        content = json.loads(mat["content"])
-                        if recalc_style:
-                            content["styles"] = __recalc_style_range(len(content["text"]), len(new_text), content["styles"])
-                        content["text"] = new_text
-                        mat["content"] = json.dumps(content, ensure_ascii=False)
-                    except json.JSONDecodeError:
-                        mat["content"] = new_text
-                    except TypeError:
-                        mat["content"] = new_text
-
-                    break
-            replaced = True
-            break
-
-        assert replaced, f"未找到指定片段的素材 {material_id}"
+            mat = self._writable_imported_material("texts", ind)
+            try:
+                content = json_backend.loads(mat["content"])
+                if recalc_style:
+                    content["styles"] = __recalc_style_range(len(content["text"]), len(new_text), content["styles"])
+                content["text"] = new_text
+                mat["content"] = json_backend.dumps(content)
+            except json.JSONDecodeError:
+                mat["content"] = new_text
+            except TypeError:
+                mat["content"] = new_text
 
         return self
 
@@ -800,76 +1015,178 @@ class ScriptFile:
             if effect["type"] == "text_effect":
                 print("\tResource id: %s '%s'" % (effect["resource_id"], effect.get("name", "")))
 
-    def dumps(self) -> str:
-        """将草稿文件内容导出为JSON字符串"""
-        self.content["fps"] = self.fps
-        self.content["duration"] = self.duration
-        self.content["config"]["maintrack_adsorb"] = self.maintrack_adsorb
-        self.content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
-        self.content["materials"] = self.materials.export_json()
+    def _export_content(self, lazy: bool, incremental: bool) -> Dict[str, Any]:
+        """构造导出用的草稿内容快照, 只浅拷贝`content`而不修改草稿对象的任何状态
+
+        Args:
+            lazy (`bool`): 是否以生成器形式逐个导出素材、轨道及片段, 供`util.write_json`流式写入
+            incremental (`bool`): 是否跳过自上次增量导出以来未被修改的轨道及素材列表, 直接使用上次的导出结果
+        """
+        content = util.StreamingDict(self.content) if lazy else dict(self.content)
+        content["fps"] = self.fps
+        content["duration"] = self.duration
+        content["config"] = dict(self.content["config"], maintrack_adsorb=self.maintrack_adsorb)
+        content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
+        materials = self.materials.export_json(lazy, incremental)
 
         # 合并导入的素材
         for material_type, material_list in self.imported_materials.items():
-            if material_type not in self.content["materials"]:
-                self.content["materials"][material_type] = material_list
+            if material_type not in materials:
+                materials[material_type] = iter(material_list) if lazy else material_list
+            elif lazy:
+                materials[material_type] = chain(materials[material_type], material_list)
             else:
-                self.content["materials"][material_type].extend(material_list)
+                materials[material_type] = materials[material_type] + material_list
+        content["materials"] = materials
 
-        # 对轨道排序并导出
+        # 导出轨道
         track_list: List[BaseTrack] = list(self.imported_tracks + list(self.tracks.values()))  # 新加入的轨道在列表末尾（上层）
         # track_list.sort(key=lambda track: track.render_index)
-        self.content["tracks"] = [track.export_json() for track in track_list]
+        if lazy:
+            content["tracks"] = (track.export_json_cached(lazy=True) if incremental else track.export_json(lazy=True)
+                                 for track in track_list)
+        else:
+            content["tracks"] = [track.export_json_cached() if incremental else track.export_json() for track in track_list]
+
+        return content
 
-        return json.dumps(self.content, ensure_ascii=False, indent=4)
+    def dumps(self, *, incremental: bool = False) -> str:
+        """将草稿文件内容导出为JSON字符串, 此操作不会修改草稿对象, 故可以反复调用
+
+        Args:
+            incremental (`bool`, optional): 是否增量导出, 即跳过自上次增量导出以来未被修改的轨道及素材, 直接使用上次的导出结果. 默认为否.
+                若直接修改了已加入轨道的片段或已添加的素材的属性, 请先调用相应轨道或素材列表的`mark_dirty()`方法.
+        """
+        return json_backend.dumps(self._export_content(lazy=False, incremental=incremental), indent=4)
 
-    def dump(self, file_path: str) -> None:
-        """将草稿文件内容写入文件"""
+    def dump(self, file_path: str, *, compact: bool = False, incremental: bool = False) -> None:
+        """将草稿文件内容写入文件, 此操作不会修改草稿对象, 故可以反复调用
+
+        素材及片段会被逐个导出并直接写入文件, 而不会在内存中构造完整的JSON字符串
+
+        Args:
+            file_path (`str`): 写入的文件路径
+            compact (`bool`, optional): 是否以不含缩进及空白的紧凑格式写入, 默认为否. 非紧凑格式下写入的内容与`dumps()`完全一致.
+            incremental (`bool`, optional): 是否增量导出, 含义同`dumps()`. 默认为否.
+        """
         with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.dumps())
+            util.write_json(f, self._export_content(lazy=True, incremental=incremental), indent=None if compact else 4)
+
+    def save(self, *, compact: bool = False, incremental: bool = False) -> None:
+        """保存草稿文件至打开时的路径, 可在构建过程中反复调用以保存检查点
 
-    def save(self) -> None:
-        """保存草稿文件至打开时的路径
+        Args:
+            compact (`bool`, optional): 是否以不含缩进及空白的紧凑格式写入, 默认为否.
+            incremental (`bool`, optional): 是否增量导出, 即跳过自上次增量保存以来未被修改的轨道及素材, 含义同`dumps()`. 默认为否.
 
         Raises:
             `ValueError`: 没有设置保存路径
         """
         if self.save_path is None:
             raise ValueError("没有设置保存路径, 可能不在模板模式下")
-        self.dump(self.save_path)
+        self.dump(self.save_path, compact=compact, incremental=incremental)
 
     def replace_text_by_content(self, text, old_text, model='eq'):
-        imported_tracks = self.imported_tracks
-        have_replace = False
-        for track in imported_tracks:
-            if isinstance(track, ImportedTextTrack):
-                # if have_replace:
-                #     break
-                for mat in self.imported_materials["texts"]:
-                    content = json.loads(mat["content"])
-                    if model == 'in':
-                        if old_text in content["text"]:
-                            old_len = len(content["text"])
-                            content["text"] = content["text"].replace(old_text,text)
-                            new_len = len(content["text"])
-                            # 更新styles中的range值
-                            for style in content.get("styles", []):
-                                start = math.ceil(style["range"][0] / old_len * new_len)
-                                end = math.ceil(style["range"][1] / old_len * new_len)
-                                style["range"] = [start, end]
-                            mat["content"] = json.dumps(content, ensure_ascii=False)
-                            have_replace = True
-                            # break
-                    else:
-                        if content["text"].startswith(old_text):
-                            old_len = len(content["text"])
-                            content["text"] = text
-                            new_len = len(content["text"])
-                            # 更新styles中的range值
-                            for style in content.get("styles", []):
-                                start = math.ceil(style["range"][0] / old_len * new_len)
-                                end = math.ceil(style["range"][1] / old_len * new_len)
-                                style["range"] = [start, end]
-                            mat["content"] = json.dumps(content, ensure_ascii=False)
-                            have_replace = True
-                            # break
-        return self
\ No newline at end of file
+        """将内容以`old_text`开头(`model='eq'`)或包含`old_text`(`model='in'`)的导入文本替换为`text`, 相当于只含一项的`replace_texts_by_content`"""
+        if not any(isinstance(track, ImportedTextTrack) for track in self.imported_tracks):
+            return self
+        return self.replace_texts_by_content({old_text: text}, mode="substring" if model == 'in' else "prefix")
+
+    def replace_texts_by_content(self, replacements: Dict[str, str],
+                                 mode: Literal["exact", "prefix", "substring"] = "substring") -> "ScriptFile":
+        """按内容批量替换导入的文本素材, 每个素材只解析及序列化一次, 各替换项在一次扫描中同时应用
+
+        Args:
+            replacements (`Dict[str, str]`): 旧文本到新文本的映射
+            mode (`str`, optional): 匹配方式, 默认为"substring".
+                "exact": 文本与某一旧文本完全相同时, 整体替换为相应的新文本;
+                "prefix": 文本以某一旧文本开头时, 整体替换为相应的新文本, 有多个旧文本匹配时取最长者;
+                "substring": 将文本中出现的所有旧文本替换为相应的新文本, 在同一位置有多个旧文本匹配时取最长者.
+                字体样式的应用范围会随之调整, 替换区域外的样式保持原位, 被替换区域内的样式按比例缩放.
+
+        Raises:
+            `ValueError`: 匹配方式不正确或旧文本为空
+        """
+        if mode not in ("exact", "prefix", "substring"):
+            raise ValueError(f"不支持的匹配方式: {mode}")
+        if "" in replacements:
+            raise ValueError("旧文本不能为空")
+        if not replacements or "texts" not in self.imported_materials:
+            return self
+
+        # 按长度降序排列的备选分支保证在同一位置优先匹配最长的旧文本
+        alternatives = "|".join(map(re.escape, sorted(replacements, key=len, reverse=True)))
+        search_pattern = re.compile(alternatives)
+        pattern = re.compile("^(?:%s)" % alternatives) if mode == "prefix" else search_pattern
+
+        for ind, mat in enumerate(self.imported_materials["texts"]):
+            raw_content: str = mat["content"]
+            # 没有转义字符时, 文本内容在json中原样出现, 可以直接跳过不含任何旧文本的素材
+            if mode != "exact" and "\\" not in raw_content and not search_pattern.search(raw_content):
+                continue
+            try:
+                content = json_backend.loads(raw_content)
+            except (json.JSONDecodeError, TypeError):
+                continue
+            old_text: str = content["text"]
+
+            spans: List[Tuple[int, int, int, int]] = []
+            if mode == "exact":
+                if old_text not in replacements:
+                    continue
+                new_text = replacements[old_text]
+                spans.append((0, len(old_text), 0, len(new_text)))
+            elif mode == "prefix":
+                match = pattern.match(old_text)
+                if match is None:
+                    continue
+                new_text = replacements[match.group(0)]
+                spans.append((0, len(old_text), 0, len(new_text)))
+            else:
+                pieces: List[str] = []
+                last_end, new_len = 0, 0
+                for match in pattern.finditer(old_text):
+                    new_len += match.start() - last_end
+                    replacement = replacements[match.group(0)]
+                    spans.append((match.start(), match.end(), new_len, new_len + len(replacement)))
+                    pieces.append(old_text[last_end:match.start()])
+                    pieces.append(replacement)
+                    new_len += len(replacement)
+                    last_end = match.end()
+                if not spans:
+                    continue
+                pieces.append(old_text[last_end:])
+                new_text = "".join(pieces)
+
+            content["text"] = new_text
+            if "styles" in content:
+                content["styles"] = self.__remap_style_ranges(content["styles"], spans)
+            self._writable_imported_material("texts", ind)["content"] = json_backend.dumps(content)
+
+        return self
+
+    @staticmethod
+    def __remap_style_ranges(styles: List[Dict[str, Any]], spans: List[Tuple[int, int, int, int]]) -> List[Dict[str, Any]]:
+        """根据替换区域调整字体样式的应用范围, 并丢弃变为空的样式
+
+        Args:
+            styles (`List[Dict[str, Any]]`): 原有的样式列表
+            spans (`List[Tuple[int, int, int, int]]`): 按位置排列的替换区域, 每项为`(原起点, 原终点, 新起点, 新终点)`
+        """
+        span_starts = [span[0] for span in spans]
+
+        def remap(pos: int) -> int:
+            i = bisect.bisect_right(span_starts, pos) - 1
+            if i < 0:
+                return pos
+            old_start, old_end, new_start, new_end = spans[i]
+            if pos >= old_end:
+                return pos - old_end + new_end
+            return new_start + math.ceil((pos - old_start) / (old_end - old_start) * (new_end - new_start))
+
+        new_styles: List[Dict[str, Any]] = []
+        for style in styles:
+            start, end = remap(style["range"][0]), remap(style["range"][1])
+            if start != end:
+                new_styles.append(dict(style, range=[start, end]))
+        return new_styles
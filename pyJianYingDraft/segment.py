@@ -1,15 +1,17 @@
 """定义片段基类及部分比较通用的属性类"""
 
-import uuid
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Sequence, Any, Union
 
+from .id_generator import generate_id
 from .animation import SegmentAnimations
 from .time_util import Timerange, tim
-from .keyframe import KeyframeList, KeyframeProperty
+from .keyframe import KeyframeList, KeyframeProperty, _as_list
 
 class BaseSegment:
     """片段基类"""
 
+    __slots__ = ("segment_id", "material_id", "target_timerange", "common_keyframes", "_keyframe_index")
+
     segment_id: str
     """片段全局id, 由程序自动生成"""
     material_id: str
@@ -19,13 +21,30 @@ class BaseSegment:
 
     common_keyframes: List[KeyframeList]
     """各属性的关键帧列表"""
+    _keyframe_index: Dict[KeyframeProperty, KeyframeList]
+    """属性到`common_keyframes`中相应关键帧列表的映射"""
 
     def __init__(self, material_id: str, target_timerange: Timerange):
-        self.segment_id = uuid.uuid4().hex
+        self.segment_id = generate_id()
         self.material_id = material_id
         self.target_timerange = target_timerange
 
         self.common_keyframes = []
+        self._keyframe_index = {}
+
+    def _get_keyframe_list(self, _property: KeyframeProperty) -> KeyframeList:
+        """获取给定属性的关键帧列表, 不存在时创建一个并加入`common_keyframes`中"""
+        kf_list = self._keyframe_index.get(_property)
+        if kf_list is None or len(self._keyframe_index) != len(self.common_keyframes) \
+                or all(item is not kf_list for item in self.common_keyframes):
+            # `common_keyframes`可能被直接修改过, 重建映射. 逆序遍历以使同一属性的多个列表中靠前者优先
+            self._keyframe_index = {kf_list.keyframe_property: kf_list for kf_list in reversed(self.common_keyframes)}
+            kf_list = self._keyframe_index.get(_property)
+        if kf_list is None:
+            kf_list = KeyframeList(_property)
+            self.common_keyframes.append(kf_list)
+            self._keyframe_index[_property] = kf_list
+        return kf_list
 
     @property
     def start(self) -> int:
@@ -79,13 +98,15 @@ class BaseSegment:
 class Speed:
     """播放速度对象, 目前只支持固定速度"""
 
+    __slots__ = ("global_id", "speed")
+
     global_id: str
     """全局id, 由程序自动生成"""
     speed: float
     """播放速度"""
 
     def __init__(self, speed: float):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.speed = speed
 
     def export_json(self) -> Dict[str, Any]:
@@ -100,6 +121,8 @@ class Speed:
 class AudioFade:
     """音频淡入淡出效果"""
 
+    __slots__ = ("fade_id", "in_duration", "out_duration")
+
     fade_id: str
     """淡入淡出效果的全局id, 自动生成"""
 
@@ -111,7 +134,7 @@ class AudioFade:
     def __init__(self, in_duration: int, out_duration: int):
         """根据给定的淡入/淡出时长构造一个淡入淡出效果"""
 
-        self.fade_id = uuid.uuid4().hex
+        self.fade_id = generate_id()
         self.in_duration = in_duration
         self.out_duration = out_duration
 
@@ -127,6 +150,8 @@ class AudioFade:
 class ClipSettings:
     """素材片段的图像调节设置"""
 
+    __slots__ = ("alpha", "flip_horizontal", "flip_vertical", "rotation", "scale_x", "scale_y", "transform_x", "transform_y")
+
     alpha: float
     """图像不透明度, 0-1"""
     flip_horizontal: bool
@@ -181,6 +206,8 @@ class ClipSettings:
 class MediaSegment(BaseSegment):
     """媒体片段基类"""
 
+    __slots__ = ("source_timerange", "speed", "volume", "change_pitch", "extra_material_refs")
+
     source_timerange: Optional[Timerange]
     """截取的素材片段的时间范围, 对贴纸而言不存在"""
     speed: Speed
@@ -218,6 +245,8 @@ class MediaSegment(BaseSegment):
 class VisualSegment(MediaSegment):
     """视觉片段基类，用于处理所有可见片段（视频、贴纸、文本）的共同属性和行为"""
 
+    __slots__ = ("clip_settings", "uniform_scale", "animations_instance")
+
     clip_settings: ClipSettings
     """图像调节设置, 其效果可被关键帧覆盖"""
 
@@ -260,23 +289,39 @@ class VisualSegment(MediaSegment):
         Raises:
             `ValueError`: 试图同时设置`uniform_scale`以及`scale_x`或`scale_y`其中一者
         """
+        _property = self.__resolve_scale_property(_property)
+        if isinstance(time_offset, str): time_offset = tim(time_offset)
+
+        self._get_keyframe_list(_property).add_keyframe(time_offset, value)
+        return self
+
+    def add_keyframes(self, _property: KeyframeProperty, time_offsets: Sequence[Union[int, str]],
+                      values: Sequence[float]) -> "VisualSegment":
+        """为给定属性批量创建关键帧, 结果与逐个调用`add_keyframe`相同, 适用于生成密集的运动曲线等场合
+
+        Args:
+            _property (`KeyframeProperty`): 要控制的属性
+            time_offsets (`Sequence[int | str]`): 各关键帧的时间偏移量, 单位为微秒, 可以是NumPy数组. 字符串会调用`tim()`函数进行解析.
+            values (`Sequence[float]`): 属性在各时间偏移量处的值, 可以是NumPy数组
+
+        Raises:
+            `ValueError`: 试图同时设置`uniform_scale`以及`scale_x`或`scale_y`其中一者, 或`time_offsets`与`values`的长度不一致
+        """
+        _property = self.__resolve_scale_property(_property)
+        time_offsets = [tim(t) if isinstance(t, str) else t for t in _as_list(time_offsets)]
+
+        self._get_keyframe_list(_property).add_keyframes(time_offsets, values)
+        return self
+
+    def __resolve_scale_property(self, _property: KeyframeProperty) -> KeyframeProperty:
+        """处理缩放相关属性的互斥关系, 返回实际写入的属性"""
         if (_property == KeyframeProperty.scale_x or _property == KeyframeProperty.scale_y) and self.uniform_scale:
             self.uniform_scale = False
         elif _property == KeyframeProperty.uniform_scale:
             if not self.uniform_scale:
                 raise ValueError("已设置 scale_x 或 scale_y 时, 不能再设置 uniform_scale")
             _property = KeyframeProperty.scale_x
-
-        if isinstance(time_offset, str): time_offset = tim(time_offset)
-
-        for kf_list in self.common_keyframes:
-            if kf_list.keyframe_property == _property:
-                kf_list.add_keyframe(time_offset, value)
-                return self
-        kf_list = KeyframeList(_property)
-        kf_list.add_keyframe(time_offset, value)
-        self.common_keyframes.append(kf_list)
-        return self
+        return _property
 
     def export_json(self) -> Dict[str, Any]:
         """导出通用于所有视觉片段的JSON数据"""
@@ -1,7 +1,8 @@
 """与模板模式相关的类及函数等"""
 
 from enum import Enum
-from copy import deepcopy
+from copy import copy
+from functools import cached_property
 
 from . import util
 from . import exceptions
@@ -10,7 +11,7 @@ from .segment import BaseSegment
 from .track import BaseTrack, TrackType
 from .local_materials import VideoMaterial, AudioMaterial
 
-from typing import List, Dict, Any
+from typing import Optional, List, Dict, Tuple, Any, Iterator
 
 class ShrinkMode(Enum):
     """处理替换素材时素材变短情况的方法"""
@@ -44,16 +45,24 @@ class ImportedSegment(BaseSegment):
     """导入的片段"""
 
     raw_data: Dict[str, Any]
-    """原始json数据"""
+    """原始json数据, 与导入时传入的数据共享且只读, 导出时以片段的可修改属性覆盖其中的相应字段"""
 
     __DATA_ATTRS = ["material_id", "target_timerange"]
     def __init__(self, json_data: Dict[str, Any]):
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = json_data
 
         util.assign_attr_with_json(self, self.__DATA_ATTRS, json_data)
 
+    def clone(self) -> "ImportedSegment":
+        """创建片段的副本, 副本与原片段共享只读的`raw_data`, 但拥有独立的时间范围等可修改属性"""
+        ret = object.__new__(type(self))
+        ret.__dict__.update(self.__dict__)
+        ret.material_id = self.material_id  # `BaseSegment`中定义的属性保存在__slots__中
+        ret.target_timerange = Timerange(self.target_timerange.start, self.target_timerange.duration)
+        return ret
+
     def export_json(self) -> Dict[str, Any]:
-        json_data = deepcopy(self.raw_data)
+        json_data = dict(self.raw_data)
         json_data.update(util.export_attr_to_json(self, self.__DATA_ATTRS))
         return json_data
 
@@ -69,6 +78,12 @@ class ImportedMediaSegment(ImportedSegment):
 
         util.assign_attr_with_json(self, self.__DATA_ATTRS, json_data)
 
+    def clone(self) -> "ImportedMediaSegment":
+        ret = super().clone()
+        assert isinstance(ret, ImportedMediaSegment)
+        ret.source_timerange = Timerange(self.source_timerange.start, self.source_timerange.duration)
+        return ret
+
     def export_json(self) -> Dict[str, Any]:
         json_data = super().export_json()
         json_data.update(util.export_attr_to_json(self, self.__DATA_ATTRS))
@@ -79,7 +94,7 @@ class ImportedTrack(BaseTrack):
     """模板模式下导入的轨道"""
 
     raw_data: Dict[str, Any]
-    """原始轨道数据"""
+    """原始轨道数据, 与导入时传入的数据共享且只读"""
 
     def __init__(self, json_data: Dict[str, Any]):
         self.track_type = TrackType.from_name(json_data["type"])
@@ -87,10 +102,28 @@ class ImportedTrack(BaseTrack):
         self.track_id = json_data["id"]
         self.render_index = max([int(seg["render_index"]) for seg in json_data["segments"]], default=0)
 
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = json_data
 
-    def export_json(self) -> Dict[str, Any]:
-        ret = deepcopy(self.raw_data)
+    @cached_property
+    def end_time(self) -> int:
+        """轨道结束时间, 微秒"""
+        return max([int(seg["target_timerange"]["start"]) + int(seg["target_timerange"]["duration"])
+                    for seg in self.raw_data["segments"]], default=0)
+
+    def clone(self) -> "ImportedTrack":
+        """创建轨道的副本, 副本与原轨道共享只读的`raw_data`, 而不拷贝其中的json数据"""
+        ret = copy(self)
+        ret.mark_dirty()
+        return ret
+
+    def export_json(self, lazy: bool = False) -> Dict[str, Any]:
+        # 只浅拷贝顶层, 未修改的子结构直接引用原始数据
+        if lazy:
+            ret: Dict[str, Any] = util.StreamingDict(self.raw_data)
+            if "segments" in ret:
+                ret["segments"] = iter(ret["segments"])
+        else:
+            ret = dict(self.raw_data)
         ret.update({
             "name": self.name,
             "id": self.track_id
@@ -120,13 +153,22 @@ class EditableTrack(ImportedTrack):
             return 0
         return self.segments[-1].target_timerange.end
 
-    def export_json(self) -> Dict[str, Any]:
-        ret = super().export_json()
-        # 为每个片段写入render_index
-        segment_exports = [seg.export_json() for seg in self.segments]
-        for seg in segment_exports:
-            seg["render_index"] = self.render_index
-        ret["segments"] = segment_exports
+    def clone(self) -> "EditableTrack":
+        ret = super().clone()
+        assert isinstance(ret, EditableTrack)
+        ret.segments = [seg.clone() for seg in self.segments]
+        return ret
+
+    def export_segments(self) -> Iterator[Dict[str, Any]]:
+        """逐个导出轨道上各片段的json数据"""
+        for seg in self.segments:
+            seg_json = seg.export_json()
+            seg_json["render_index"] = self.render_index  # 为每个片段写入render_index
+            yield seg_json
+
+    def export_json(self, lazy: bool = False) -> Dict[str, Any]:
+        ret = super().export_json(lazy)
+        ret["segments"] = self.export_segments() if lazy else list(self.export_segments())
         return ret
 
 class ImportedTextTrack(EditableTrack):
@@ -157,8 +199,55 @@ class ImportedMediaTrack(EditableTrack):
     def process_timerange(self, seg_index: int, src_timerange: Timerange,
                           shrink: ShrinkMode, extend: List[ExtendMode]) -> None:
         """处理素材替换的时间范围变更"""
+        self.process_timeranges([(seg_index, src_timerange)], shrink, extend)
+
+    def process_timeranges(self, replacements: List[Tuple[int, Timerange]],
+                           shrink: ShrinkMode, extend: List[ExtendMode]) -> None:
+        """批量处理素材替换的时间范围变更, 结果与按片段下标升序逐个调用`process_timerange`相同
+
+        各替换引起的后续片段平移量被累加后在一次遍历中统一应用, 故总开销与片段数成线性关系
+
+        Args:
+            replacements (`List[Tuple[int, Timerange]]`): 每项为`(片段下标, 新的素材时间范围)`
+            shrink (`ShrinkMode`): 新素材较短时的处理方式
+            extend (`List[ExtendMode]`): 新素材较长时依次尝试的处理方式
+        """
+        if not replacements:
+            return
+        replacements = sorted(replacements, key=lambda item: item[0])
+
+        offset = 0  # 尚未应用到当前及后续片段上的平移量
+        j = 0
+        i = replacements[0][0]
+        try:
+            while i < len(self.segments):
+                if offset != 0:
+                    self.segments[i].start += offset
+                while j < len(replacements) and replacements[j][0] == i:
+                    next_seg_start = self.segments[i+1].start + offset if i+1 < len(self.segments) else int(1e15)
+                    offset += self.__apply_timerange(i, replacements[j][1], shrink, extend, next_seg_start)
+                    j += 1
+                i += 1
+                if j == len(replacements) and offset == 0:
+                    break
+        except Exception:
+            # 替换失败时仍将已产生的平移应用到后续片段上, 以保持与逐个调用时相同的状态
+            for k in range(i+1, len(self.segments)):
+                self.segments[k].start += offset
+            raise
+        finally:
+            self.mark_dirty()
+
+    def __apply_timerange(self, seg_index: int, src_timerange: Timerange,
+                          shrink: ShrinkMode, extend: List[ExtendMode], next_seg_start: int) -> int:
+        """处理单个片段的素材时间范围变更, 返回后续片段因此需要平移的量
+
+        Args:
+            next_seg_start (`int`): 后一片段当前的实际起始时间
+        """
         seg = self.segments[seg_index]
         new_duration = src_timerange.duration
+        ripple = 0
 
         # 时长变短
         delta_duration = abs(new_duration - seg.duration)
@@ -169,8 +258,7 @@ class ImportedMediaTrack(EditableTrack):
                 seg.duration -= delta_duration
             elif shrink == ShrinkMode.cut_tail_align:
                 seg.duration -= delta_duration
-                for i in range(seg_index+1, len(self.segments)):  # 后续片段也依次前移相应值（保持间隙）
-                    self.segments[i].start -= delta_duration
+                ripple = -delta_duration  # 后续片段也依次前移相应值（保持间隙）
             elif shrink == ShrinkMode.shrink:
                 seg.duration -= delta_duration
                 seg.start += delta_duration // 2
@@ -180,7 +268,6 @@ class ImportedMediaTrack(EditableTrack):
         elif new_duration > seg.duration:
             success_flag = False
             prev_seg_end = int(0) if seg_index == 0 else self.segments[seg_index-1].target_timerange.end
-            next_seg_start = int(1e15) if seg_index == len(self.segments)-1 else self.segments[seg_index+1].start
             for mode in extend:
                 if mode == ExtendMode.extend_head:
                     if seg.start - delta_duration >= prev_seg_end:
@@ -193,9 +280,7 @@ class ImportedMediaTrack(EditableTrack):
                 elif mode == ExtendMode.push_tail:
                     shift_duration = max(0, seg.target_timerange.end + delta_duration - next_seg_start)
                     seg.duration += delta_duration
-                    if shift_duration > 0:  # 有必要时后移后续片段
-                        for i in range(seg_index+1, len(self.segments)):
-                            self.segments[i].start += shift_duration
+                    ripple = shift_duration  # 有必要时后移后续片段
                     success_flag = True
                 elif mode == ExtendMode.cut_material_tail:
                     src_timerange.duration = seg.duration
@@ -210,6 +295,108 @@ class ImportedMediaTrack(EditableTrack):
 
         # 写入素材时间范围
         seg.source_timerange = src_timerange
+        return ripple
+
+class ImportedMaterialIndex:
+    """导入素材(`ScriptFile.imported_materials`)的id及名称索引, 记录每个素材所在的类别及其在列表中的下标
+
+    索引只保存位置而不保存素材对象本身, 故原位替换素材(如写时拷贝)不会使其失效;
+    查找时会校验命中的条目以及各素材列表的对象与长度, 若发现素材列表被直接增删或整体替换则自动重建索引.
+    直接修改列表中某一素材的id或名称则不会被发现, 此时需调用`update`或`rebuild`.
+    """
+
+    NAME_KEYS: Dict[str, str] = {"videos": "material_name"}
+    """各类别素材中表示素材名称的字段, 未列出的类别使用`name`字段"""
+
+    materials: Dict[str, List[Dict[str, Any]]]
+    """被索引的素材字典"""
+
+    _by_id: Dict[str, List[Tuple[str, int]]]
+    _by_name: Dict[Tuple[str, str], List[int]]
+    _sizes: Dict[str, int]
+    _lists: Dict[str, List[Dict[str, Any]]]
+
+    def __init__(self, materials: Dict[str, List[Dict[str, Any]]]):
+        self.materials = materials
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """根据当前的素材字典重新构建索引"""
+        self._by_id = {}
+        self._by_name = {}
+        self._sizes = {}
+        self._lists = {}
+        for material_type, material_list in self.materials.items():
+            self._sizes[material_type] = 0
+            self._lists[material_type] = material_list
+            for material in material_list:
+                self.add(material_type, material)
+
+    def add(self, material_type: str, material: Dict[str, Any]) -> None:
+        """登记一个刚刚追加到`materials[material_type]`末尾的素材"""
+        index = self._sizes.get(material_type, 0)
+        self._sizes[material_type] = index + 1
+        self._lists[material_type] = self.materials[material_type]
+
+        material_id = material.get("id")
+        if material_id is not None:
+            self._by_id.setdefault(material_id, []).append((material_type, index))
+        name = material.get(self.NAME_KEYS.get(material_type, "name"))
+        if name is not None:
+            self._by_name.setdefault((material_type, name), []).append(index)
+
+    def update(self, material_type: str, index: int, old_material: Dict[str, Any]) -> None:
+        """在`materials[material_type][index]`被修改或替换后更新其索引条目
+
+        Args:
+            material_type (`str`): 素材类别
+            index (`int`): 素材在列表中的下标
+            old_material (`Dict[str, Any]`): 修改前的素材(或其拷贝), 用于移除旧的索引条目
+        """
+        name_key = self.NAME_KEYS.get(material_type, "name")
+        new_material = self.materials[material_type][index]
+        if old_material.get("id") != new_material.get("id"):
+            if old_material.get("id") is not None:
+                self._by_id[old_material["id"]].remove((material_type, index))
+            if new_material.get("id") is not None:
+                self._by_id.setdefault(new_material["id"], []).append((material_type, index))
+        if old_material.get(name_key) != new_material.get(name_key):
+            if old_material.get(name_key) is not None:
+                self._by_name[(material_type, old_material[name_key])].remove(index)
+            if new_material.get(name_key) is not None:
+                self._by_name.setdefault((material_type, new_material[name_key]), []).append(index)
+
+    def find_by_id(self, material_id: str) -> List[Tuple[str, int]]:
+        """查找具有指定id的所有素材, 返回`(类别, 下标)`的列表"""
+        entries = self._by_id.get(material_id, [])
+        if not self.__is_valid([self.__check(material_type, index, "id", material_id) for material_type, index in entries]):
+            self.rebuild()
+            entries = self._by_id.get(material_id, [])
+        return entries
+
+    def find_id_in(self, material_type: str, material_id: str) -> Optional[int]:
+        """查找指定类别中具有指定id的第一个素材的下标, 未找到时返回`None`"""
+        # `update`会将条目追加到末尾, 因此条目不一定按下标排序
+        return min((index for entry_type, index in self.find_by_id(material_id) if entry_type == material_type), default=None)
+
+    def find_by_name(self, material_type: str, name: str) -> List[int]:
+        """查找指定类别中具有指定名称的所有素材的下标"""
+        name_key = self.NAME_KEYS.get(material_type, "name")
+        indices = self._by_name.get((material_type, name), [])
+        if not self.__is_valid([self.__check(material_type, index, name_key, name) for index in indices]):
+            self.rebuild()
+            indices = self._by_name.get((material_type, name), [])
+        return indices
+
+    def __check(self, material_type: str, index: int, key: str, value: str) -> bool:
+        material_list = self.materials.get(material_type)
+        return material_list is not None and index < len(material_list) and material_list[index].get(key) == value
+
+    def __is_valid(self, checks: List[bool]) -> bool:
+        """命中的条目均需通过校验, 且素材列表未被绕过索引直接增删或替换"""
+        return all(checks) and len(self._lists) == len(self.materials) and \
+            all(self._lists.get(material_type) is material_list and self._sizes[material_type] == len(material_list)
+                for material_type, material_list in self.materials.items())
 
 def import_track(json_data: Dict[str, Any]) -> ImportedTrack:
     """导入轨道"""
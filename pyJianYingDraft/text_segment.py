@@ -1,18 +1,21 @@
 """定义文本片段及其相关类"""
 
-import json
-import uuid
 from copy import deepcopy
 
 from typing import Dict, Tuple, Any
-from typing import Union, Optional, Literal
+from typing import TYPE_CHECKING, Union, Optional, Literal
 
+from .id_generator import generate_id
+from . import json_backend
 from .time_util import Timerange, tim
 from .segment import ClipSettings, VisualSegment
 from .animation import SegmentAnimations, Text_animation
 
-from .metadata import FontType, EffectMeta
-from .metadata import TextIntro, TextOutro, TextLoopAnim
+from .metadata import EffectMeta
+
+if TYPE_CHECKING:
+    from .metadata import FontType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
 
 class TextStyle:
     """字体样式类"""
@@ -185,7 +188,7 @@ class TextBubble:
     resource_id: str
 
     def __init__(self, effect_id: str, resource_id: str):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.effect_id = effect_id
         self.resource_id = resource_id
 
@@ -255,6 +258,8 @@ class TextShadow:
 class TextSegment(VisualSegment):
     """文本片段类, 目前仅支持设置基本的字体样式"""
 
+    __slots__ = ("text", "font", "style", "border", "background", "shadow", "bubble", "effect")
+
     text: str
     """文本内容"""
     font: Optional[EffectMeta]
@@ -275,7 +280,7 @@ class TextSegment(VisualSegment):
     """文本花字效果, 在放入轨道时加入素材列表中, 目前仅支持一部分花字效果"""
 
     def __init__(self, text: str, timerange: Timerange, *,
-                 font: Optional[FontType] = None,
+                 font: Optional["FontType"] = None,
                  style: Optional[TextStyle] = None, clip_settings: Optional[ClipSettings] = None,
                  border: Optional[TextBorder] = None, background: Optional[TextBackground] = None,
                  shadow: Optional[TextShadow] = None):
@@ -293,7 +298,7 @@ class TextSegment(VisualSegment):
             background (`TextBackground`, optional): 文本背景参数, 默认无背景
             shadow (`TextShadow`, optional): 文本阴影参数, 默认无阴影
         """
-        super().__init__(uuid.uuid4().hex, None, timerange, 1.0, 1.0, False, clip_settings=clip_settings)
+        super().__init__(generate_id(), None, timerange, 1.0, 1.0, False, clip_settings=clip_settings)
 
         self.text = text
         self.font = font.value if font else None
@@ -316,7 +321,7 @@ class TextSegment(VisualSegment):
         # 处理动画等
         if template.animations_instance:
             new_segment.animations_instance = deepcopy(template.animations_instance)
-            new_segment.animations_instance.animation_id = uuid.uuid4().hex
+            new_segment.animations_instance.animation_id = generate_id()
             new_segment.extra_material_refs.append(new_segment.animations_instance.animation_id)
         if template.bubble:
             new_segment.add_bubble(template.bubble.effect_id, template.bubble.resource_id)
@@ -325,7 +330,7 @@ class TextSegment(VisualSegment):
 
         return new_segment
 
-    def add_animation(self, animation_type: Union[TextIntro, TextOutro, TextLoopAnim],
+    def add_animation(self, animation_type: Union["TextIntro", "TextOutro", "TextLoopAnim"],
                       duration: Union[str, float, None] = None) -> "TextSegment":
         """将给定的入场/出场/循环动画添加到此片段的动画列表中, 出入场动画的持续时间可以自行设置, 循环动画则会自动填满其余无动画部分
 
@@ -336,6 +341,8 @@ class TextSegment(VisualSegment):
             duration (`str` or `float`, optional): 动画持续时间, 单位为微秒, 仅对入场/出场动画有效.
                 若传入字符串则会调用`tim()`函数进行解析. 默认使用动画的时长
         """
+        from .metadata import TextIntro, TextOutro, TextLoopAnim
+
         if duration is None:
             duration = animation_type.value.duration
         duration = min(tim(duration), self.target_timerange.duration)
@@ -430,7 +437,7 @@ class TextSegment(VisualSegment):
 
         ret = {
             "id": self.material_id,
-            "content": json.dumps(content_json, ensure_ascii=False),
+            "content": json_backend.dumps(content_json),
 
             "typesetting": int(self.style.vertical),
             "alignment": self.style.align,
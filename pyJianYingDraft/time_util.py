@@ -1,11 +1,25 @@
 """定义时间范围类以及与时间相关的辅助函数"""
 
-from typing import Union
-from typing import Dict
+import re
+from functools import lru_cache
+
+from typing import Optional, Union
+from typing import Dict, List, Sequence, Iterable, Iterator, Any
 
 SEC = 1000000
 """一秒=1e6微秒"""
 
+_NUMBER = r"(\d+(?:\.\d*)?|\.\d+)"
+_TIM_PATTERN = re.compile(r"(-)?(?:%sh)?(?:%sm)?(?:%ss)?" % (_NUMBER, _NUMBER, _NUMBER))
+"""`tim`所接受的常规格式(去除首尾空白并转为小写后), 如`1h52m3s`, `-0.15s`;
+不匹配此格式的输入(如含有内部空格、指数或正号)交由`_parse_tim_fallback`处理"""
+_SRT_TSTAMP_PATTERN = re.compile(r"(\d+):(\d+):(\d+),(\d+)")
+"""srt时间戳的常规格式, 如`00:01:02,500`; 不匹配此格式的输入(如含有空白)交由`_srt_tstamp_fallback`处理"""
+_SRT_DIGIT_COLUMNS = [0, 1, 3, 4, 6, 7, 9, 10, 11]
+"""标准srt时间戳`hh:mm:ss,mmm`中各数字所在的位置"""
+_SRT_DIGIT_WEIGHTS = [36000*SEC, 3600*SEC, 600*SEC, 60*SEC, 10*SEC, SEC, 100000, 10000, 1000]
+"""上述各位数字对应的微秒数"""
+
 def tim(inp: Union[str, float]) -> int:
     """将输入的字符串转换为微秒, 也可直接输入微秒数
 
@@ -13,7 +27,27 @@ def tim(inp: Union[str, float]) -> int:
     """
     if isinstance(inp, (int, float)):
         return int(round(inp))
+    return _parse_tim(inp)
+
+@lru_cache(maxsize=1024)
+def _parse_tim(inp: str) -> int:
+    match = _TIM_PATTERN.fullmatch(inp.strip().lower())
+    if match is None:
+        return _parse_tim_fallback(inp)
+
+    negative, hours, minutes, seconds = match.groups()
+    # 与`_parse_tim_fallback`保持相同的累加顺序, 以保证舍入结果一致
+    total_time: float = 0
+    if hours is not None:
+        total_time += float(hours) * (3600*SEC)
+    if minutes is not None:
+        total_time += float(minutes) * (60*SEC)
+    if seconds is not None:
+        total_time += float(seconds) * SEC
+    return int(round(total_time) * (-1 if negative else 1))
 
+def _parse_tim_fallback(inp: str) -> int:
+    """逐个查找单位的原始解析方式, 用于不符合常规格式的输入(如"1m30"), 保持此前的行为及报错"""
     sign: int = 1
     inp = inp.strip().lower()
     if inp.startswith("-"):
@@ -33,6 +67,9 @@ def tim(inp: Union[str, float]) -> int:
 
 class Timerange:
     """记录了起始时间及持续长度的时间范围"""
+
+    __slots__ = ("start", "duration")
+
     start: int
     """起始时间, 单位为微秒"""
     duration: int
@@ -77,6 +114,177 @@ class Timerange:
     def export_json(self) -> Dict[str, int]:
         return {"start": self.start, "duration": self.duration}
 
+class TimerangeArray:
+    """以NumPy int64数组存储的一组时间范围, 用于对大量时间范围进行向量化的批量运算
+
+    各运算均返回新的`TimerangeArray`而不修改原数组, 可通过`to_timeranges`或`write_to`转换回`Timerange`对象.
+    """
+
+    starts: Any
+    """各时间范围的起始时间, 单位为微秒, 形状为(n,)的int64数组"""
+    durations: Any
+    """各时间范围的持续长度, 单位为微秒, 形状为(n,)的int64数组"""
+
+    def __init__(self, starts: Sequence[int], durations: Sequence[int]):
+        """由起始时间及持续长度序列构造, 二者均可为NumPy数组, 数据总会被复制
+
+        Raises:
+            `ValueError`: `starts`与`durations`的形状不一致或不是一维的
+        """
+        import numpy as np
+
+        self.starts = np.array(starts, dtype=np.int64).reshape(-1)
+        self.durations = np.array(durations, dtype=np.int64).reshape(-1)
+        if self.starts.shape != self.durations.shape:
+            raise ValueError(f"起始时间的数量({self.starts.size})与持续长度的数量({self.durations.size})不一致")
+
+    @classmethod
+    def from_timeranges(cls, timeranges: Iterable[Timerange]) -> "TimerangeArray":
+        """由一系列`Timerange`构造"""
+        timeranges = list(timeranges)
+        return cls([tr.start for tr in timeranges], [tr.duration for tr in timeranges])
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Any]) -> "TimerangeArray":
+        """由一系列片段的`target_timerange`构造"""
+        return cls.from_timeranges(seg.target_timerange for seg in segments)
+
+    def to_timeranges(self) -> List[Timerange]:
+        """转换为`Timerange`列表"""
+        return [Timerange(start, duration) for start, duration in zip(self.starts.tolist(), self.durations.tolist())]
+
+    def write_to(self, timeranges: Sequence[Timerange]) -> None:
+        """将各时间范围写回到给定的`Timerange`对象中(如片段的`target_timerange`), 二者按位置一一对应
+
+        Raises:
+            `ValueError`: `timeranges`的数量与此数组的长度不一致
+        """
+        if len(timeranges) != len(self):
+            raise ValueError(f"Timerange对象的数量({len(timeranges)})与数组长度({len(self)})不一致")
+        for tr, start, duration in zip(timeranges, self.starts.tolist(), self.durations.tolist()):
+            tr.start = start
+            tr.duration = duration
+
+    @property
+    def ends(self) -> Any:
+        """各时间范围的结束时间, 单位为微秒"""
+        return self.starts + self.durations
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Any) -> Union[Timerange, "TimerangeArray"]:
+        """整数下标返回`Timerange`, 切片、下标数组或布尔掩码返回`TimerangeArray`"""
+        import numpy as np
+
+        if isinstance(index, (int, np.integer)):
+            return Timerange(int(self.starts[index]), int(self.durations[index]))
+        return TimerangeArray(self.starts[index], self.durations[index])
+
+    def __iter__(self) -> Iterator[Timerange]:
+        return iter(self.to_timeranges())
+
+    def __eq__(self, other: object) -> bool:
+        import numpy as np
+
+        if not isinstance(other, TimerangeArray):
+            return False
+        return bool(np.array_equal(self.starts, other.starts) and np.array_equal(self.durations, other.durations))
+
+    def __repr__(self) -> str:
+        return f"TimerangeArray(starts={self.starts!r}, durations={self.durations!r})"
+
+    def shift(self, offset: Union[int, Sequence[int]]) -> "TimerangeArray":
+        """平移各时间范围, 持续长度不变
+
+        Args:
+            offset (`int` or `Sequence[int]`): 平移量, 单位为微秒, 可为每个时间范围分别指定
+        """
+        import numpy as np
+        return TimerangeArray(self.starts + np.asarray(offset, dtype=np.int64), self.durations)
+
+    def scale(self, factor: float, origin: int = 0) -> "TimerangeArray":
+        """以`origin`为中心缩放时间轴, 起始时间与结束时间均按比例变换后四舍五入到微秒
+
+        Args:
+            factor (`float`): 缩放比例, 须为正数
+            origin (`int`, optional): 缩放中心, 单位为微秒, 默认为0
+
+        Raises:
+            `ValueError`: 缩放比例不为正
+        """
+        import numpy as np
+
+        if factor <= 0:
+            raise ValueError("缩放比例必须为正")
+        starts = np.rint((self.starts - origin) * factor).astype(np.int64) + origin
+        ends = np.rint((self.ends - origin) * factor).astype(np.int64) + origin
+        return TimerangeArray(starts, ends - starts)
+
+    def snap(self, fps: float) -> "TimerangeArray":
+        """将起始时间及结束时间分别对齐到最近的帧边界, 第k帧的时刻为`round(k * SEC / fps)`
+
+        Args:
+            fps (`float`): 帧率
+
+        Raises:
+            `ValueError`: 帧率不为正
+        """
+        import numpy as np
+
+        if fps <= 0:
+            raise ValueError("帧率必须为正")
+        starts = np.rint(np.rint(self.starts * (fps / SEC)) * (SEC / fps)).astype(np.int64)
+        ends = np.rint(np.rint(self.ends * (fps / SEC)) * (SEC / fps)).astype(np.int64)
+        return TimerangeArray(starts, ends - starts)
+
+    def clamp(self, min_start: Optional[int] = 0, max_end: Optional[int] = None) -> "TimerangeArray":
+        """将各时间范围裁剪到`[min_start, max_end]`之内, 完全落在范围外的时间范围长度变为0
+
+        Args:
+            min_start (`int`, optional): 允许的最早起始时间, 默认为0, 为`None`时不限制
+            max_end (`int`, optional): 允许的最晚结束时间, 默认不限制
+        """
+        import numpy as np
+
+        starts, ends = self.starts, self.ends
+        if min_start is not None:
+            starts, ends = np.maximum(starts, min_start), np.maximum(ends, min_start)
+        if max_end is not None:
+            starts, ends = np.minimum(starts, max_end), np.minimum(ends, max_end)
+        return TimerangeArray(starts, ends - starts)
+
+    def overlaps(self, other: Timerange) -> Any:
+        """逐个判断各时间范围是否与给定的时间范围有重叠, 判定规则与`Timerange.overlaps`相同
+
+        Returns:
+            `numpy.ndarray`: 布尔数组
+        """
+        return ~((self.ends <= other.start) | (other.end <= self.starts))
+
+    def find_overlaps(self) -> Any:
+        """查找数组内部相互重叠的时间范围, 可用于检查一批片段能否放入同一轨道
+
+        按起始时间排序后, 对每个与在其之前开始的某个时间范围重叠的元素, 给出一对下标`(i, j)`,
+        其中`j`为该元素, `i`为在其之前开始且结束最晚的时间范围. 长度为0的时间范围不参与判断, 没有重叠时返回空数组.
+
+        Returns:
+            `numpy.ndarray`: 形状为(k, 2)的int64数组, 下标均为在原数组中的位置
+        """
+        import numpy as np
+
+        candidates = np.flatnonzero(self.durations > 0)
+        if len(candidates) < 2:
+            return np.empty((0, 2), dtype=np.int64)
+        order = candidates[np.argsort(self.starts[candidates], kind="stable")]
+        starts, ends = self.starts[order], self.ends[order]
+        # 此前各时间范围中结束最晚者的位置
+        latest = np.maximum.accumulate(np.where(ends == np.maximum.accumulate(ends), np.arange(len(ends)), 0))
+        prev = latest[:-1]
+        cur = np.arange(1, len(ends))
+        conflict = ~((ends[prev] <= starts[cur]) | (ends[cur] <= starts[prev]))
+        return np.stack([order[prev[conflict]], order[cur[conflict]]], axis=1)
+
 def trange(start: Union[str, float], duration: Union[str, float]) -> Timerange:
     """Timerange的简便构造函数, 接受字符串或微秒数作为参数
 
@@ -90,6 +298,13 @@ def trange(start: Union[str, float], duration: Union[str, float]) -> Timerange:
 
 def srt_tstamp(srt_tstamp: str) -> int:
     """解析srt中的时间戳字符串, 返回微秒数"""
+    match = _SRT_TSTAMP_PATTERN.fullmatch(srt_tstamp)
+    if match is not None:
+        hours, minutes, seconds, millis = match.groups()
+        return int(hours) * (3600*SEC) + int(minutes) * (60*SEC) + int(seconds) * SEC + int(millis) * 1000
+    return _srt_tstamp_fallback(srt_tstamp)
+
+def _srt_tstamp_fallback(srt_tstamp: str) -> int:
     sec_str, ms_str = srt_tstamp.split(",")
     parts = sec_str.split(":") + [ms_str]
 
@@ -97,3 +312,33 @@ def srt_tstamp(srt_tstamp: str) -> int:
     for value, factor in zip(parts, [3600*SEC, 60*SEC, SEC, 1000]):
         total_time += int(value) * factor
     return total_time
+
+def srt_tstamps(srt_tstamps: Sequence[str]) -> List[int]:
+    """批量解析srt中的时间戳字符串, 结果与逐个调用`srt_tstamp`相同
+
+    全部时间戳均为标准的`hh:mm:ss,mmm`格式时以NumPy一次性解析, 在时间戳数量较多时快得多
+
+    Args:
+        srt_tstamps (`Sequence[str]`): 时间戳字符串, 如`00:01:02,500`
+
+    Returns:
+        `List[int]`: 各时间戳对应的微秒数
+
+    Raises:
+        `ValueError`: 存在无法解析的时间戳
+    """
+    import numpy as np
+
+    srt_tstamps = list(srt_tstamps)
+    if srt_tstamps and all(len(tstamp) == 12 for tstamp in srt_tstamps):
+        try:
+            chars = np.frombuffer("".join(srt_tstamps).encode("ascii"), dtype=np.uint8).reshape(-1, 12)
+        except UnicodeEncodeError:
+            chars = None
+        if chars is not None:
+            digits = chars[:, _SRT_DIGIT_COLUMNS].astype(np.int64) - ord("0")
+            if (chars[:, [2, 5]] == ord(":")).all() and (chars[:, 8] == ord(",")).all() \
+                    and ((digits >= 0) & (digits <= 9)).all():
+                return (digits @ _SRT_DIGIT_WEIGHTS).tolist()
+    # 存在非标准格式的时间戳, 逐个解析以给出与`srt_tstamp`相同的结果或报错
+    return [srt_tstamp(tstamp) for tstamp in srt_tstamps]
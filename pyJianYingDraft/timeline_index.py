@@ -0,0 +1,218 @@
+"""草稿时间线上所有片段的区间索引, 用于查询某一时刻或某一时间范围内有哪些片段(含特效、滤镜等)"""
+
+import bisect
+from dataclasses import dataclass
+
+from typing import Optional, Union, Iterable
+from typing import Dict, List, Tuple, Any
+
+from .segment import BaseSegment
+from .track import BaseTrack, TrackType
+
+@dataclass
+class TimelineItem:
+    """时间线上的一个片段"""
+
+    track: BaseTrack
+    """片段所在的轨道"""
+    segment: Union[BaseSegment, Dict[str, Any]]
+    """片段对象; 对于不可修改的导入轨道(如导入的特效、滤镜轨道)为片段的原始json数据"""
+    start: int
+    """片段在轨道上的起始时间, 单位为微秒"""
+    end: int
+    """片段在轨道上的结束时间, 单位为微秒"""
+    order: int
+    """片段在索引中的序号, 按轨道及轨道内的先后顺序排列, 查询结果按`(start, order)`排序"""
+
+    @property
+    def track_type(self) -> TrackType:
+        """片段所在轨道的类型"""
+        return self.track.track_type
+
+class _IntervalNode:
+    """中心区间树的节点"""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    center: int
+    by_start: List[TimelineItem]
+    """包含`center`的区间, 按起始时间升序排列"""
+    by_end: List[TimelineItem]
+    """包含`center`的区间, 按结束时间降序排列"""
+    left: Optional["_IntervalNode"]
+    """完全位于`center`之前的区间"""
+    right: Optional["_IntervalNode"]
+    """完全位于`center`之后的区间"""
+
+    def __init__(self, items: List[TimelineItem]):
+        starts = sorted(item.start for item in items)
+        self.center = center = starts[len(starts) // 2]
+
+        left: List[TimelineItem] = []
+        right: List[TimelineItem] = []
+        middle: List[TimelineItem] = []
+        for item in items:
+            if item.end <= center:
+                left.append(item)
+            elif item.start > center:
+                right.append(item)
+            else:
+                middle.append(item)
+        # 起始时间为中位数的区间长度为正, 必然落入middle, 故左右子树的规模严格减小
+        self.by_start = sorted(middle, key=lambda item: item.start)
+        self.by_end = sorted(middle, key=lambda item: item.end, reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+class TimelineIndex:
+    """草稿中所有轨道(包括导入的轨道)上片段的静态区间索引
+
+    基于中心区间树实现, 构建的复杂度为O(n log n), 时刻查询及范围查询的复杂度均为O(log n + k), 其中k为结果数.
+    片段的时间范围按左闭右开处理, 即片段在`[start, end)`内处于活动状态.
+
+    索引构建后不会跟随草稿的变化而更新, 请通过`ScriptFile.get_timeline_index`获取, 其会在草稿被修改后自动重建索引.
+    """
+
+    item_count: int
+    """索引中的片段数量"""
+
+    _root: Optional[_IntervalNode]
+    _tracks: List[BaseTrack]
+    """构建索引时的轨道, 持有其引用以保证签名中的id不被复用"""
+    _signature: Tuple[Tuple[int, int], ...]
+    _starts: List[int]
+    """所有片段(包括长度为0的片段)的起始时间, 升序排列"""
+    _by_start: List[TimelineItem]
+    """与`_starts`一一对应的片段"""
+
+    def __init__(self, tracks: Iterable[BaseTrack]):
+        """为给定的轨道构建索引
+
+        Args:
+            tracks (`Iterable[BaseTrack]`): 要索引的轨道, 可混合本库创建的轨道及导入的轨道
+        """
+        self._tracks = tracks = list(tracks)
+        self._signature = _signature(tracks)
+        items: List[TimelineItem] = []
+        for track in tracks:
+            for segment, start, end in _track_segments(track):
+                items.append(TimelineItem(track, segment, start, end, len(items)))
+
+        self.item_count = len(items)
+        self._by_start = sorted(items, key=lambda item: (item.start, item.order))
+        self._starts = [item.start for item in self._by_start]
+        # 长度为0的片段不会在任何时刻处于活动状态, 只需在范围查询中经由`_starts`找到
+        positive = [item for item in items if item.end > item.start]
+        self._root = _IntervalNode(positive) if positive else None
+
+    def __len__(self) -> int:
+        return self.item_count
+
+    def is_current(self, tracks: Iterable[BaseTrack]) -> bool:
+        """粗略检查索引是否仍与给定的轨道一致, 即轨道本身及各轨道的片段数量均未变化
+
+        不能发现对已有片段时间范围的直接修改
+        """
+        return _signature(tracks) == self._signature
+
+    def at(self, time: int, *, track_type: Optional[TrackType] = None) -> List[TimelineItem]:
+        """查询在给定时刻处于活动状态的片段, 即满足`start <= time < end`的片段
+
+        Args:
+            time (`int`): 查询时刻, 单位为微秒
+            track_type (`TrackType`, optional): 若指定, 则只返回此类型轨道上的片段
+
+        Returns:
+            `List[TimelineItem]`: 按起始时间排序的片段
+        """
+        result = self.__stab(time)
+        return _finish(result, track_type)
+
+    def overlapping(self, start: int, end: int, *, track_type: Optional[TrackType] = None) -> List[TimelineItem]:
+        """查询与时间范围`[start, end)`有重叠的片段, 判定规则与`Timerange.overlaps`相同
+
+        Args:
+            start (`int`): 范围起始时间, 单位为微秒
+            end (`int`): 范围结束时间, 单位为微秒
+            track_type (`TrackType`, optional): 若指定, 则只返回此类型轨道上的片段
+
+        Returns:
+            `List[TimelineItem]`: 按起始时间排序的片段
+
+        Raises:
+            `ValueError`: `end`小于`start`
+        """
+        if end < start:
+            raise ValueError(f"结束时间({end})不能小于起始时间({start})")
+        if end == start:
+            return []
+        # 在start时刻活动的片段, 加上起始时间位于(start, end)内的片段, 二者互不重复
+        result = self.__stab(start)
+        lo = bisect.bisect_right(self._starts, start)
+        hi = bisect.bisect_left(self._starts, end, lo)
+        result.extend(self._by_start[lo:hi])
+        return _finish(result, track_type)
+
+    def covering(self, start: int, end: int, *, track_type: Optional[TrackType] = None) -> List[TimelineItem]:
+        """查询完整覆盖时间范围`[start, end)`的片段, 即满足`item.start <= start`且`item.end >= end`的片段
+
+        Args:
+            start (`int`): 范围起始时间, 单位为微秒
+            end (`int`): 范围结束时间, 单位为微秒
+            track_type (`TrackType`, optional): 若指定, 则只返回此类型轨道上的片段
+
+        Returns:
+            `List[TimelineItem]`: 按起始时间排序的片段
+
+        Raises:
+            `ValueError`: `end`小于`start`
+        """
+        if end < start:
+            raise ValueError(f"结束时间({end})不能小于起始时间({start})")
+        result = [item for item in self.__stab(start) if item.end >= end]
+        return _finish(result, track_type)
+
+    def __stab(self, time: int) -> List[TimelineItem]:
+        """返回所有满足`start <= time < end`的片段, 不保证顺序"""
+        result: List[TimelineItem] = []
+        node = self._root
+        while node is not None:
+            if time < node.center:
+                for item in node.by_start:
+                    if item.start > time:
+                        break
+                    result.append(item)
+                node = node.left
+            else:
+                for item in node.by_end:
+                    if item.end <= time:
+                        break
+                    result.append(item)
+                node = node.right
+        return result
+
+def _finish(items: List[TimelineItem], track_type: Optional[TrackType]) -> List[TimelineItem]:
+    if track_type is not None:
+        items = [item for item in items if item.track.track_type == track_type]
+    items.sort(key=lambda item: (item.start, item.order))
+    return items
+
+def _track_segments(track: BaseTrack) -> Iterable[Tuple[Union[BaseSegment, Dict[str, Any]], int, int]]:
+    """逐个给出轨道上的片段及其起止时间"""
+    segments = getattr(track, "segments", None)
+    if segments is not None:
+        for segment in segments:
+            yield segment, segment.start, segment.end
+        return
+    # 不可修改的导入轨道只保存有原始json数据
+    for segment in track.raw_data["segments"]:  # type: ignore
+        start = int(segment["target_timerange"]["start"])
+        yield segment, start, start + int(segment["target_timerange"]["duration"])
+
+def _signature(tracks: Iterable[BaseTrack]) -> Tuple[Tuple[int, int], ...]:
+    """由各轨道及其片段数量构成的签名, 用于发现绕过`ScriptFile`接口对轨道进行的增删"""
+    ret: List[Tuple[int, int]] = []
+    for track in tracks:
+        segments = getattr(track, "segments", None)
+        ret.append((id(track), len(segments) if segments is not None else len(track.raw_data["segments"])))  # type: ignore
+    return tuple(ret)
@@ -1,14 +1,16 @@
 """轨道类及其元数据"""
 
-import uuid
+import bisect
 
 from enum import Enum
 from typing import TypeVar, Generic, Type
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Union, Optional, Iterator
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
+from .id_generator import generate_id
 from .exceptions import SegmentOverlap
+from .util import StreamingDict
 from .segment import BaseSegment
 from .video_segment import VideoSegment, StickerSegment
 from .audio_segment import AudioSegment
@@ -65,8 +67,45 @@ class BaseTrack(ABC):
     render_index: int
     """渲染顺序, 值越大越接近前景"""
 
+    _export_cache: Optional[Dict[str, Any]] = None
+    """上次增量导出的结果, 为`None`表示轨道自上次增量导出以来已被修改"""
+
+    @property
+    def dirty(self) -> bool:
+        """轨道自上次增量导出以来是否被修改过"""
+        return self._export_cache is None
+
+    def mark_dirty(self) -> None:
+        """标记轨道已被修改, 使下次增量导出时重新导出此轨道
+
+        通过本库的接口修改轨道时会自动标记, 仅在直接修改了轨道或其中片段的属性后需要手动调用
+        """
+        self._export_cache = None
+
+    def export_json_cached(self, lazy: bool = False) -> Dict[str, Any]:
+        """增量导出轨道的json数据, 若轨道自上次调用以来未被修改则直接返回上次的结果
+
+        返回值会被缓存, 不应修改
+
+        Args:
+            lazy (`bool`, optional): 为真时返回`StreamingDict`, 其中的片段列表以迭代器形式给出, 供`util.write_json`流式写入. 默认为否.
+        """
+        if self._export_cache is None:
+            self._export_cache = self.export_json()
+        if not lazy:
+            return self._export_cache
+        ret = StreamingDict(self._export_cache)
+        if "segments" in ret:
+            ret["segments"] = iter(ret["segments"])
+        return ret
+
     @abstractmethod
-    def export_json(self) -> Dict[str, Any]: ...
+    def export_json(self, lazy: bool = False) -> Dict[str, Any]:
+        """导出轨道的json数据
+
+        Args:
+            lazy (`bool`, optional): 为真时返回`StreamingDict`, 其中的片段列表以生成器形式逐个导出, 供`util.write_json`流式写入. 默认为否.
+        """
 
 Seg_type = TypeVar("Seg_type", bound=BaseSegment)
 class Track(BaseTrack, Generic[Seg_type]):
@@ -76,32 +115,60 @@ class Track(BaseTrack, Generic[Seg_type]):
     """是否静音"""
 
     segments: List[Seg_type]
-    """该轨道包含的片段列表"""
+    """该轨道包含的片段列表, 按起始时间升序排列
+
+    请通过`add_segment`添加片段, 且片段加入轨道后不应再修改其时间范围, 否则会破坏轨道的时间索引
+    """
+
+    _segment_starts: List[int]
+    """与`segments`一一对应的片段起始时间, 供二分查找使用"""
+    _end_time: int
 
     def __init__(self, track_type: TrackType, name: str, render_index: int, mute: bool):
         self.track_type = track_type
         self.name = name
-        self.track_id = uuid.uuid4().hex
+        self.track_id = generate_id()
         self.render_index = render_index
 
         self.mute = mute
         self.segments = []
+        self._segment_starts = []
+        self._end_time = 0
 
     @property
     def end_time(self) -> int:
         """轨道结束时间, 微秒"""
-        if len(self.segments) == 0:
-            return 0
-        return self.segments[-1].target_timerange.end
+        return self._end_time
 
     @property
     def accept_segment_type(self) -> Type[Seg_type]:
         """返回该轨道允许的片段类型"""
         return self.track_type.value.segment_type  # type: ignore
 
+    def find_overlap(self, segment: BaseSegment) -> Optional[Seg_type]:
+        """在轨道中查找一个与给定片段重叠的片段, 不存在时返回`None`
+
+        由于轨道内片段按起始时间排序且互不重叠, 只需检查新片段前后相邻的片段, 复杂度为O(log n)
+        """
+        index = bisect.bisect_right(self._segment_starts, segment.start)
+
+        # 后一个片段: 起始时间不早于新片段, 若它不重叠则更靠后的片段也不会重叠
+        if index < len(self.segments) and self.segments[index].overlaps(segment):
+            return self.segments[index]
+        # 前面的片段: 只有长度为0的片段才会使更早片段的结束时间越过其起始时间, 故遇到非零长片段即可停止
+        for i in range(index - 1, -1, -1):
+            seg = self.segments[i]
+            if seg.overlaps(segment):
+                return seg
+            if seg.duration > 0:
+                break
+        return None
+
     def add_segment(self, segment: Seg_type) -> "Track[Seg_type]":
         """向轨道中添加一个片段, 添加的片段必须匹配轨道类型且不与现有片段重叠
 
+        片段可以按任意顺序添加, 轨道会保持片段按起始时间有序
+
         Args:
             segment (Seg_type): 要添加的片段
 
@@ -113,26 +180,57 @@ class Track(BaseTrack, Generic[Seg_type]):
             raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
 
         # 检查片段是否重叠
-        for seg in self.segments:
-            if seg.overlaps(segment):
-                raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
-                                     .format(segment.target_timerange.start, segment.target_timerange.end))
+        if self.find_overlap(segment) is not None:
+            raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                 .format(segment.target_timerange.start, segment.target_timerange.end))
+
+        index = bisect.bisect_right(self._segment_starts, segment.start)
+        self._segment_starts.insert(index, segment.start)
+        self.segments.insert(index, segment)
+        self._end_time = max(self._end_time, segment.end)
+        self.mark_dirty()
+        return self
+
+    def remove_segment(self, segment: Seg_type) -> "Track[Seg_type]":
+        """从轨道中移除一个片段, 片段所引用的素材不会被移除
+
+        请通过此方法而非直接修改`segments`来移除片段, 以保持轨道的时间索引有效
+
+        Args:
+            segment (Seg_type): 要移除的片段, 必须是已加入此轨道的片段对象
 
-        self.segments.append(segment)
+        Raises:
+            `ValueError`: 片段不在此轨道中
+        """
+        lo = bisect.bisect_left(self._segment_starts, segment.start)
+        hi = bisect.bisect_right(self._segment_starts, segment.start)
+        for index in range(lo, hi):
+            if self.segments[index] is segment:
+                break
+        else:
+            raise ValueError("Segment is not in the track")
+
+        del self._segment_starts[index]
+        del self.segments[index]
+        if segment.end >= self._end_time:
+            self._end_time = max((seg.end for seg in self.segments), default=0)
+        self.mark_dirty()
         return self
 
-    def export_json(self) -> Dict[str, Any]:
-        # 为每个片段写入render_index
-        segment_exports = [seg.export_json() for seg in self.segments]
-        for seg in segment_exports:
-            seg["render_index"] = self.render_index
+    def export_segments(self) -> Iterator[Dict[str, Any]]:
+        """逐个导出轨道上各片段的json数据"""
+        for seg in self.segments:
+            seg_json = seg.export_json()
+            seg_json["render_index"] = self.render_index  # 为每个片段写入render_index
+            yield seg_json
 
-        return {
+    def export_json(self, lazy: bool = False) -> Dict[str, Any]:
+        return (StreamingDict if lazy else dict)({
             "attribute": int(self.mute),
             "flag": 0,
             "id": self.track_id,
             "is_default_name": len(self.name) == 0,
             "name": self.name,
-            "segments": segment_exports,
+            "segments": self.export_segments() if lazy else list(self.export_segments()),
             "type": self.track_type.name
-        }
+        })
@@ -1,9 +1,12 @@
 """辅助函数，主要与模板模式有关"""
 
 import inspect
+from itertools import chain
 
-from typing import Union, Type
-from typing import List, Dict, Any
+from typing import Union, Type, Optional
+from typing import List, Dict, Any, Iterator, TextIO
+
+from . import json_backend
 
 JsonExportable = Union[int, float, bool, str, List["JsonExportable"], Dict[str, "JsonExportable"]]
 
@@ -56,3 +59,60 @@ def export_attr_to_json(obj: object, attrs: List[str]) -> Dict[str, JsonExportab
         else:
             json_data[attr] = getattr(obj, attr)
     return json_data
+
+class StreamingDict(Dict[str, Any]):
+    """可流式写入的json对象, 供`write_json`使用
+
+    其值可以是生成器等迭代器, 写入时视为json数组并逐项展开, 从而无需事先构造完整的列表
+    """
+
+def write_json(fp: TextIO, obj: Any, *, indent: Optional[int] = 4) -> None:
+    """将json数据逐块写入`fp`, 不在内存中构造完整的json字符串
+
+    `StreamingDict`及迭代器会被逐项展开写入, 其余值直接交由当前的JSON后端(见`json_backend`)编码
+
+    Args:
+        fp (`TextIO`): 以文本模式打开的文件对象
+        obj (`Any`): 要写入的json数据
+        indent (`int`, optional): 缩进空格数, 默认为4, 此时输出与`json_backend.dumps(obj, indent=4)`完全一致.
+            为`None`时输出不含任何空白的紧凑格式.
+    """
+    for chunk in _iter_json_chunks(obj, indent, 0):
+        fp.write(chunk)
+
+def _iter_json_chunks(obj: Any, indent: Optional[int], level: int) -> Iterator[str]:
+    key_separator = ":" if indent is None else ": "
+    if isinstance(obj, StreamingDict):
+        items: Iterator[Any] = iter(obj.items())
+        is_dict = True
+    elif isinstance(obj, Iterator):
+        items = obj
+        is_dict = False
+    else:
+        text = json_backend.dumps(obj, indent)
+        if indent is not None and level > 0:
+            text = text.replace("\n", "\n" + " " * (indent * level))  # json字符串内的换行总是被转义, 故可以直接替换
+        yield text
+        return
+
+    open_bracket, close_bracket = ("{", "}") if is_dict else ("[", "]")
+    sentinel = object()
+    first = next(items, sentinel)
+    if first is sentinel:
+        yield open_bracket + close_bracket
+        return
+
+    if indent is None:
+        item_prefix, closing_prefix = "", ""
+    else:
+        item_prefix = "\n" + " " * (indent * (level + 1))
+        closing_prefix = "\n" + " " * (indent * level)
+
+    yield open_bracket
+    for i, item in enumerate(chain([first], items)):
+        yield ("," + item_prefix) if i > 0 else item_prefix
+        if is_dict:
+            key, item = item
+            yield json_backend.dumps(key) + key_separator
+        yield from _iter_json_chunks(item, indent, level + 1)
+    yield closing_prefix + close_bracket
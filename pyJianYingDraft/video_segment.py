@@ -3,22 +3,21 @@
 包含图像调节设置、动画效果、特效、转场等相关类
 """
 
-import uuid
-from copy import deepcopy
-
-from typing import Optional, Literal, Union
+from typing import TYPE_CHECKING, Optional, Literal, Union
 from typing import Dict, List, Tuple, Any
 
+from .id_generator import generate_id
 from .time_util import tim, Timerange
 from .segment import VisualSegment, ClipSettings, AudioFade
-from .local_materials import VideoMaterial
+from .local_materials import VideoMaterial, CropSettings
 from .animation import SegmentAnimations, VideoAnimation
 
-from .metadata import EffectMeta, EffectParamInstance
-from .metadata import MaskMeta, MaskType, FilterType, TransitionType
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType
-from .metadata.mix_mode_meta import MixModeType
+from .metadata import EffectMeta, EffectParamInstance, MaskMeta
+
+if TYPE_CHECKING:
+    from .metadata import MaskType, FilterType, TransitionType, MixModeType
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType
 
 class Mask:
     """蒙版对象"""
@@ -47,7 +46,7 @@ class Mask:
                  cx: float, cy: float, w: float, h: float,
                  ratio: float, rot: float, inv: bool, feather: float, round_corner: float):
         self.mask_meta = mask_meta
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
 
         self.center_x, self.center_y = cx, cy
         self.width, self.height = w, h
@@ -99,13 +98,14 @@ class VideoEffect:
 
     adjust_params: List[EffectParamInstance]
 
-    def __init__(self, effect_meta: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def __init__(self, effect_meta: Union["VideoSceneEffectType", "VideoCharacterEffectType"],
                  params: Optional[List[Optional[float]]] = None, *,
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的特效元数据及参数列表构造一个视频特效对象, params的范围是0~100"""
+        from .metadata import VideoSceneEffectType, VideoCharacterEffectType
 
         self.name = effect_meta.value.name
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.effect_id = effect_meta.value.effect_id
         self.resource_id = effect_meta.value.resource_id
         self.adjust_params = []
@@ -163,7 +163,7 @@ class Filter:
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的滤镜元数据及强度构造滤镜素材对象"""
 
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.effect_meta = meta
         self.intensity = intensity
         self.apply_target_type = apply_target_type
@@ -219,10 +219,10 @@ class Transition:
     is_overlap: bool
     """是否与上一个片段重叠(?)"""
 
-    def __init__(self, effect_meta: TransitionType, duration: Optional[int] = None):
+    def __init__(self, effect_meta: "TransitionType", duration: Optional[int] = None):
         """根据给定的转场元数据及持续时间构造一个转场对象"""
         self.name = effect_meta.value.name
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.effect_id = effect_meta.value.effect_id
         self.resource_id = effect_meta.value.resource_id
 
@@ -257,7 +257,7 @@ class BackgroundFilling:
     """背景颜色, 格式为'#RRGGBBAA'"""
 
     def __init__(self, fill_type: Literal["canvas_blur", "canvas_color"], blur: float, color: str):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.fill_type = fill_type
         self.blur = blur
         self.color = color
@@ -290,7 +290,7 @@ class MixMode:
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的混合模式元数据构造混合模式对象"""
 
-        self.global_id = uuid.uuid4().hex
+        self.global_id = generate_id()
         self.effect_meta = meta
         self.apply_target_type = apply_target_type
 
@@ -315,8 +315,11 @@ class MixMode:
 class VideoSegment(VisualSegment):
     """安放在轨道上的一个视频/图片片段"""
 
+    __slots__ = ("material_instance", "material_size", "fade", "effects", "filters", "mix_modes",
+                 "mask", "transition", "background_filling")
+
     material_instance: VideoMaterial
-    """素材实例"""
+    """素材实例, 与使用同一素材的其它片段共享"""
     material_size: Tuple[int, int]
     """素材尺寸"""
 
@@ -363,7 +366,7 @@ class VideoSegment(VisualSegment):
         """利用给定的视频/图片素材构建一个轨道片段, 并指定其时间信息及图像调节设置
 
         Args:
-            material (`VideoMaterial` or `str`): 素材实例或素材路径, 若为路径则自动构造素材实例(此时不能指定`cropSettings`参数)
+            material (`VideoMaterial` or `str`): 素材实例或素材路径, 若为路径则自动构造素材实例. 素材实例不会被复制而是被冻结, 如需单独的裁剪设置请使用`set_crop_settings`
             target_timerange (`Timerange`): 片段在轨道上的目标时间范围
             source_timerange (`Timerange`, optional): 截取的素材片段的时间范围, 默认从开头根据`speed`截取与`target_timerange`等长的一部分
             speed (`float`, optional): 播放速度, 默认为1.0. 此项与`source_timerange`同时指定时, 将覆盖`target_timerange`中的时长
@@ -391,7 +394,8 @@ class VideoSegment(VisualSegment):
         super().__init__(material.material_id, source_timerange, target_timerange, speed,
                          volume, change_pitch, clip_settings=clip_settings)
 
-        self.material_instance = deepcopy(material)
+        material.freeze()
+        self.material_instance = material
         self.material_size = (material.width, material.height)
         self.effects = []
         self.filters = []
@@ -401,7 +405,20 @@ class VideoSegment(VisualSegment):
         self.background_filling = None
         self.fade = None
 
-    def add_animation(self, animation_type: Union[IntroType, OutroType, GroupAnimationType],
+    def set_crop_settings(self, crop_settings: CropSettings) -> "VideoSegment":
+        """为此片段单独指定素材裁剪设置, 不影响共享同一素材的其它片段
+
+        此方法会为片段创建一个新的素材副本(具有新的素材id), 应在将片段添加到轨道之前调用
+
+        Args:
+            crop_settings (`CropSettings`): 裁剪设置
+        """
+        self.material_instance = self.material_instance.with_crop_settings(crop_settings)
+        self.material_instance.freeze()
+        self.material_id = self.material_instance.material_id
+        return self
+
+    def add_animation(self, animation_type: Union["IntroType", "OutroType", "GroupAnimationType"],
                       duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """将给定的入场/出场/组合动画添加到此片段的动画列表中
 
@@ -410,6 +427,8 @@ class VideoSegment(VisualSegment):
             duration (`int` or `str`, optional): 动画持续时间, 单位为微秒. 若传入字符串则会调用`tim()`函数进行解析.
                 若不指定则使用动画类型定义的默认值. 理论上只适用于入场和出场动画.
         """
+        from .metadata import IntroType, OutroType, GroupAnimationType
+
         if duration is not None:
             duration = tim(duration)
         if isinstance(animation_type, IntroType):
@@ -432,7 +451,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_effect(self, effect_type: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def add_effect(self, effect_type: Union["VideoSceneEffectType", "VideoCharacterEffectType"],
                    params: Optional[List[Optional[float]]] = None) -> "VideoSegment":
         """为视频片段添加一个作用于整个片段的特效
 
@@ -474,7 +493,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_filter(self, filter_type: FilterType, intensity: float = 100.0) -> "VideoSegment":
+    def add_filter(self, filter_type: "FilterType", intensity: float = 100.0) -> "VideoSegment":
         """为视频片段添加一个滤镜
 
         Args:
@@ -487,7 +506,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def set_mix_mode(self, mode: MixModeType) -> "VideoSegment":
+    def set_mix_mode(self, mode: "MixModeType") -> "VideoSegment":
         """为视频片段设置混合模式
 
         Args:
@@ -499,7 +518,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_mask(self, mask_type: MaskType, *, center_x: float = 0.0, center_y: float = 0.0, size: float = 0.5,
+    def add_mask(self, mask_type: "MaskType", *, center_x: float = 0.0, center_y: float = 0.0, size: float = 0.5,
                  rotation: float = 0.0, feather: float = 0.0, invert: bool = False,
                  rect_width: Optional[float] = None, round_corner: Optional[float] = None) -> "VideoSegment":
         """为视频片段添加蒙版
@@ -518,6 +537,7 @@ class VideoSegment(VisualSegment):
         Raises:
             `ValueError`: 试图添加多个蒙版或不正确地设置了`rect_width`及`round_corner`
         """
+        from .metadata import MaskType
 
         if self.mask is not None:
             raise ValueError("当前片段已有蒙版, 不能再添加新的蒙版")
@@ -535,7 +555,7 @@ class VideoSegment(VisualSegment):
         self.extra_material_refs.append(self.mask.global_id)
         return self
 
-    def add_transition(self, transition_type: TransitionType, *, duration: Optional[Union[int, str]] = None) -> "VideoSegment":
+    def add_transition(self, transition_type: "TransitionType", *, duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """为视频片段添加转场, 注意转场应当添加在**前面的**片段上
 
         Args:
@@ -589,6 +609,8 @@ class VideoSegment(VisualSegment):
 class StickerSegment(VisualSegment):
     """安放在轨道上的一个贴纸片段"""
 
+    __slots__ = ("resource_id",)
+
     resource_id: str
     """贴纸资源id"""
 
@@ -602,7 +624,7 @@ class StickerSegment(VisualSegment):
             target_timerange (`Timerange`): 片段在轨道上的目标时间范围
             clip_settings (`ClipSettings`, optional): 图像调节设置, 默认不作任何变换
         """
-        super().__init__(uuid.uuid4().hex, None, target_timerange, 1.0, 1.0, False, clip_settings=clip_settings)
+        super().__init__(generate_id(), None, target_timerange, 1.0, 1.0, False, clip_settings=clip_settings)
         self.resource_id = resource_id
 
     def export_material(self) -> Dict[str, Any]:
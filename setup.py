@@ -23,4 +23,7 @@ setup(
         "imageio",
         "uiautomation>=2; sys_platform == 'win32'"
     ],
+    extras_require={
+        "fast": ["orjson"]
+    },
 )
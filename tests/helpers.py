@@ -0,0 +1,100 @@
+"""各测试共用的草稿构造函数, 使用`readme_assets/tutorial`中的素材"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange, tim
+
+ASSETS = os.path.join(REPO_ROOT, "readme_assets", "tutorial")
+"""教程素材所在目录"""
+
+def asset(name: str) -> str:
+    return os.path.join(ASSETS, name)
+
+def build_draft() -> draft.ScriptFile:
+    """构造一个包含各类轨道、片段及效果(关键帧、转场、花字/气泡、特效、滤镜、字幕等)的草稿"""
+    script = draft.ScriptFile(1920, 1080, 30, True)
+    script.add_track(draft.TrackType.audio).add_track(draft.TrackType.video).add_track(draft.TrackType.text)
+    script.add_track(draft.TrackType.effect).add_track(draft.TrackType.filter).add_track(draft.TrackType.sticker)
+    script.add_track(draft.TrackType.video, "v2", relative_index=1)
+
+    video = draft.VideoMaterial(asset("video.mp4"))
+    audio = draft.AudioMaterial(asset("audio.mp3"))
+    gif = draft.VideoMaterial(asset("sticker.gif"))
+
+    audio_seg = draft.AudioSegment(audio, trange("0s", "5s"), volume=0.6)
+    audio_seg.add_fade("1s", "0s")
+    audio_seg.add_keyframe(0, 0.5)
+    audio_seg.add_keyframe(tim("1s"), 1.0)
+    audio_seg.add_effect(list(draft.AudioSceneEffectType)[0])
+    script.add_segment(audio_seg)
+
+    video_seg = draft.VideoSegment(video, trange("0s", "4.2s"))
+    video_seg.add_animation(draft.IntroType.斜切)
+    video_seg.add_transition(draft.TransitionType.信号故障)
+    video_seg.add_keyframe(draft.KeyframeProperty.position_x, "1s", 0.5)
+    video_seg.add_keyframe(draft.KeyframeProperty.position_x, 0, -0.5)
+    video_seg.add_keyframe(draft.KeyframeProperty.alpha, "2s", 0.3)
+    video_seg.add_effect(list(draft.VideoSceneEffectType)[5])
+    video_seg.add_filter(list(draft.FilterType)[3], 50)
+    video_seg.add_mask(draft.MaskType.矩形, size=0.3, round_corner=10)
+    video_seg.add_fade("0.5s", "0.5s")
+    video_seg.set_mix_mode(draft.metadata.MixModeType.滤色)
+    script.add_segment(video_seg, "video")
+
+    gif_seg = draft.VideoSegment(gif, trange(video_seg.end, gif.duration))
+    gif_seg.add_background_filling("blur", 0.0625)
+    script.add_segment(gif_seg, "video")
+
+    for i in range(20):
+        script.add_segment(draft.VideoSegment(video, trange(i * 1000000, 1000000),
+                                              clip_settings=draft.ClipSettings(scale_x=1.5)), "v2")
+
+    text_seg = draft.TextSegment("据说pyJianYingDraft效果还不错?", video_seg.target_timerange, font=draft.FontType.文轩体,
+                                 style=draft.TextStyle(color=(1.0, 1.0, 0.0)),
+                                 clip_settings=draft.ClipSettings(transform_y=-0.8), border=draft.TextBorder(),
+                                 shadow=draft.TextShadow(), background=draft.TextBackground(color="#ffffff"))
+    text_seg.add_animation(draft.TextOutro.故障闪动, duration=tim("1s"))
+    text_seg.add_animation(list(draft.TextIntro)[0], "0.5s")
+    text_seg.add_bubble("361595", "6742029398926430728")
+    text_seg.add_effect("7296357486490144036")
+    text_seg.add_keyframe(draft.KeyframeProperty.uniform_scale, 0, 1.0)
+    script.add_segment(text_seg)
+
+    script.add_segment(draft.StickerSegment("7226264929620921604", trange("1s", "2s")))
+    script.add_effect(list(draft.VideoSceneEffectType)[10], trange("0s", "3s"), params=[50])
+    script.add_filter(list(draft.FilterType)[20], trange("1s", "3s"), intensity=70)
+    script.import_srt(asset("subtitles.srt"), "subs", time_offset="0.5s")
+    script.import_srt(asset("subtitles.srt"), "subs2", style_reference=text_seg)
+    return script
+
+def build_template(draft_path: str) -> draft.ScriptFile:
+    """将`build_draft`的结果保存到`draft_path`, 再作为模板加载并进行若干替换"""
+    build_draft().dump(draft_path)
+    return edit_template(draft.ScriptFile.load_template(draft_path))
+
+def edit_template(template: draft.ScriptFile) -> draft.ScriptFile:
+    """对由`build_draft`的结果加载得到的模板进行若干文本及素材替换"""
+    text_track = template.get_imported_track(draft.TrackType.text, name="subs")
+    template.replace_text(text_track, 0, "新的字幕")
+    template.replace_text_by_content("替换", "据说", model="eq")
+
+    video_track = template.get_imported_track(draft.TrackType.video, name="v2")
+    template.replace_material_by_seg(video_track, 2, draft.VideoMaterial(asset("sticker.gif")),
+                                     handle_shrink=draft.ShrinkMode.cut_tail_align)
+    template.replace_material_by_seg(video_track, 5, draft.VideoMaterial(asset("video.mp4")), trange("0s", "2s"),
+                                     handle_extend=draft.ExtendMode.push_tail)
+    template.replace_material_by_name("audio.mp3", draft.AudioMaterial(asset("audio.mp3")))
+    return template
+
+def build_importing_draft(template: draft.ScriptFile) -> draft.ScriptFile:
+    """构造一个从`template`中导入了视频及音频轨道的新草稿"""
+    script = draft.ScriptFile(1080, 1920, 30, False)
+    script.imported_materials = {}
+    script.import_track(template, template.get_imported_track(draft.TrackType.video, name="v2"), offset="1s", new_name="imp")
+    script.import_track(template, template.get_imported_track(draft.TrackType.audio), relative_index=3)
+    return script
@@ -0,0 +1,96 @@
+"""`EffectEnum`查找表的检查: 各查找方法的结果须与逐个成员线性查找的旧实现一致"""
+
+import random
+import unittest
+
+from helpers import draft
+
+from pyJianYingDraft import metadata
+from pyJianYingDraft.metadata.effect_meta import EffectEnum
+
+ENUMS = [getattr(metadata, name) for name in sorted(metadata._LAZY_ENUMS)
+         if issubclass(getattr(metadata, name), EffectEnum)]
+
+def _legacy_from_name(cls, name: str):
+    """旧版`from_name`: 逐个比较规范化后的成员名"""
+    name = name.lower().replace(" ", "").replace("_", "")
+    for effect in cls:
+        if effect.name.lower().replace(" ", "").replace("_", "") == name:
+            return effect
+    raise ValueError(f"Effect named '{name}' not found")
+
+def _scan(cls, attr: str, value: str):
+    """线性查找`attr`属性等于`value`的第一个成员"""
+    for effect in cls:
+        if getattr(effect.value, attr, None) == value:
+            return effect
+    raise ValueError
+
+def _outcome(func, *args):
+    try:
+        return func(*args)
+    except ValueError as e:
+        return ("ValueError", str(e))
+
+def _mangle(rng: random.Random, name: str) -> str:
+    """随机改变大小写并插入空格及下划线, 不改变规范化后的名称"""
+    chars = []
+    for c in name:
+        if rng.random() < 0.2:
+            chars.append(rng.choice(" _"))
+        chars.append(c.upper() if rng.random() < 0.5 else c.lower())
+    return "".join(chars)
+
+class TestEffectEnumIndex(unittest.TestCase):
+    def test_enums_found(self):
+        self.assertGreaterEqual(len(ENUMS), 10)
+        self.assertIn(metadata.FilterType, ENUMS)
+        self.assertIn(metadata.VideoSceneEffectType, ENUMS)
+
+    def test_from_name_every_member(self):
+        rng = random.Random(24)
+        for cls in ENUMS:
+            for effect in cls:
+                for name in (effect.name, _mangle(rng, effect.name)):
+                    self.assertIs(cls.from_name(name), _legacy_from_name(cls, name), (cls, name))
+
+    def test_from_name_random_strings(self):
+        rng = random.Random(240)
+        for cls in ENUMS:
+            names = [effect.name for effect in cls]
+            alphabet = "".join(sorted(set("".join(names)))) + " _Xx"
+            for _ in range(200):
+                if rng.random() < 0.5:  # 与成员名相近但不一定相同的名称
+                    name = rng.choice(names)
+                    pos = rng.randrange(len(name) + 1)
+                    name = name[:pos] + rng.choice(alphabet) + name[pos + 1:]
+                else:
+                    name = "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 6)))
+                self.assertEqual(_outcome(cls.from_name, name), _outcome(_legacy_from_name, cls, name), (cls, name))
+
+    def test_id_lookups(self):
+        for cls in ENUMS:
+            for attr, lookup in (("resource_id", cls.from_resource_id), ("effect_id", cls.from_effect_id)):
+                for effect in cls:
+                    value = getattr(effect.value, attr, None)
+                    if value is None:
+                        continue
+                    self.assertIs(lookup(value), _scan(cls, attr, value), (cls, attr, value))
+                with self.assertRaises(ValueError):
+                    lookup("no-such-id")
+
+    def test_indexes_are_per_enum(self):
+        # 同名成员不会因查找表的缓存而在不同的枚举间混淆
+        self.assertIs(draft.IntroType.from_name(draft.IntroType.斜切.name), draft.IntroType.斜切)
+        shared = {effect.name for effect in draft.IntroType} & {effect.name for effect in draft.OutroType}
+        for name in sorted(shared)[:20]:
+            self.assertIs(draft.IntroType.from_name(name), draft.IntroType[name])
+            self.assertIs(draft.OutroType.from_name(name), draft.OutroType[name])
+
+        filter_type = list(draft.FilterType)[3]
+        self.assertIs(draft.FilterType.from_resource_id(int(filter_type.value.resource_id)), filter_type)
+        with self.assertRaises(ValueError):
+            draft.FilterType.from_name("不存在的滤镜")
+
+if __name__ == "__main__":
+    unittest.main()
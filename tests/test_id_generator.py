@@ -0,0 +1,113 @@
+"""id生成方式的检查: 各方式生成的id均为不重复的32位十六进制字符串, deterministic模式可逐字节复现草稿"""
+
+import os
+import re
+import json
+import threading
+import unittest
+
+from helpers import build_draft
+
+from pyJianYingDraft import id_generator
+from pyJianYingDraft.id_generator import set_id_generator, get_id_generator, generate_id
+
+ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+def _collect_ids(obj, out):
+    """收集草稿内容中所有以"id"结尾的键所对应的字符串值"""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key.endswith("id") and isinstance(value, str) and value:
+                out.append(value)
+            _collect_ids(value, out)
+    elif isinstance(obj, list):
+        for value in obj:
+            _collect_ids(value, out)
+    return out
+
+class TestIdGenerator(unittest.TestCase):
+    def tearDown(self):
+        set_id_generator("fast")
+
+    def test_format_and_uniqueness(self):
+        for mode, kwargs in [("fast", {}), ("uuid4", {}), ("deterministic", {"seed": 1})]:
+            with self.subTest(mode=mode):
+                set_id_generator(mode, **kwargs)
+                self.assertEqual(get_id_generator(), mode)
+                ids = [generate_id() for _ in range(10000)]
+                self.assertTrue(all(ID_PATTERN.match(item) for item in ids))
+                self.assertEqual(len(set(ids)), len(ids))
+
+    def test_draft_ids(self):
+        set_id_generator("fast")
+        # 草稿中所有32位十六进制的id均由当前的生成方式产生(其余id如特效资源id为纯数字)
+        generated = [item for item in _collect_ids(json.loads(build_draft().dumps()), []) if ID_PATTERN.match(item)]
+        self.assertGreater(len(generated), 100)
+        prefix = generate_id()[:16]
+        self.assertTrue(all(item.startswith(prefix) for item in generated))
+
+    def test_deterministic_reproduces_draft(self):
+        outputs = []
+        for seed in (42, 42, 43):
+            set_id_generator("deterministic", seed=seed)
+            outputs.append(build_draft().dumps())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertNotEqual(outputs[0], outputs[2])
+
+        set_id_generator("deterministic", seed="42")
+        first = generate_id()
+        set_id_generator("deterministic", seed="42")
+        self.assertEqual(generate_id(), first)
+        self.assertTrue(first.endswith("%016x" % 0))
+
+    def test_threads(self):
+        set_id_generator("fast")
+        results = [[] for _ in range(8)]
+        def worker(out):
+            out.extend(generate_id() for _ in range(5000))
+        threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = [item for out in results for item in out]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "需要os.fork")
+    def test_fork_uses_new_prefix(self):
+        set_id_generator("fast")
+        parent = generate_id()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # 子进程
+            try:
+                os.write(write_fd, generate_id().encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as f:
+            child = f.read().decode()
+        os.waitpid(pid, 0)
+
+        self.assertTrue(ID_PATTERN.match(child))
+        self.assertNotEqual(child[:16], parent[:16])
+        self.assertEqual(generate_id()[:16], parent[:16])
+
+    def test_fork_keeps_deterministic(self):
+        # deterministic模式下子进程不更换前缀, 以保证结果可复现
+        set_id_generator("deterministic", seed=7)
+        prefix = generate_id()[:16]
+        id_generator._reseed_after_fork()
+        self.assertEqual(generate_id()[:16], prefix)
+
+    def test_custom_and_invalid(self):
+        set_id_generator(lambda: "f" * 32)
+        self.assertEqual(get_id_generator(), "custom")
+        self.assertEqual(generate_id(), "f" * 32)
+        with self.assertRaises(ValueError):
+            set_id_generator("deterministic")
+        with self.assertRaises(ValueError):
+            set_id_generator("unknown")  # type: ignore
+
+if __name__ == "__main__":
+    unittest.main()
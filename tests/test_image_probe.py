@@ -0,0 +1,187 @@
+"""`image_probe`的快速探测结果与MediaInfo/imageio完整解析结果的一致性检查
+
+测试图片由Pillow在临时目录中生成, 另外也检查`readme_assets`中的图片
+"""
+
+import os
+import struct
+import shutil
+import zlib
+import tempfile
+import unittest
+
+from unittest import mock
+
+from helpers import REPO_ROOT
+
+from PIL import Image
+
+from pyJianYingDraft.image_probe import probe_image, PHOTO_DURATION
+from pyJianYingDraft.local_materials import _probe_video
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"}
+
+def _fallback(path: str):
+    """不使用快速探测, 直接通过MediaInfo(GIF时长通过imageio)得到的探测结果
+
+    MediaInfo不能给出WebP图片的尺寸, 此时以Pillow读取的尺寸代替
+    """
+    with mock.patch("pyJianYingDraft.local_materials.probe_image", return_value=None):
+        result = _probe_video(path)
+    if result.width is None or result.height is None:
+        with Image.open(path) as image:
+            return result.material_type, result.duration, image.width, image.height
+    return result.material_type, result.duration, int(result.width), int(result.height)
+
+def _png_chunks(data: bytes):
+    pos, chunks = 8, []
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunks.append((chunk_type, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return chunks
+
+def _png_from_chunks(chunks) -> bytes:
+    out = [b"\x89PNG\r\n\x1a\n"]
+    for chunk_type, body in chunks:
+        out.append(struct.pack(">I4s", len(body), chunk_type) + body +
+                   struct.pack(">I", zlib.crc32(chunk_type + body) & 0xFFFFFFFF))
+    return b"".join(out)
+
+def _gradient(mode: str, size) -> Image.Image:
+    image = Image.new("RGB", size)
+    image.putdata([(x * 7 % 256, y * 5 % 256, (x + y) % 256) for y in range(size[1]) for x in range(size[0])])
+    return image.convert(mode)
+
+class TestImageProbe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def save(self, name: str, image: Image.Image, **kwargs) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        image.save(path, **kwargs)
+        return path
+
+    def write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def frames(self, count: int, size=(40, 30)):
+        return [_gradient("RGB", size).rotate(i * 30) for i in range(count)]
+
+    def assert_matches_fallback(self, path: str, material_type: str = "photo") -> None:
+        result = probe_image(path)
+        self.assertIsNotNone(result, path)
+        self.assertEqual(result[0], material_type)
+        self.assertEqual(result, _fallback(path), path)
+
+    def test_png(self):
+        self.assert_matches_fallback(self.save("rgb.png", _gradient("RGB", (123, 45))))
+        self.assert_matches_fallback(self.save("rgba.png", _gradient("RGBA", (7, 300))))
+        self.assert_matches_fallback(self.save("palette.png", _gradient("P", (64, 64)), dpi=(300, 300)))
+
+    def test_apng(self):
+        path = self.save("anim.png", self.frames(1)[0], save_all=True, append_images=self.frames(3), duration=100)
+        self.assertIsNone(probe_image(path))
+
+        # acTL不紧跟在IHDR之后时也应识别为动态PNG
+        with open(path, "rb") as f:
+            chunks = _png_chunks(f.read())
+        self.assertIn(b"acTL", [chunk_type for chunk_type, _ in chunks])
+        chunks.insert(1, (b"tEXt", b"Comment\x00moved acTL"))
+        chunks.insert(1, (b"gAMA", struct.pack(">I", 45455)))
+        self.assertIsNone(probe_image(self.write("anim_moved.png", _png_from_chunks(chunks))))
+
+        still = [chunk for chunk in chunks if chunk[0] not in (b"acTL", b"fcTL", b"fdAT")]
+        self.assertEqual(probe_image(self.write("still.png", _png_from_chunks(still))), ("photo", PHOTO_DURATION, 40, 30))
+
+    def test_jpeg(self):
+        self.assert_matches_fallback(self.save("baseline.jpg", _gradient("RGB", (321, 123))))
+        self.assert_matches_fallback(self.save("progressive.jpg", _gradient("RGB", (17, 250)), progressive=True))
+        self.assert_matches_fallback(self.save("gray.jpg", _gradient("L", (90, 60))))
+        exif = Image.Exif()
+        exif[0x010E] = "description" * 50
+        self.assert_matches_fallback(self.save("exif.jpg", _gradient("RGB", (64, 48)), exif=exif.tobytes()))
+
+    def test_webp(self):
+        self.assert_matches_fallback(self.save("lossy.webp", _gradient("RGB", (101, 77)), quality=80))
+        self.assert_matches_fallback(self.save("lossless.webp", _gradient("RGBA", (33, 200)), lossless=True))
+        exif = Image.Exif()
+        exif[0x010E] = "extended"
+        self.assertEqual(probe_image(self.save("extended.webp", _gradient("RGB", (55, 44)), exif=exif.tobytes())),
+                         ("photo", PHOTO_DURATION, 55, 44))
+        self.assertIsNone(probe_image(self.save("anim.webp", self.frames(1)[0], save_all=True,
+                                                append_images=self.frames(2), duration=100)))
+
+    def test_bmp(self):
+        self.assert_matches_fallback(self.save("rgb.bmp", _gradient("RGB", (99, 66))))
+        self.assert_matches_fallback(self.save("palette.bmp", _gradient("P", (16, 8))))
+
+    def test_gif(self):
+        path = self.save("anim.gif", self.frames(1)[0], save_all=True, append_images=self.frames(5), duration=70, loop=0,
+                         comment=b"comment")
+        self.assert_matches_fallback(path, "gif")
+        path = self.save("local_palettes.gif", self.frames(1)[0].convert("P"), save_all=True, optimize=False,
+                         append_images=[frame.convert("P", palette=Image.ADAPTIVE, colors=16) for frame in self.frames(4)],
+                         duration=[40, 80, 120, 160, 200])
+        self.assert_matches_fallback(path, "gif")
+        self.assertEqual(probe_image(path, allow_gif=False), ("photo", PHOTO_DURATION, 40, 30))
+
+    def test_gif_reads_headers_only(self):
+        # 较大的GIF只应读取各块的头部, 而不应一次性读入整个文件
+        path = self.save("large.gif", self.frames(1, (400, 400))[0], save_all=True,
+                         append_images=self.frames(10, (400, 400)), duration=50)
+        size = os.path.getsize(path)
+        read_sizes = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            read = f.read
+            def tracked_read(n=-1):
+                data = read(n)
+                read_sizes.append(len(data))
+                return data
+            f.read = tracked_read
+            return f
+
+        with mock.patch("builtins.open", tracking_open):
+            result = probe_image(path)
+        self.assertEqual(result, _fallback(path))
+        self.assertLess(max(read_sizes), 1024)
+        self.assertLess(sum(read_sizes), size // 10)
+
+    def test_invalid_files(self):
+        for name, data in [("empty.png", b""), ("text.png", b"not an image"), ("truncated.png", b"\x89PNG\r\n\x1a\n\x00"),
+                           ("truncated.jpg", b"\xff\xd8\xff\xe0\x00"), ("truncated.gif", b"GIF89a\x10\x00\x10\x00\x00\x00\x00!"),
+                           ("bad_block.gif", b"GIF89a\x10\x00\x10\x00\x00\x00\x00\x99")]:
+            self.assertIsNone(probe_image(self.write(name, data)), name)
+        self.assertIsNone(probe_image(os.path.join(self.tmp_dir, "missing.png")))
+
+    def test_truncated_files(self):
+        paths = [self.save("full.gif", self.frames(1)[0], save_all=True, append_images=self.frames(3), duration=70),
+                 self.save("full.png", _gradient("RGB", (20, 20))), self.save("full.jpg", _gradient("RGB", (20, 20)))]
+        for path in paths:
+            name = os.path.basename(path)
+            with open(path, "rb") as f:
+                data = f.read()
+            for cut in range(0, len(data), max(1, len(data) // 50)):
+                result = probe_image(self.write("cut_" + name, data[:cut]))
+                self.assertTrue(result is None or result == probe_image(path))
+
+    def test_readme_assets(self):
+        paths = [os.path.join(root, name) for root, _, names in os.walk(os.path.join(REPO_ROOT, "readme_assets"))
+                 for name in names if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS]
+        self.assertTrue(paths)
+        for path in paths:
+            self.assert_matches_fallback(path, "gif" if path.endswith(".gif") else "photo")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""各JSON后端的编码结果与标准库`json.dumps(..., ensure_ascii=False)`的一致性检查
+
+可自动选择的后端须逐字节一致; 未安装的后端会被跳过
+"""
+
+import io
+import json
+import random
+import struct
+import importlib
+import unittest
+
+from helpers import build_draft
+
+from pyJianYingDraft import json_backend, util
+
+_AUTO_BACKENDS = ["orjson", "json"]
+"""可被自动选择的后端"""
+
+_STRINGS = ["", "ascii", "中文字幕", "emoji 😀", "quote \" backslash \\ slash /", "\n\r\t\b\f", "\x00\x1f\x7f",
+            "  ", "1e-7, 0.00001]", "e5\n"]
+_FLOATS = [0.0, -0.0, 0.1, 0.5, 1.0, 100.0, 1 / 3, 123456789.123, 1e-4, 1e-5, 1.5e-5, -2.5e-7, 1e-300, 5e-324,
+           1e15, 9999999999999998.0, 1e16, 1e22, 1.7976931348623157e308]
+
+def _stdlib(obj, indent):
+    if indent is None:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(obj, ensure_ascii=False, indent=indent)
+
+def _random_floats(count: int):
+    rng = random.Random(0)
+    ret = []
+    while len(ret) < count:
+        value = struct.unpack("d", struct.pack("Q", rng.getrandbits(64)))[0]
+        if value == value and abs(value) != float("inf"):
+            ret.append(value)
+        ret.append(rng.random() * 10 ** rng.randint(-12, 20))
+    return ret
+
+class _BackendTestCase(unittest.TestCase):
+    backend: str
+
+    def setUp(self):
+        try:
+            importlib.import_module(self.backend)
+        except ImportError:
+            self.skipTest("%s is not installed" % self.backend)
+        self.previous = json_backend.get_backend()
+        json_backend.set_backend(self.backend)
+
+    def tearDown(self):
+        json_backend.set_backend(self.previous)
+
+class TestAutoBackends(unittest.TestCase):
+    def test_auto_selection(self):
+        self.assertIn(json_backend.get_backend(), _AUTO_BACKENDS)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            json_backend.set_backend("simplejson")
+
+def _make_byte_test(backend: str):
+    class TestBytes(_BackendTestCase):
+        def assert_same(self, obj):
+            for indent in (None, 2, 4):
+                self.assertEqual(json_backend.dumps(obj, indent), _stdlib(obj, indent), (obj, indent))
+
+        def test_scalars(self):
+            for value in _STRINGS + _FLOATS + [-f for f in _FLOATS] + [True, False, None, 0, -1, 2 ** 63, -2 ** 64]:
+                self.assert_same(value)
+                self.assert_same([value])
+                self.assert_same({"key": value})
+
+        def test_random_floats(self):
+            floats = _random_floats(20000)
+            for i in range(0, len(floats), 100):
+                self.assert_same(floats[i:i + 100])
+            for value in floats[:2000]:
+                self.assert_same({"value": value, "neg": -value})
+
+        def test_nested(self):
+            obj = {"中文键": [{"a": [], "b": {}, "c": [[1, 2.5e-6], {"d": "e"}]}], "": None,
+                   "z": {"nested": {"deep": [1.0, "x"]}}, "a": _STRINGS}
+            self.assert_same(obj)
+
+        def test_write_json(self):
+            content = build_draft()._export_content(lazy=False, incremental=False)
+            for indent in (None, 4):
+                buffer = io.StringIO()
+                util.write_json(buffer, content, indent=indent)
+                self.assertEqual(buffer.getvalue(), _stdlib(content, indent))
+
+        def test_loads(self):
+            text = _stdlib({"a": _FLOATS, "b": _STRINGS}, 4)
+            self.assertEqual(json_backend.loads(text), json.loads(text))
+            self.assertEqual(json_backend.loads(text.encode("utf-8")), json.loads(text))
+
+    TestBytes.backend = backend
+    TestBytes.__name__ = TestBytes.__qualname__ = "TestBytes_%s" % backend
+    return TestBytes
+
+for _backend in _AUTO_BACKENDS:
+    globals()["TestBytes_%s" % _backend] = _make_byte_test(_backend)
+del _backend
+
+class TestUjson(_BackendTestCase):
+    """ujson不参与自动选择, 只要求编码结果能还原为相同的对象"""
+    backend = "ujson"
+
+    def test_round_trip(self):
+        obj = {"floats": _FLOATS + _random_floats(2000), "strings": _STRINGS, "nested": [{"a": [1, None, True]}]}
+        for indent in (None, 4):
+            self.assertEqual(json.loads(json_backend.dumps(obj, indent)), obj)
+
+if __name__ == "__main__":
+    unittest.main()
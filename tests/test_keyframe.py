@@ -0,0 +1,166 @@
+"""关键帧插入的等价性检查: `add_keyframe`及`add_keyframes`的结果须与旧实现(逐个追加后稳定排序)完全一致"""
+
+import random
+import unittest
+
+import numpy as np
+
+from helpers import draft, asset
+
+from pyJianYingDraft import id_generator, trange
+from pyJianYingDraft.keyframe import Keyframe, KeyframeList, KeyframeProperty
+
+class _LegacyKeyframeList(KeyframeList):
+    """旧版的关键帧列表, 每次添加后对整个列表重新排序"""
+
+    __slots__ = ()
+
+    def add_keyframe(self, time_offset: int, value: float):
+        self.keyframes.append(Keyframe(time_offset, value))
+        self.keyframes.sort(key=lambda x: x.time_offset)
+
+def _legacy_segment_add_keyframe(seg, _property: KeyframeProperty, time_offset: int, value: float) -> None:
+    """旧版`add_keyframe`对关键帧列表的查找方式: 线性查找第一个属性相同的列表"""
+    for kf_list in seg.common_keyframes:
+        if kf_list.keyframe_property == _property:
+            kf_list.add_keyframe(time_offset, value)
+            return
+    kf_list = KeyframeList(_property)
+    kf_list.add_keyframe(time_offset, value)
+    seg.common_keyframes.append(kf_list)
+
+def _random_offsets(rng: random.Random, count: int):
+    kind = rng.choice(["sorted", "reversed", "random", "few_distinct"])
+    if kind == "few_distinct":  # 大量重复的时间偏移量, 检查相同偏移量时的先后顺序
+        return [rng.choice([0, 1000, 2000]) for _ in range(count)]
+    offsets = [rng.randrange(0, 10 ** 6) for _ in range(count)]
+    if kind == "sorted":
+        offsets.sort()
+    elif kind == "reversed":
+        offsets.sort(reverse=True)
+    return offsets
+
+class TestKeyframeList(unittest.TestCase):
+    def tearDown(self):
+        id_generator.set_id_generator("fast")
+
+    def build(self, cls, seed: int, batches, batch: bool):
+        """以deterministic模式的id构造关键帧列表并导出, 各批关键帧逐个或整批添加"""
+        id_generator.set_id_generator("deterministic", seed=seed)
+        kf_list = cls(KeyframeProperty.alpha)
+        for offsets, values in batches:
+            if batch:
+                kf_list.add_keyframes(offsets, values)
+            else:
+                for offset, value in zip(offsets, values):
+                    kf_list.add_keyframe(offset, value)
+        return kf_list.export_json()
+
+    def test_random_equivalence(self):
+        rng = random.Random(18)
+        for case in range(500):
+            batches = []
+            for _ in range(rng.randint(0, 5)):
+                count = rng.randint(0, 30)
+                batches.append((_random_offsets(rng, count), [rng.random() for _ in range(count)]))
+            expected = self.build(_LegacyKeyframeList, case, batches, batch=False)
+            self.assertEqual(self.build(KeyframeList, case, batches, batch=False), expected, batches)
+            self.assertEqual(self.build(KeyframeList, case, batches, batch=True), expected, batches)
+
+    def test_numpy_input(self):
+        offsets, values = np.array([3000, 1000, 2000]), np.linspace(0.0, 1.0, 3)
+        kf_list = KeyframeList(KeyframeProperty.alpha)
+        kf_list.add_keyframes(offsets, values)
+        self.assertEqual([(kf.time_offset, kf.values) for kf in kf_list.keyframes],
+                         [(1000, [0.5]), (2000, [1.0]), (3000, [0.0])])
+        for kf in kf_list.keyframes:  # 须转换为Python原生数值, 以便JSON序列化
+            self.assertIs(type(kf.time_offset), int)
+            self.assertIs(type(kf.values[0]), float)
+
+    def test_invalid_input(self):
+        kf_list = KeyframeList(KeyframeProperty.alpha)
+        with self.assertRaises(ValueError):
+            kf_list.add_keyframes([0, 1], [0.5])
+        kf_list.add_keyframes([], [])
+        self.assertEqual(kf_list.keyframes, [])
+
+class TestSegmentKeyframes(unittest.TestCase):
+    def setUp(self):
+        self.video = draft.VideoMaterial(asset("video.mp4"))
+
+    def tearDown(self):
+        id_generator.set_id_generator("fast")
+
+    def test_random_equivalence(self):
+        rng = random.Random(180)
+        properties = [KeyframeProperty.position_x, KeyframeProperty.alpha, KeyframeProperty.rotation]
+        for case in range(200):
+            ops = [(rng.choice(properties), rng.randrange(0, 10 ** 6), rng.random()) for _ in range(rng.randint(1, 40))]
+
+            id_generator.set_id_generator("deterministic", seed=case)
+            expected = draft.VideoSegment(self.video, trange(0, 10 ** 6))
+            for op in ops:
+                _legacy_segment_add_keyframe(expected, *op)
+
+            id_generator.set_id_generator("deterministic", seed=case)
+            seg = draft.VideoSegment(self.video, trange(0, 10 ** 6))
+            for op in ops:
+                seg.add_keyframe(*op)
+            self.assertEqual(seg.export_json(), expected.export_json())
+
+    def test_batch_matches_single(self):
+        offsets = ["1s", 0, 500000, "0.5s", "2s"]
+        values = [0.1, 0.2, 0.3, 0.4, 0.5]
+        id_generator.set_id_generator("deterministic", seed=1)
+        single = draft.VideoSegment(self.video, trange(0, "3s"))
+        for offset, value in zip(offsets, values):
+            single.add_keyframe(KeyframeProperty.uniform_scale, offset, value)
+
+        id_generator.set_id_generator("deterministic", seed=1)
+        batch = draft.VideoSegment(self.video, trange(0, "3s"))
+        self.assertIs(batch.add_keyframes(KeyframeProperty.uniform_scale, offsets, values), batch)
+        self.assertEqual(batch.export_json(), single.export_json())
+
+        batch.add_keyframes(KeyframeProperty.scale_y, np.array([0, 1000]), np.array([1.0, 2.0]))
+        self.assertFalse(batch.uniform_scale)
+        with self.assertRaises(ValueError):
+            batch.add_keyframes(KeyframeProperty.uniform_scale, [0], [1.0])
+
+    def test_direct_list_edits(self):
+        # 直接修改`common_keyframes`后, 添加关键帧的结果仍须与旧版的线性查找一致
+        seg = draft.VideoSegment(self.video, trange(0, "3s"))
+        seg.add_keyframe(KeyframeProperty.alpha, 0, 1.0)
+        first, second = KeyframeList(KeyframeProperty.rotation), KeyframeList(KeyframeProperty.rotation)
+        seg.common_keyframes.extend([first, second])
+        seg.add_keyframe(KeyframeProperty.rotation, 0, 90.0)
+        self.assertEqual(len(first.keyframes), 1)
+        self.assertEqual(len(second.keyframes), 0)
+
+        seg.common_keyframes.clear()
+        seg.add_keyframes(KeyframeProperty.alpha, [0], [0.5])
+        self.assertEqual([kf_list.keyframe_property for kf_list in seg.common_keyframes], [KeyframeProperty.alpha])
+
+        # 以数量相同的其它列表替换后也不应写入已被移除的列表
+        replacement = KeyframeList(KeyframeProperty.position_x)
+        seg.common_keyframes = [replacement]
+        seg.add_keyframe(KeyframeProperty.position_x, 0, 0.5)
+        seg.add_keyframe(KeyframeProperty.alpha, 0, 0.5)
+        self.assertEqual(len(replacement.keyframes), 1)
+        self.assertEqual([kf_list.keyframe_property for kf_list in seg.common_keyframes],
+                         [KeyframeProperty.position_x, KeyframeProperty.alpha])
+
+    def test_audio_segment(self):
+        audio = draft.AudioMaterial(asset("audio.mp3"))
+        id_generator.set_id_generator("deterministic", seed=2)
+        single = draft.AudioSegment(audio, trange(0, "3s"))
+        for offset, volume in [(2000, 0.2), (0, 1.0), (1000, 0.5)]:
+            single.add_keyframe(offset, volume)
+
+        id_generator.set_id_generator("deterministic", seed=2)
+        batch = draft.AudioSegment(audio, trange(0, "3s")).add_keyframes([2000, 0, 1000], [0.2, 1.0, 0.5])
+        self.assertEqual(batch.export_json(), single.export_json())
+        with self.assertRaises(ValueError):
+            batch.add_keyframes([0], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+"""`keyframe_curve`的检查: 曲线采样及精简的结果与逐点计算的参考实现一致, 且误差不超过给定的容差;
+向量化的关键帧求值结果与逐点的线性插值一致
+"""
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from helpers import draft, asset
+
+from pyJianYingDraft import trange, SEC
+from pyJianYingDraft.keyframe import KeyframeList, KeyframeProperty
+from pyJianYingDraft.keyframe_curve import frame_times, sample_curve, KeyframeEvaluator
+
+def _reference_rdp(x, y, tolerance):
+    """逐点计算竖直插值误差的递归RDP, 误差最大的点有多个时取靠前者"""
+    keep = {0, len(x) - 1}
+    def simplify(first, last):
+        if last - first < 2:
+            return
+        slope = (y[last] - y[first]) / (x[last] - x[first])
+        errors = [abs(y[i] - (y[first] + slope * (x[i] - x[first]))) for i in range(first + 1, last)]
+        split = max(range(len(errors)), key=lambda i: (errors[i], -i))
+        if errors[split] > tolerance:
+            split += first + 1
+            keep.add(split)
+            simplify(first, split)
+            simplify(split, last)
+    simplify(0, len(x) - 1)
+    return sorted(keep)
+
+def _interp_error(times, values, kept_times, kept_values):
+    """按线性插值计算保留的关键帧在所有采样点上的最大误差"""
+    error, j = 0.0, 0
+    for t, v in zip(times, values):
+        while j + 1 < len(kept_times) - 1 and kept_times[j + 1] <= t:
+            j += 1
+        if len(kept_times) == 1:
+            interp = kept_values[0]
+        else:
+            t0, t1 = kept_times[j], kept_times[j + 1]
+            interp = kept_values[j] + (kept_values[j + 1] - kept_values[j]) * (t - t0) / (t1 - t0)
+        error = max(error, abs(interp - v))
+    return error
+
+def _reference_value(kf_list, t: int) -> float:
+    """逐点计算关键帧列表在时间偏移量`t`处按"Line"方式插值的取值"""
+    keyframes = kf_list.keyframes if kf_list is not None else []
+    if not keyframes:
+        return math.nan
+    if t < keyframes[0].time_offset:
+        return keyframes[0].values[0]
+    i = max(i for i, kf in enumerate(keyframes) if kf.time_offset <= t)
+    if i == len(keyframes) - 1:
+        return keyframes[-1].values[0]
+    (t0, y0), (t1, y1) = [(kf.time_offset, kf.values[0]) for kf in keyframes[i:i + 2]]
+    return y0 + (t - t0) / (t1 - t0) * (y1 - y0)
+
+def _random_kf_list(rng: random.Random):
+    kind = rng.choice(["none", "empty", "single", "duplicates", "random", "random"])
+    if kind == "none":
+        return None
+    kf_list = KeyframeList(KeyframeProperty.alpha)
+    count = {"empty": 0, "single": 1}.get(kind, rng.randint(2, 30))
+    offsets = [rng.choice([0, 500, 1000]) for _ in range(count)] if kind == "duplicates" \
+        else [rng.randrange(-1000, 10 ** 6) for _ in range(count)]
+    kf_list.add_keyframes(offsets, [rng.uniform(-10, 10) for _ in range(count)])
+    return kf_list
+
+class TestFrameTimes(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = random.Random(19)
+        for _ in range(300):
+            duration, fps, start = rng.randrange(0, 5 * SEC), rng.choice([24, 25, 29.97, 30, 60, 7.5]), rng.randrange(0, SEC)
+            times = frame_times(duration, fps, start)
+            self.assertEqual(times[0], start)
+            self.assertEqual(times[-1], start + duration)
+            self.assertTrue(all(a < b for a, b in zip(times, times[1:])))
+            self.assertTrue(all(type(t) is int for t in times))
+            frames = [start + round(i * SEC / fps) for i in range(int(duration * fps // SEC) + 1)]
+            self.assertEqual(times[:len(frames)], frames)
+            self.assertLessEqual(len(times) - len(frames), 1)
+
+    def test_strings_and_errors(self):
+        self.assertEqual(frame_times("1s", 2, "0.5s"), [500000, 1000000, 1500000])
+        self.assertEqual(frame_times(0), [0])
+        with self.assertRaises(ValueError):
+            frame_times(-1)
+        with self.assertRaises(ValueError):
+            frame_times("1s", 0)
+
+class TestSampleCurve(unittest.TestCase):
+    def check(self, times, values, tolerance):
+        result = sample_curve(values, times, tolerance=tolerance)
+        slack = 16 * np.finfo(np.float64).eps * max(1.0, max(abs(v) for v in values))
+        keep = _reference_rdp([float(t) for t in times], values, tolerance + slack)
+        self.assertEqual(result.time_offsets, [times[i] for i in keep])
+        self.assertEqual(result.values, [values[i] for i in keep])
+        self.assertEqual(result.sample_count, len(times))
+        self.assertLessEqual(result.max_error, tolerance + slack)
+        self.assertAlmostEqual(result.max_error, _interp_error(times, values, result.time_offsets, result.values), delta=1e-12)
+        return result
+
+    def test_random_against_reference(self):
+        rng = random.Random(190)
+        for _ in range(300):
+            count = rng.randint(1, 200)
+            times = sorted(rng.sample(range(0, 10 * SEC), count))
+            kind = rng.choice(["noise", "walk", "smooth", "steps"])
+            if kind == "noise":
+                values = [rng.uniform(-1, 1) for _ in times]
+            elif kind == "walk":
+                values = [0.0]
+                for _ in times[1:]:
+                    values.append(values[-1] + rng.gauss(0, 0.01))
+            elif kind == "smooth":
+                values = [math.sin(t / SEC * rng.uniform(0.5, 3)) for t in times]
+            else:
+                values = [float(rng.randint(0, 3)) for _ in times]
+            self.check(times, values, rng.choice([0.0, 1e-4, 1e-3, 0.05, 0.5]))
+
+    def test_known_curves(self):
+        times = frame_times("10s", 30)
+        ramp = sample_curve(lambda t: t / (10 * SEC), times)
+        self.assertEqual(ramp.time_offsets, [0, 10 * SEC])
+        self.assertEqual(ramp.values, [0.0, 1.0])
+        self.assertEqual(len(sample_curve([0.5] * len(times), times)), 2)
+
+        ease = sample_curve(lambda t: 0.5 - 0.5 * np.cos(np.pi * t / (10 * SEC)), times, tolerance=1e-3)
+        self.assertLess(len(ease), len(times) // 5)
+        self.assertLessEqual(ease.max_error, 1e-3)
+
+        single = sample_curve([1.0], [100])
+        self.assertEqual((single.time_offsets, single.values, single.max_error), ([100], [1.0], 0.0))
+
+    def test_callable_forms(self):
+        times = frame_times("2s", 25)
+        vectorized = sample_curve(lambda t: np.sin(t / SEC), times)
+        scalar_only = sample_curve(lambda t: math.sin(t / SEC), times)
+        from_values = sample_curve(np.sin(np.asarray(times) / SEC), np.asarray(times))
+        self.assertEqual(vectorized.time_offsets, scalar_only.time_offsets)
+        self.assertEqual(vectorized.values, scalar_only.values)
+        self.assertEqual(vectorized.time_offsets, from_values.time_offsets)
+        self.assertTrue(all(type(t) is int for t in from_values.time_offsets))
+        self.assertTrue(all(type(v) is float for v in from_values.values))
+
+    def test_invalid_input(self):
+        for times, values in [([], []), ([0, 0], [1.0, 2.0]), ([1, 0], [1.0, 2.0]), ([0, 1], [1.0]),
+                              ([0, 1], [1.0, float("nan")]), ([0, 1], [1.0, float("inf")])]:
+            with self.assertRaises(ValueError, msg=(times, values)):
+                sample_curve(values, times)
+
+    def test_add_to_segment(self):
+        result = sample_curve(lambda t: np.cos(t / SEC), frame_times("3s", 30), tolerance=1e-2)
+        kf_list = result.to_keyframe_list(KeyframeProperty.rotation)
+        self.assertEqual([(kf.time_offset, kf.values[0]) for kf in kf_list.keyframes],
+                         list(zip(result.time_offsets, result.values)))
+
+        seg = draft.VideoSegment(draft.VideoMaterial(asset("video.mp4")), trange(0, "3s"))
+        seg.add_keyframes(KeyframeProperty.alpha, result.time_offsets, result.values)
+        exported = seg.export_json()["common_keyframes"][0]["keyframe_list"]
+        self.assertEqual([kf["time_offset"] for kf in exported], result.time_offsets)
+
+class TestKeyframeEvaluator(unittest.TestCase):
+    def assert_values(self, actual, expected):
+        np.testing.assert_allclose(actual, np.asarray(expected, dtype=np.float64), rtol=1e-12, atol=1e-12)
+
+    def test_random_against_reference(self):
+        rng = random.Random(20)
+        for _ in range(200):
+            kf_lists = [_random_kf_list(rng) for _ in range(rng.randint(1, 8))]
+            starts = [rng.randrange(0, 10 ** 7) for _ in kf_lists] if rng.random() < 0.5 else None
+            offsets = starts if starts is not None else [0] * len(kf_lists)
+            times = [rng.randrange(-2000, 10 ** 7 + 10 ** 6) for _ in range(50)]
+            for kf_list in kf_lists:  # 查询时刻也包含各关键帧的时刻本身
+                if kf_list is not None:
+                    times.extend(kf.time_offset for kf in kf_list.keyframes[:3])
+
+            evaluator = KeyframeEvaluator(kf_lists, starts)
+            expected = [[_reference_value(kf_list, t - offset) for t in times] for kf_list, offset in zip(kf_lists, offsets)]
+            result = evaluator.evaluate(times)
+            self.assertEqual(result.shape, (len(kf_lists), len(times)) if len(kf_lists) > 1 else (len(times),))
+            self.assert_values(result.reshape(len(kf_lists), -1), expected)
+
+            indices = [rng.randrange(len(kf_lists)) for _ in times]
+            self.assert_values(evaluator.evaluate(times, indices), [expected[j][i] for i, j in enumerate(indices)])
+
+    def test_semantics(self):
+        kf_list = KeyframeList(KeyframeProperty.alpha)
+        kf_list.add_keyframes([0, 1000, 1000, 2000], [0.0, 1.0, 0.5, 1.5])
+        self.assert_values(kf_list.evaluate([-1, 0, 500, 999, 1000, 1500, 2000, 5000]),
+                           [0.0, 0.0, 0.5, 0.999, 0.5, 1.0, 1.5, 1.5])
+        self.assertTrue(np.isnan(KeyframeList(KeyframeProperty.alpha).evaluate([0, 1])).all())
+
+        evaluator = KeyframeEvaluator([kf_list, None])
+        self.assertEqual(evaluator.evaluate(500, 0), 0.5)
+        self.assertTrue(np.isnan(evaluator.evaluate(500, 1)))
+        self.assertEqual(evaluator.evaluate([[0, 2000]]).shape, (2, 1, 2))
+        with self.assertRaises(IndexError):
+            evaluator.evaluate(0, 2)
+        with self.assertRaises(ValueError):
+            KeyframeEvaluator([kf_list], [0, 1])
+
+    def test_from_segments(self):
+        video = draft.VideoMaterial(asset("video.mp4"))
+        segs = [draft.VideoSegment(video, trange(i * SEC, SEC)) for i in range(3)]
+        segs[0].add_keyframes(KeyframeProperty.alpha, [0, SEC], [0.0, 1.0])
+        segs[2].add_keyframe(KeyframeProperty.alpha, SEC // 2, 0.25)
+        segs[1].add_keyframe(KeyframeProperty.rotation, 0, 90.0)
+
+        result = KeyframeEvaluator.from_segments(segs, KeyframeProperty.alpha).evaluate([SEC // 4, 2 * SEC + SEC // 2])
+        self.assertEqual(result.shape, (3, 2))
+        self.assert_values(result[0], [0.25, 1.0])
+        self.assertTrue(np.isnan(result[1]).all())
+        self.assert_values(result[2], [0.25, 0.25])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""延迟加载的检查: 导入本包时不导入各特效元数据子模块, 而`dir()`及`__all__`中的所有名称均可按需解析
+
+检查在新的解释器中进行, 以免受到其它测试已导入的模块影响
+"""
+
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+from helpers import REPO_ROOT
+
+_SCRIPT = r"""
+import sys, json, warnings
+import pyJianYingDraft
+from pyJianYingDraft import metadata
+
+def loaded():
+    return sorted(name for name in sys.modules if name.startswith("pyJianYingDraft.metadata."))
+
+result = {"initial": loaded(), "unresolved": [], "missing_from_dir": []}
+for module in (pyJianYingDraft, metadata):
+    names = set(dir(module)) | set(module.__all__)
+    result["missing_from_dir"] += sorted(set(module.__all__) - set(dir(module)))
+    for name in sorted(names):
+        try:
+            getattr(module, name)
+        except AttributeError:
+            result["unresolved"].append(module.__name__ + "." + name)
+
+result["same_objects"] = all(getattr(pyJianYingDraft, name) is getattr(metadata, name)
+                             for name in pyJianYingDraft._LAZY_METADATA)
+result["cached"] = all(name in vars(pyJianYingDraft) for name in pyJianYingDraft._LAZY_METADATA)
+result["loaded"] = loaded()
+
+namespace = {}
+exec("from pyJianYingDraft import *", namespace)
+exec("from pyJianYingDraft.metadata import *", namespace)
+result["star_missing"] = sorted((set(pyJianYingDraft.__all__) | set(metadata.__all__)) - set(namespace))
+
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    result["deprecated_ok"] = pyJianYingDraft.Filter_type[next(iter(metadata.FilterType)).name] is next(iter(metadata.FilterType))
+result["deprecated_warned"] = any(issubclass(w.category, DeprecationWarning) for w in caught)
+
+try:
+    pyJianYingDraft.NoSuchName
+    result["bad_name_raises"] = False
+except AttributeError:
+    result["bad_name_raises"] = True
+print(json.dumps(result))
+"""
+
+def _run() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([REPO_ROOT] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+    proc = subprocess.run([sys.executable, "-c", _SCRIPT], cwd=REPO_ROOT, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        raise AssertionError(proc.stderr)
+    return json.loads(proc.stdout)
+
+class TestLazyImport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = _run()
+
+    def test_metadata_not_imported_eagerly(self):
+        self.assertEqual(self.result["initial"], ["pyJianYingDraft.metadata.effect_meta"])
+
+    def test_all_names_resolve(self):
+        self.assertEqual(self.result["unresolved"], [])
+        self.assertEqual(self.result["missing_from_dir"], [])
+        self.assertEqual(self.result["star_missing"], [])
+        self.assertTrue(self.result["same_objects"])
+        self.assertTrue(self.result["cached"])
+        self.assertGreater(len(self.result["loaded"]), 10)
+
+    def test_deprecated_proxies_and_errors(self):
+        self.assertTrue(self.result["deprecated_ok"])
+        self.assertTrue(self.result["deprecated_warned"])
+        self.assertTrue(self.result["bad_name_raises"])
+
+if __name__ == "__main__":
+    unittest.main()
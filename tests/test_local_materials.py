@@ -0,0 +1,178 @@
+"""本地素材的检查: 并发加载的结果须与逐个构造素材的结果一致, 被片段共享的素材须被冻结"""
+
+import os
+import copy
+import json
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from helpers import draft, asset
+
+from pyJianYingDraft import id_generator, probe_cache, trange
+from pyJianYingDraft.local_materials import load_materials
+
+PATHS = [asset("video.mp4"), asset("audio.mp3"), asset("sticker.gif"), asset("video.mp4")]
+
+MODES = [{"use_threads": True, "workers": 1}, {"use_threads": False, "workers": 2}]
+"""测试所用的并发方式. 本机的MediaInfo库并发解析时会出错, 故线程池只使用一个线程"""
+
+def _info(material):
+    ret = (type(material), material.path, material.material_name, material.duration)
+    if isinstance(material, draft.VideoMaterial):
+        ret += (material.material_type, material.width, material.height)
+    return ret
+
+def _sequential(paths):
+    return [draft.AudioMaterial(path) if path.endswith(".mp3") else draft.VideoMaterial(path) for path in paths]
+
+class TestLoadMaterials(unittest.TestCase):
+    def tearDown(self):
+        id_generator.set_id_generator("fast")
+
+    def test_matches_sequential(self):
+        expected = [_info(material) for material in _sequential(PATHS)]
+        for mode in MODES:
+            with self.subTest(**mode):
+                result = load_materials(PATHS, **mode)
+                self.assertTrue(result.ok)
+                self.assertEqual([_info(material) for material in result.materials], expected)
+
+    def test_errors_do_not_affect_others(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            broken = os.path.join(tmp_dir, "broken.png")
+            with open(broken, "wb") as f:
+                f.write(b"not an image")
+            paths = [asset("video.mp4"), os.path.join(tmp_dir, "missing.mp4"), broken, asset("audio.mp3")]
+            for mode in MODES:
+                with self.subTest(**mode):
+                    result = load_materials(paths, **mode)
+                    self.assertFalse(result.ok)
+                    self.assertEqual(sorted(result.errors), [1, 2])
+                    self.assertIsNone(result.materials[1])
+                    self.assertIsNone(result.materials[2])
+                    self.assertEqual([_info(result.materials[i]) for i in (0, 3)],
+                                     [_info(material) for material in _sequential([paths[0], paths[3]])])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_material_type(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            # 扩展名不在`AUDIO_EXTENSIONS`中的音频文件只有指定类型后才能加载
+            path = os.path.join(tmp_dir, "audio.bin")
+            shutil.copyfile(asset("audio.mp3"), path)
+            self.assertEqual(sorted(load_materials([path], 1, use_threads=True).errors), [0])
+            result = load_materials([path], 1, material_type="audio", use_threads=True)
+            self.assertIsInstance(result.materials[0], draft.AudioMaterial)
+            self.assertEqual(result.materials[0].duration, draft.AudioMaterial(asset("audio.mp3")).duration)
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertTrue(load_materials([]).ok)
+
+    def test_ids_follow_input_order(self):
+        # deterministic模式下以相同的种子加载得到相同的id, 且按输入顺序递增, 与工作线程或进程的调度顺序无关
+        for mode in MODES:
+            with self.subTest(**mode):
+                runs = []
+                for _ in range(2):
+                    id_generator.set_id_generator("deterministic", seed=42)
+                    runs.append([material.material_id for material in load_materials(PATHS, **mode).materials])
+                self.assertEqual(runs[0], runs[1])
+                self.assertEqual(runs[0], sorted(set(runs[0])))
+
+    def test_workers_share_probe_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            cache = probe_cache.enable_probe_cache(tmp_dir)
+            result = load_materials(PATHS, 2)
+            self.assertTrue(result.ok)
+            self.assertIsNotNone(cache.get(asset("video.mp4"), "video"))
+            self.assertIsNotNone(cache.get(asset("audio.mp3"), "audio"))
+        finally:
+            probe_cache.disable_probe_cache()
+            shutil.rmtree(tmp_dir)
+
+class TestSharedMaterial(unittest.TestCase):
+    def setUp(self):
+        self.video = draft.VideoMaterial(asset("video.mp4"))
+        self.audio = draft.AudioMaterial(asset("audio.mp3"))
+
+    def test_frozen_after_segment_created(self):
+        # 创建片段前可以修改素材, 之后修改会引发AttributeError且不改变素材
+        self.video.material_name = "renamed"
+        self.assertFalse(self.video.frozen)
+        draft.VideoSegment(self.video, trange(0, 1000000))
+        draft.AudioSegment(self.audio, trange(0, 1000000))
+        for material in (self.video, self.audio):
+            self.assertTrue(material.frozen)
+            with self.assertRaises(AttributeError):
+                material.material_name = "changed"
+            with self.assertRaises(AttributeError):
+                material.duration = 1
+        self.assertEqual(self.video.material_name, "renamed")
+
+        with self.assertRaises(AttributeError):
+            self.video.crop_settings.upper_left_x = 0.5
+        with self.assertRaises(AttributeError):
+            draft.CropSettings().lower_right_y = 0.5
+
+    def test_copies_stay_frozen(self):
+        draft.VideoSegment(self.video, trange(0, 1000000))
+        for material in (copy.copy(self.video), copy.deepcopy(self.video), pickle.loads(pickle.dumps(self.video))):
+            self.assertTrue(material.frozen)
+            with self.assertRaises(AttributeError):
+                material.width = 1
+
+    def test_with_crop_settings(self):
+        crop = self.video.crop_settings
+        draft.VideoSegment(self.video, trange(0, 1000000))
+        new_crop = draft.CropSettings(upper_left_x=0.1, lower_left_x=0.1)
+        material = self.video.with_crop_settings(new_crop)
+
+        self.assertIsNot(material, self.video)
+        self.assertNotEqual(material.material_id, self.video.material_id)
+        self.assertFalse(material.frozen)
+        self.assertIs(material.crop_settings, new_crop)
+        self.assertIs(self.video.crop_settings, crop)
+        self.assertEqual(self.video.crop_settings.upper_left_x, 0.0)
+        self.assertEqual((material.path, material.duration, material.width, material.height, material.material_type),
+                         (self.video.path, self.video.duration, self.video.width, self.video.height,
+                          self.video.material_type))
+
+    def test_set_crop_settings(self):
+        seg = draft.VideoSegment(self.video, trange(0, 1000000))
+        other = draft.VideoSegment(self.video, trange(1000000, 1000000))
+        seg.set_crop_settings(draft.CropSettings(upper_left_y=0.2, upper_right_y=0.2))
+
+        self.assertTrue(seg.material_instance.frozen)
+        self.assertEqual(seg.material_id, seg.material_instance.material_id)
+        self.assertNotEqual(seg.material_id, self.video.material_id)
+        self.assertIs(other.material_instance, self.video)
+        self.assertEqual(self.video.crop_settings.upper_left_y, 0.0)
+
+    def test_shared_material_exported_once(self):
+        script = draft.ScriptFile(1920, 1080, 30, True)
+        script.add_track(draft.TrackType.video).add_track(draft.TrackType.audio)
+        segs = [draft.VideoSegment(self.video, trange(i * 1000000, 1000000)) for i in range(3)]
+        cropped = draft.VideoSegment(self.video, trange(3000000, 1000000))
+        cropped.set_crop_settings(draft.CropSettings(upper_left_x=0.5, lower_left_x=0.5))
+        for seg in segs + [cropped]:
+            script.add_segment(seg)
+        for i in range(2):
+            script.add_segment(draft.AudioSegment(self.audio, trange(i * 1000000, 1000000)))
+
+        content = json.loads(script.dumps())
+        videos = content["materials"]["videos"]
+        self.assertEqual(sorted(video["id"] for video in videos), sorted([self.video.material_id, cropped.material_id]))
+        crops = {video["id"]: video["crop"]["upper_left_x"] for video in videos}
+        self.assertEqual(crops, {self.video.material_id: 0.0, cropped.material_id: 0.5})
+        self.assertEqual([audio["id"] for audio in content["materials"]["audios"]], [self.audio.material_id])
+
+        track_segments = [seg for track in content["tracks"] if track["type"] == "video" for seg in track["segments"]]
+        self.assertEqual([seg["material_id"] for seg in track_segments], [self.video.material_id] * 3 + [cropped.material_id])
+
+if __name__ == "__main__":
+    unittest.main()
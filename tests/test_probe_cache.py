@@ -0,0 +1,139 @@
+"""素材探测缓存`ProbeCache`的行为检查, 所有数据库及素材文件均位于临时目录中"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from helpers import draft, asset
+
+from pyJianYingDraft import probe_cache
+from pyJianYingDraft.probe_cache import ProbeCache, ProbeResult
+from pyJianYingDraft.local_materials import _probe_with_cache
+
+VIDEO = ProbeResult(material_type="video", duration=5000000, width=1920, height=1080)
+
+class TestProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ProbeCache(os.path.join(self.tmp_dir, "cache"))
+        self.path = self.write_file("a.mp4", b"0123456789")
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get(self.path, "video"))
+        self.cache.put(self.path, "video", VIDEO)
+        self.assertEqual(self.cache.get(self.path, "video"), VIDEO)
+        self.assertEqual(self.cache.get(os.path.relpath(self.path), "video"), VIDEO)
+        self.assertIsNone(self.cache.get(self.path, "audio"))
+        self.assertIsNone(self.cache.get(os.path.join(self.tmp_dir, "missing.mp4"), "video"))
+
+    def test_unknown_size_stored_as_null(self):
+        result = ProbeResult(material_type="photo", duration=1, width=None, height=None)
+        self.cache.put(self.path, "video", result)
+        self.assertEqual(self.cache.get(self.path, "video"), result)
+
+    def test_miss_after_size_change(self):
+        self.cache.put(self.path, "video", VIDEO)
+        stat = os.stat(self.path)
+        with open(self.path, "ab") as f:
+            f.write(b"more")
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(self.cache.get(self.path, "video"))
+
+    def test_miss_after_mtime_change(self):
+        self.cache.put(self.path, "video", VIDEO)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.assertIsNone(self.cache.get(self.path, "video"))
+
+    def test_stat_taken_before_probe(self):
+        # 探测期间文件被修改时, 写入的记录对应修改前的状态, 因此不会命中
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.cache.put(self.path, "video", VIDEO, stat)
+        self.assertIsNone(self.cache.get(self.path, "video"))
+        self.assertEqual(self.cache.get(self.path, "video", stat), VIDEO)
+
+    def test_invalidate(self):
+        other = self.write_file("b.mp4", b"data")
+        self.cache.put(self.path, "video", VIDEO)
+        self.cache.put(self.path, "audio", VIDEO)
+        self.cache.put(other, "video", VIDEO)
+
+        self.assertEqual(self.cache.invalidate(self.path), 2)
+        self.assertIsNone(self.cache.get(self.path, "video"))
+        self.assertEqual(self.cache.get(other, "video"), VIDEO)
+        self.assertEqual(self.cache.invalidate(self.path), 0)
+        self.assertEqual(self.cache.invalidate(), 1)
+        self.assertIsNone(self.cache.get(other, "video"))
+
+    def test_prune(self):
+        removed, modified = self.write_file("removed.mp4", b"x"), self.write_file("modified.mp4", b"x")
+        for path in (self.path, removed, modified):
+            self.cache.put(path, "video", VIDEO)
+        os.remove(removed)
+        with open(modified, "ab") as f:
+            f.write(b"more")
+
+        self.assertEqual(self.cache.prune(), 2)
+        self.assertEqual(self.cache.get(self.path, "video"), VIDEO)
+        self.assertEqual(self.cache.prune(), 0)
+        self.assertEqual(self.cache.prune(max_age=-1), 1)
+        self.assertIsNone(self.cache.get(self.path, "video"))
+
+    def test_old_schema_is_replaced(self):
+        directory = os.path.join(self.tmp_dir, "old")
+        os.makedirs(directory)
+        conn = sqlite3.connect(os.path.join(directory, ProbeCache.DB_NAME))
+        conn.execute("CREATE TABLE probes (path TEXT NOT NULL, kind TEXT NOT NULL, size INTEGER NOT NULL, "
+                     "mtime_ns INTEGER NOT NULL, material_type TEXT NOT NULL, duration INTEGER NOT NULL, "
+                     "width INTEGER NOT NULL, height INTEGER NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (path, kind))")
+        conn.commit()
+        conn.close()
+
+        cache = ProbeCache(directory)
+        try:
+            result = ProbeResult(material_type="photo", duration=1, width=None, height=None)
+            cache.put(self.path, "video", result)
+            self.assertEqual(cache.get(self.path, "video"), result)
+        finally:
+            cache.close()
+
+    def test_probe_with_cache(self):
+        calls = []
+        def probe() -> ProbeResult:
+            calls.append(1)
+            return VIDEO
+
+        self.assertIs(_probe_with_cache(self.path, "video", probe), VIDEO)  # 未启用缓存
+        probe_cache.enable_probe_cache(os.path.join(self.tmp_dir, "enabled"))
+        try:
+            self.assertEqual(_probe_with_cache(self.path, "video", probe), VIDEO)
+            self.assertEqual(_probe_with_cache(self.path, "video", probe), VIDEO)
+            self.assertEqual(len(calls), 2)
+
+            with open(self.path, "ab") as f:
+                f.write(b"more")
+            self.assertEqual(_probe_with_cache(self.path, "video", probe), VIDEO)
+            self.assertEqual(len(calls), 3)
+
+            material = draft.VideoMaterial(asset("sticker.gif"))
+            cached = draft.VideoMaterial(material.path)
+            self.assertEqual((cached.material_type, cached.duration, cached.width, cached.height),
+                             (material.material_type, material.duration, material.width, material.height))
+        finally:
+            probe_cache.disable_probe_cache()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+"""`ScriptFile`导出结果的一致性检查
+
+流式写入的`dump()`及`dumps()`应与标准库`json.dumps(..., indent=4, ensure_ascii=False)`逐字节一致, 增量导出应与完整导出一致
+"""
+
+import os
+import json
+import math
+import random
+import shutil
+import tempfile
+import unittest
+
+from helpers import draft, asset, build_draft, build_template, build_importing_draft
+
+from pyJianYingDraft import trange
+
+def _stdlib_dumps(script: draft.ScriptFile, compact: bool) -> str:
+    content = script._export_content(lazy=False, incremental=False)
+    if compact:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(content, ensure_ascii=False, indent=4)
+
+class TestScriptFileDump(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.scripts = {"draft": build_draft()}
+        cls.scripts["template"] = build_template(os.path.join(cls.tmp_dir, "template.json"))
+        cls.scripts["importing"] = build_importing_draft(cls.scripts["template"])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def read_dump(self, script: draft.ScriptFile, compact: bool) -> str:
+        path = os.path.join(self.tmp_dir, "dump.json")
+        script.dump(path, compact=compact)
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_dumps_matches_stdlib(self):
+        for name, script in self.scripts.items():
+            with self.subTest(name):
+                self.assertEqual(script.dumps(), _stdlib_dumps(script, compact=False))
+
+    def test_dump_matches_stdlib(self):
+        for name, script in self.scripts.items():
+            for compact in (False, True):
+                with self.subTest(name, compact=compact):
+                    self.assertEqual(self.read_dump(script, compact), _stdlib_dumps(script, compact))
+
+    def test_dump_is_repeatable(self):
+        script = self.scripts["importing"]
+        first = self.read_dump(script, compact=False)
+        self.assertEqual(script.dumps(), script.dumps())
+        self.assertEqual(self.read_dump(script, compact=False), first)
+
+class TestIncrementalExport(unittest.TestCase):
+    """在两次保存之间修改、移除或重新加入片段后, 增量导出应与完整导出一致"""
+
+    def assert_incremental_matches(self, script: draft.ScriptFile) -> None:
+        self.assertEqual(script._export_content(lazy=False, incremental=True),
+                         script._export_content(lazy=False, incremental=False))
+        self.assertEqual(script.dumps(incremental=True), script.dumps())
+
+    def test_edit_remove_readd(self):
+        script = build_draft()
+        self.assert_incremental_matches(script)
+        self.assertFalse(script.tracks["v2"].dirty)
+
+        # 直接修改片段属性后需手动标记
+        audio_track = script.tracks["audio"]
+        audio_track.segments[0].volume = 0.1
+        audio_track.mark_dirty()
+        self.assert_incremental_matches(script)
+
+        v2 = script.tracks["v2"]
+        removed = v2.segments[3]
+        v2.remove_segment(removed)
+        self.assertTrue(v2.dirty)
+        self.assert_incremental_matches(script)
+        self.assertNotIn(removed, v2.segments)
+
+        script.add_segment(removed, "v2")
+        self.assert_incremental_matches(script)
+
+        # 移除最后一个片段时轨道结束时间随之缩短
+        last = v2.segments[-1]
+        v2.remove_segment(last)
+        self.assertEqual(v2.end_time, v2.segments[-1].end)
+        self.assert_incremental_matches(script)
+        with self.assertRaises(ValueError):
+            v2.remove_segment(last)
+
+        script.add_segment(draft.VideoSegment(draft.VideoMaterial(asset("video.mp4")), trange("30s", "1s")), "v2")
+        script.materials.videos.remove(script.materials.videos[0])
+        self.assert_incremental_matches(script)
+
+    def test_unmarked_edit_is_not_observed(self):
+        script = build_draft()
+        script.dumps(incremental=True)
+        script.tracks["audio"].segments[0].volume = 0.1
+        self.assertNotEqual(script.dumps(incremental=True), script.dumps())
+        script.tracks["audio"].mark_dirty()
+        self.assertEqual(script.dumps(incremental=True), script.dumps())
+
+    def test_template_edits(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            template = build_template(os.path.join(tmp_dir, "template.json"))
+            self.assert_incremental_matches(template)
+
+            video_track = template.get_imported_track(draft.TrackType.video, name="v2")
+            template.replace_material_by_seg(video_track, 7, draft.VideoMaterial(asset("sticker.gif")),
+                                             handle_shrink=draft.ShrinkMode.shrink)
+            self.assert_incremental_matches(template)
+
+            template.replace_text(template.get_imported_track(draft.TrackType.text, name="subs2"), 1, "又一条字幕")
+            self.assert_incremental_matches(template)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+def _legacy_replace_text_by_content(materials, text, old_text, model):
+    """原有的`replace_text_by_content`, 每个文本素材的样式范围按全文长度比例缩放"""
+    for mat in materials:
+        content = json.loads(mat["content"])
+        if (old_text in content["text"]) if model == "in" else content["text"].startswith(old_text):
+            old_len = len(content["text"])
+            content["text"] = content["text"].replace(old_text, text) if model == "in" else text
+            new_len = len(content["text"])
+            for style in content.get("styles", []):
+                style["range"] = [math.ceil(style["range"][0] / old_len * new_len),
+                                  math.ceil(style["range"][1] / old_len * new_len)]
+            mat["content"] = json.dumps(content, ensure_ascii=False)
+
+def _reference_substring(text, replacements):
+    """逐个位置尝试各旧文本(长者优先)的替换, 返回新文本及替换区域"""
+    keys = sorted(replacements, key=len, reverse=True)
+    pieces, spans, i, new_len = [], [], 0, 0
+    while i < len(text):
+        key = next((key for key in keys if text.startswith(key, i)), None)
+        if key is None:
+            pieces.append(text[i])
+            i, new_len = i + 1, new_len + 1
+            continue
+        spans.append((i, i + len(key), new_len, new_len + len(replacements[key])))
+        pieces.append(replacements[key])
+        i, new_len = i + len(key), new_len + len(replacements[key])
+    return "".join(pieces), spans
+
+def _reference_remap(pos, spans):
+    shift = 0
+    for old_start, old_end, new_start, new_end in spans:
+        if pos <= old_start:
+            break
+        if pos < old_end:
+            return new_start + math.ceil((pos - old_start) / (old_end - old_start) * (new_end - new_start))
+        shift = new_end - old_end
+    return pos + shift
+
+class TestReplaceTextsByContent(unittest.TestCase):
+    @staticmethod
+    def make_script(texts):
+        script = draft.ScriptFile(1920, 1080, 30, True)
+        script.imported_materials = {"texts": []}
+        for i, (text, ranges) in enumerate(texts):
+            content = {"styles": [{"fill": {"alpha": 1.0}, "range": list(r)} for r in ranges], "text": text}
+            script.imported_materials["texts"].append({"id": "t%d" % i, "content": json.dumps(content, ensure_ascii=False)})
+        return script
+
+    @staticmethod
+    def contents(script):
+        return [json.loads(mat["content"]) for mat in script.imported_materials["texts"]]
+
+    def test_random_substring(self):
+        rng = random.Random(0)
+        for _ in range(3000):
+            text = "".join(rng.choice("ab字\\\"") for _ in range(rng.randrange(0, 12)))
+            bounds = sorted(rng.randrange(len(text) + 1) for _ in range(rng.randrange(0, 4) * 2))
+            ranges = [(bounds[i], bounds[i + 1]) for i in range(0, len(bounds), 2)]
+            replacements = {"".join(rng.choice("ab字\\") for _ in range(rng.randrange(1, 4))):
+                            "".join(rng.choice("xy\"") for _ in range(rng.randrange(0, 5))) for _ in range(rng.randrange(1, 4))}
+
+            script = self.make_script([(text, ranges)])
+            script.replace_texts_by_content(replacements, mode="substring")
+            content = self.contents(script)[0]
+
+            new_text, spans = _reference_substring(text, replacements)
+            self.assertEqual(content["text"], new_text, (text, replacements))
+            if spans:
+                expected = [[_reference_remap(a, spans), _reference_remap(b, spans)] for a, b in ranges]
+                expected = [r for r in expected if r[0] != r[1]]
+            else:  # 未替换的素材保持原样
+                expected = [list(r) for r in ranges]
+            self.assertEqual([style["range"] for style in content["styles"]], expected)
+
+            # 不与任何替换区域内部相交的样式仍作用于相同的文字
+            for a, b in ranges:
+                if a != b and all(b <= old_start or a >= old_end for old_start, old_end, _, _ in spans):
+                    self.assertEqual(new_text[_reference_remap(a, spans):_reference_remap(b, spans)], text[a:b])
+
+    def test_known_remap(self):
+        # "aXXb" -> "aYb": "a"及"b"的样式保持作用于原文字, 跨越替换区域的样式按比例缩放
+        script = self.make_script([("aXXb", [(0, 1), (3, 4), (0, 4), (1, 2), (2, 3)])])
+        script.replace_texts_by_content({"XX": "Y"})
+        content = self.contents(script)[0]
+        self.assertEqual(content["text"], "aYb")
+        self.assertEqual([style["range"] for style in content["styles"]], [[0, 1], [2, 3], [0, 3], [1, 2]])
+
+    def test_exact_and_prefix(self):
+        texts = [("hello world", [(0, 5), (6, 11)]), ("hello", [(0, 5)]), ("say hello", [(0, 9)]), ("hell", [])]
+        script = self.make_script(texts)
+        script.replace_texts_by_content({"hello": "你好"}, mode="exact")
+        self.assertEqual([c["text"] for c in self.contents(script)], ["hello world", "你好", "say hello", "hell"])
+        self.assertEqual(self.contents(script)[1]["styles"][0]["range"], [0, 2])
+
+        script = self.make_script(texts)
+        script.replace_texts_by_content({"hell": "A", "hello": "B"}, mode="prefix")
+        self.assertEqual([c["text"] for c in self.contents(script)], ["B", "B", "say hello", "A"])
+
+    def test_matches_legacy_single_replacement(self):
+        rng = random.Random(1)
+        for _ in range(2000):
+            texts = []
+            for _ in range(3):
+                text = "".join(rng.choice("abc字") for _ in range(rng.randrange(1, 10)))
+                texts.append((text, [(0, len(text))] + [tuple(sorted((rng.randrange(len(text) + 1), rng.randrange(len(text) + 1))))]))
+            old_text = "".join(rng.choice("abc字") for _ in range(rng.randrange(1, 3)))
+            text = "".join(rng.choice("xyz") for _ in range(rng.randrange(1, 6)))
+
+            # 前缀模式下整段文本被替换, 与原实现的比例缩放完全一致
+            script = self.make_script(texts)
+            script.replace_texts_by_content({old_text: text}, mode="prefix")
+            legacy = self.make_script(texts).imported_materials["texts"]
+            _legacy_replace_text_by_content(legacy, text, old_text, "eq")
+            expected = [json.loads(mat["content"]) for mat in legacy]
+            for (old_content, _), content in zip(texts, expected):
+                if old_content.startswith(old_text):  # 变为空的样式会被丢弃
+                    content["styles"] = [style for style in content["styles"] if style["range"][0] != style["range"][1]]
+            self.assertEqual(self.contents(script), expected)
+
+            # 子串模式下文本与原实现一致, 样式范围则按替换区域调整
+            script = self.make_script(texts)
+            script.replace_texts_by_content({old_text: text}, mode="substring")
+            legacy = self.make_script(texts).imported_materials["texts"]
+            _legacy_replace_text_by_content(legacy, text, old_text, "in")
+            self.assertEqual([c["text"] for c in self.contents(script)], [json.loads(mat["content"])["text"] for mat in legacy])
+
+    def test_invalid_arguments(self):
+        script = self.make_script([("text", [])])
+        with self.assertRaises(ValueError):
+            script.replace_texts_by_content({"": "x"})
+        with self.assertRaises(ValueError):
+            script.replace_texts_by_content({"t": "x"}, mode="regex")
+
+if __name__ == "__main__":
+    unittest.main()
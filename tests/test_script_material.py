@@ -0,0 +1,143 @@
+"""`MaterialList`及`ScriptMaterial`的行为检查, 导出结果须与原先基于`list`的实现一致"""
+
+import io
+import json
+import unittest
+
+from helpers import draft, build_draft
+
+from pyJianYingDraft import util
+from pyJianYingDraft.script_file import MaterialList, ScriptMaterial
+
+_CATEGORIES = ["audios", "videos", "stickers", "texts", "audio_effects", "audio_fades", "animations", "video_effects",
+               "speeds", "masks", "transitions", "filters", "mix_modes", "canvases"]
+
+class _ListScriptMaterial:
+    """原先以`list`存储各类素材的实现, 重复添加时由调用方按id去重"""
+
+    def __init__(self):
+        for category in _CATEGORIES:
+            setattr(self, category, [])
+
+    def export_json(self):
+        def export(items):
+            return [item.export_json() for item in items]
+        ret = {key: [] for key in ["ai_translates", "audio_balances", "audio_track_indexes", "beats", "chromas",
+                                   "color_curves", "digital_humans", "drafts", "flowers", "green_screens", "handwrites",
+                                   "hsl", "images", "log_color_wheels", "loudnesses", "manual_deformations",
+                                   "material_colors", "multi_language_refs", "placeholders", "plugin_effects",
+                                   "primary_color_wheels", "realtime_denoises", "shapes", "smart_crops",
+                                   "smart_relights", "sound_channel_mappings", "tail_leaders", "text_templates",
+                                   "time_marks", "video_trackings", "vocal_beautifys", "vocal_separations"]}
+        ret.update({
+            "audio_effects": export(self.audio_effects),
+            "audio_fades": export(self.audio_fades),
+            "audios": export(self.audios),
+            "canvases": export(self.canvases),
+            "effects": export(self.filters) + export(self.mix_modes),
+            "masks": self.masks,
+            "material_animations": export(self.animations),
+            "speeds": export(self.speeds),
+            "stickers": self.stickers,
+            "texts": self.texts,
+            "transitions": export(self.transitions),
+            "video_effects": export(self.video_effects),
+            "videos": export(self.videos),
+        })
+        return dict(sorted(ret.items()))
+
+def _key(category: str, item):
+    """原实现中判断素材是否已存在时所用的键: 字典素材按"id"字段, 其余按所在素材列表的id属性"""
+    if isinstance(item, dict):
+        return category, item["id"]
+    return category, getattr(item, getattr(ScriptMaterial(), category).id_attr)
+
+class TestMaterialList(unittest.TestCase):
+    def test_list_operations(self):
+        ml = MaterialList()
+        items = [{"id": str(i), "value": i} for i in range(5)]
+        ml.extend(items)
+        self.assertEqual(len(ml), 5)
+        self.assertEqual(list(ml), items)
+        self.assertEqual([ml[i] for i in range(len(ml))], items)
+        self.assertIs(ml[-1], items[-1])
+
+        self.assertIn("3", ml)
+        self.assertIn(items[3], ml)
+        self.assertIs(ml.get("3"), items[3])
+        self.assertIsNone(ml.get("missing"))
+
+    def test_duplicate_id_ignored(self):
+        ml = MaterialList()
+        first, second = {"id": "a", "value": 1}, {"id": "a", "value": 2}
+        ml.append(first)
+        ml.append(second)
+        self.assertEqual(len(ml), 1)
+        self.assertIs(ml[0], first)
+        self.assertIs(ml.get("a"), first)
+
+    def test_index_after_removal(self):
+        ml = MaterialList()
+        ml.extend({"id": str(i)} for i in range(5))
+        self.assertEqual(ml[-1]["id"], "4")  # 建立下标列表
+        ml.remove("4")
+        self.assertEqual(ml[-1]["id"], "3")
+        ml.remove({"id": "0"})
+        self.assertEqual([ml[i]["id"] for i in range(len(ml))], ["1", "2", "3"])
+        self.assertNotIn("0", ml)
+        with self.assertRaises(KeyError):
+            ml.remove("0")
+
+        ml.append({"id": "x"})
+        self.assertEqual(ml[-1]["id"], "x")
+        ml.clear()
+        self.assertEqual(len(ml), 0)
+        with self.assertRaises(IndexError):
+            ml[0]
+
+    def test_object_ids(self):
+        ml = MaterialList("global_id")
+        speeds = [draft.segment.Speed(1.0) for _ in range(3)]
+        ml.extend(speeds + speeds)
+        self.assertEqual(list(ml), speeds)
+        self.assertIn(speeds[1], ml)
+        self.assertIs(ml.get(speeds[1].global_id), speeds[1])
+        self.assertEqual(ml.export_json_cached(), [speed.export_json() for speed in speeds])
+
+class TestScriptMaterialExport(unittest.TestCase):
+    def collect_materials(self):
+        """收集一份完整草稿的所有素材, 并重复添加部分素材以检查去重"""
+        script = build_draft()
+        items = []
+        for category in _CATEGORIES:
+            items.extend((category, item) for item in getattr(script.materials, category))
+        return items + items[::3]
+
+    def test_export_matches_list_implementation(self):
+        items = self.collect_materials()
+        new, old = ScriptMaterial(), _ListScriptMaterial()
+        seen = set()
+        for category, item in items:
+            # 原实现在添加前逐个比较id
+            if _key(category, item) not in seen:
+                seen.add(_key(category, item))
+                getattr(old, category).append(item)
+            getattr(new, category).append(item)
+            if type(item) in ScriptMaterial._ScriptMaterial__CATEGORY_OF_TYPE:
+                self.assertIn(item, new)
+
+        expected = old.export_json()
+        self.assertEqual(dict(sorted(new.export_json().items())), expected)
+        self.assertEqual(dict(sorted(new.export_json(incremental=True).items())), expected)
+        self.assertEqual(dict(sorted(new.export_json(incremental=True).items())), expected)
+
+        buffer = io.StringIO()
+        util.write_json(buffer, new.export_json(lazy=True))
+        self.assertEqual(dict(sorted(json.loads(buffer.getvalue()).items())), expected)
+
+    def test_contains_rejects_unknown_type(self):
+        with self.assertRaises(TypeError):
+            object() in ScriptMaterial()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""片段及时间线值对象使用`__slots__`后的检查: 不再带有`__dict__`, 且复制及序列化的结果不变"""
+
+import copy
+import pickle
+import unittest
+
+from helpers import draft, build_draft
+
+from pyJianYingDraft.segment import BaseSegment
+from pyJianYingDraft.keyframe import Keyframe, KeyframeList
+
+class TestSlots(unittest.TestCase):
+    def setUp(self):
+        self.script = build_draft()
+        self.segments = [seg for track in self.script.tracks.values() for seg in track.segments]
+
+    def test_no_instance_dict(self):
+        self.assertTrue(all(isinstance(seg, BaseSegment) for seg in self.segments))
+        self.assertGreaterEqual(len({type(seg) for seg in self.segments}), 6)
+        objects = list(self.segments)
+        for seg in self.segments:
+            objects.append(seg.target_timerange)
+            objects.extend(seg.common_keyframes)
+            objects.extend(kf for kf_list in seg.common_keyframes for kf in kf_list.keyframes)
+            if isinstance(seg, draft.VideoSegment):
+                objects.extend([seg.source_timerange, seg.clip_settings, seg.speed])
+        self.assertTrue(any(isinstance(obj, Keyframe) for obj in objects))
+        self.assertTrue(any(isinstance(obj, KeyframeList) for obj in objects))
+        for obj in objects:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+
+        with self.assertRaises(AttributeError):
+            draft.Timerange(0, 1).end_time = 1  # type: ignore
+
+    def test_copy_and_pickle(self):
+        for seg in self.segments:
+            expected = seg.export_json()
+            for clone in (copy.copy(seg), copy.deepcopy(seg), pickle.loads(pickle.dumps(seg))):
+                self.assertIs(type(clone), type(seg))
+                self.assertEqual(clone.export_json(), expected)
+
+        expected = self.script.dumps()
+        self.assertEqual(copy.deepcopy(self.script).dumps(), expected)
+        self.assertEqual(pickle.loads(pickle.dumps(self.script)).dumps(), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,340 @@
+"""模板模式下导入的片段、轨道及素材的行为检查
+
+导入的片段及轨道与解析得到的json数据共享且只读地引用它, 各种替换及导入操作均不应修改原始数据,
+导出结果应与原先深拷贝json数据后再修改的方式一致
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from copy import deepcopy
+
+from helpers import draft, asset, build_draft, edit_template, build_importing_draft
+
+from pyJianYingDraft import id_generator, Timerange
+from pyJianYingDraft.exceptions import ExtensionFailed
+from pyJianYingDraft.template_mode import ImportedMediaSegment, ImportedMediaTrack, ImportedMaterialIndex
+from pyJianYingDraft.template_mode import ShrinkMode, ExtendMode
+
+def _legacy_export(seg) -> dict:
+    """原实现: 片段持有深拷贝的json数据, 导出时以可修改属性覆盖相应字段"""
+    json_data = deepcopy(seg.raw_data)
+    json_data["material_id"] = seg.material_id
+    json_data["target_timerange"] = seg.target_timerange.export_json()
+    if isinstance(seg, ImportedMediaSegment):
+        json_data["source_timerange"] = seg.source_timerange.export_json()
+    return json_data
+
+class TestOverlay(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp_dir, "template.json")
+        build_draft().dump(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def load(self) -> draft.ScriptFile:
+        return draft.ScriptFile.load_template(self.path)
+
+    def test_raw_data_untouched(self):
+        template = self.load()
+        snapshot = deepcopy(template.content)
+
+        edit_template(template)
+        other = build_importing_draft(template)
+        copied = template.clone()
+        edit_template(copied)
+        for script in (template, other, copied):
+            script.dumps()
+
+        self.assertEqual(template.content, snapshot)
+
+    def test_segment_export_matches_deepcopy(self):
+        template = edit_template(self.load())
+        for track in template.imported_tracks:
+            for seg in getattr(track, "segments", []):
+                self.assertEqual(seg.export_json(), _legacy_export(seg))
+
+    def test_segment_clone(self):
+        track = self.load().get_imported_track(draft.TrackType.video, name="v2")
+        seg = track.segments[3]
+        before = seg.export_json()
+
+        cloned = seg.clone()
+        self.assertIs(cloned.raw_data, seg.raw_data)
+        cloned.target_timerange.start += 1000
+        cloned.source_timerange.duration -= 1000
+        cloned.material_id = "another"
+
+        self.assertEqual(seg.export_json(), before)
+        exported = cloned.export_json()
+        self.assertEqual(exported, _legacy_export(cloned))
+        self.assertEqual(exported["material_id"], "another")
+        # 未修改的子结构直接引用原始数据
+        self.assertIs(exported["clip"], seg.raw_data["clip"])
+
+    def test_track_clone(self):
+        track = self.load().get_imported_track(draft.TrackType.video, name="v2")
+        before = track.export_json()
+
+        cloned = track.clone()
+        self.assertIs(cloned.raw_data, track.raw_data)
+        self.assertIsNot(cloned.segments, track.segments)
+        cloned.name = "cloned"
+        cloned.segments[0].target_timerange.start = 10 ** 9
+        self.assertEqual(track.export_json(), before)
+        self.assertEqual(cloned.export_json()["name"], "cloned")
+
+    def test_script_clone_is_independent(self):
+        template = self.load()
+        before = template.dumps()
+        try:
+            id_generator.set_id_generator("deterministic", seed=0)
+            copied = edit_template(template.clone())
+            self.assertEqual(template.dumps(), before)
+            self.assertNotEqual(copied.dumps(), before)
+
+            # 在原草稿上做同样的修改, 结果应与在副本上修改一致
+            id_generator.set_id_generator("deterministic", seed=0)
+            self.assertEqual(edit_template(template).dumps(), copied.dumps())
+        finally:
+            id_generator.set_id_generator("fast")
+
+class TestImportedMaterialIndex(unittest.TestCase):
+    """随机增删改素材后, 索引的查找结果应与逐个遍历素材的结果一致"""
+
+    TYPES = ["videos", "audios", "texts", "effects"]
+
+    @staticmethod
+    def scan_by_id(materials, material_id):
+        return sorted((material_type, index) for material_type, material_list in materials.items()
+                      for index, material in enumerate(material_list) if material.get("id") == material_id)
+
+    @staticmethod
+    def scan_by_name(materials, material_type, name):
+        name_key = ImportedMaterialIndex.NAME_KEYS.get(material_type, "name")
+        return [index for index, material in enumerate(materials.get(material_type, [])) if material.get(name_key) == name]
+
+    def random_material(self, rng: random.Random, material_type: str):
+        material = {"id": "id%d" % rng.randrange(20)}
+        if rng.random() < 0.8:
+            material[ImportedMaterialIndex.NAME_KEYS.get(material_type, "name")] = "name%d" % rng.randrange(10)
+        if rng.random() < 0.1:
+            del material["id"]
+        return material
+
+    def check_queries(self, rng: random.Random, index: ImportedMaterialIndex, materials) -> None:
+        for _ in range(5):
+            material_id = "id%d" % rng.randrange(22)
+            self.assertEqual(sorted(index.find_by_id(material_id)), self.scan_by_id(materials, material_id))
+            material_type, name = rng.choice(self.TYPES + ["missing"]), "name%d" % rng.randrange(11)
+            self.assertEqual(sorted(index.find_by_name(material_type, name)),
+                             self.scan_by_name(materials, material_type, name))
+            expected = [i for t, i in self.scan_by_id(materials, material_id) if t == material_type]
+            self.assertEqual(index.find_id_in(material_type, material_id), expected[0] if expected else None)
+
+    def test_random_operations(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            materials = {material_type: [self.random_material(rng, material_type) for _ in range(rng.randrange(5))]
+                         for material_type in self.TYPES[:3]}
+            index = ImportedMaterialIndex(materials)
+            for _ in range(50):
+                op = rng.randrange(6)
+                material_type = rng.choice(self.TYPES)
+                material_list = materials.get(material_type)
+                if op == 0:  # 通过索引追加
+                    materials.setdefault(material_type, []).append(self.random_material(rng, material_type))
+                    index.add(material_type, materials[material_type][-1])
+                elif op == 1 and material_list:  # 写时拷贝后修改并通知索引
+                    i = rng.randrange(len(material_list))
+                    old = material_list[i]
+                    material_list[i] = dict(old, **self.random_material(rng, material_type))
+                    index.update(material_type, i, old)
+                elif op == 2:  # 绕过索引直接追加或插入
+                    materials.setdefault(material_type, []).insert(rng.randrange(len(material_list or []) + 1),
+                                                                   self.random_material(rng, material_type))
+                elif op == 3 and material_list:  # 绕过索引直接删除
+                    del material_list[rng.randrange(len(material_list))]
+                elif op == 4 and material_list is not None:  # 整体替换某一类别的列表
+                    materials[material_type] = [dict(material) for material in material_list]
+                elif op == 5 and material_list is not None and rng.random() < 0.2:
+                    del materials[material_type]
+                self.check_queries(rng, index, materials)
+
+    def test_script_file_index(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "template.json")
+            build_draft().dump(path)
+            template = edit_template(draft.ScriptFile.load_template(path))
+            index = template._material_index()
+            for material_type, material_list in template.imported_materials.items():
+                for material in material_list:
+                    if "id" in material:
+                        self.assertEqual(sorted(index.find_by_id(material["id"])),
+                                         self.scan_by_id(template.imported_materials, material["id"]))
+
+            # 整体替换`imported_materials`后重新构建索引
+            template.imported_materials = deepcopy(template.imported_materials)
+            self.assertIsNot(template._material_index(), index)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+def _legacy_process_timerange(segments, seg_index, src_timerange, shrink, extend) -> None:
+    """原有的`process_timerange`, 每次替换都逐个平移后续片段"""
+    seg = segments[seg_index]
+    new_duration = src_timerange.duration
+    delta_duration = abs(new_duration - seg.duration)
+    if new_duration < seg.duration:
+        if shrink == ShrinkMode.cut_head:
+            seg.start += delta_duration
+        elif shrink == ShrinkMode.cut_tail:
+            seg.duration -= delta_duration
+        elif shrink == ShrinkMode.cut_tail_align:
+            seg.duration -= delta_duration
+            for i in range(seg_index + 1, len(segments)):
+                segments[i].start -= delta_duration
+        elif shrink == ShrinkMode.shrink:
+            seg.duration -= delta_duration
+            seg.start += delta_duration // 2
+    elif new_duration > seg.duration:
+        success_flag = False
+        prev_seg_end = 0 if seg_index == 0 else segments[seg_index - 1].target_timerange.end
+        next_seg_start = int(1e15) if seg_index == len(segments) - 1 else segments[seg_index + 1].start
+        for mode in extend:
+            if mode == ExtendMode.extend_head:
+                if seg.start - delta_duration >= prev_seg_end:
+                    seg.start -= delta_duration
+                    success_flag = True
+            elif mode == ExtendMode.extend_tail:
+                if seg.target_timerange.end + delta_duration <= next_seg_start:
+                    seg.duration += delta_duration
+                    success_flag = True
+            elif mode == ExtendMode.push_tail:
+                shift_duration = max(0, seg.target_timerange.end + delta_duration - next_seg_start)
+                seg.duration += delta_duration
+                if shift_duration > 0:
+                    for i in range(seg_index + 1, len(segments)):
+                        segments[i].start += shift_duration
+                success_flag = True
+            elif mode == ExtendMode.cut_material_tail:
+                src_timerange.duration = seg.duration
+                success_flag = True
+            if success_flag:
+                break
+        if not success_flag:
+            raise ExtensionFailed("extension failed")
+    seg.source_timerange = src_timerange
+
+def _media_track(rng: random.Random, count: int) -> ImportedMediaTrack:
+    segments, start = [], 0
+    for i in range(count):
+        start += rng.choice([0, 0, rng.randrange(1, 50)])
+        duration = rng.randrange(1, 100)
+        segments.append({"material_id": "m%d" % i, "render_index": 0,
+                         "target_timerange": {"start": start, "duration": duration},
+                         "source_timerange": {"start": 0, "duration": duration}})
+        start += duration
+    return ImportedMediaTrack({"type": "video", "name": "", "id": "track", "segments": segments})
+
+def _state(track):
+    return [(seg.start, seg.duration, seg.source_timerange.start, seg.source_timerange.duration) for seg in track.segments]
+
+class TestProcessTimeranges(unittest.TestCase):
+    """批量处理的结果(包括中途抛出`ExtensionFailed`时的状态)应与按下标升序逐个调用原有实现相同"""
+
+    def test_random_batches(self):
+        rng = random.Random(0)
+        failures = 0
+        for _ in range(3000):
+            count = rng.randrange(1, 12)
+            seed = rng.random()
+            batch, sequential = _media_track(random.Random(seed), count), _media_track(random.Random(seed), count)
+
+            shrink = rng.choice(list(ShrinkMode))
+            extend = rng.sample(list(ExtendMode), rng.randrange(1, 3))
+            replacements = [(rng.randrange(count), rng.randrange(1, 150)) for _ in range(rng.randrange(1, count + 2))]
+
+            expected_error = None
+            try:
+                for index, duration in sorted(replacements, key=lambda item: item[0]):
+                    _legacy_process_timerange(sequential.segments, index, Timerange(0, duration), shrink, extend)
+            except ExtensionFailed as e:
+                expected_error = e
+
+            if expected_error is None:
+                batch.process_timeranges([(index, Timerange(0, duration)) for index, duration in replacements], shrink, extend)
+            else:
+                failures += 1
+                with self.assertRaises(ExtensionFailed):
+                    batch.process_timeranges([(index, Timerange(0, duration)) for index, duration in replacements],
+                                             shrink, extend)
+            self.assertEqual(_state(batch), _state(sequential), (replacements, shrink, extend))
+            self.assertTrue(batch.dirty)
+        self.assertGreater(failures, 100)
+
+    def test_single_matches_batch(self):
+        rng = random.Random(1)
+        for _ in range(500):
+            seed = rng.random()
+            single, sequential = _media_track(random.Random(seed), 6), _media_track(random.Random(seed), 6)
+            index, duration = rng.randrange(6), rng.randrange(1, 150)
+            shrink, extend = rng.choice(list(ShrinkMode)), [rng.choice(list(ExtendMode))]
+            outcomes = []
+            for func, track in ((single.process_timerange, single),
+                                (lambda *args: _legacy_process_timerange(sequential.segments, *args), sequential)):
+                try:
+                    func(index, Timerange(0, duration), shrink, extend)
+                    outcomes.append(None)
+                except ExtensionFailed:
+                    outcomes.append(ExtensionFailed)
+            self.assertEqual(outcomes[0], outcomes[1])
+            self.assertEqual(_state(single), _state(sequential))
+
+class TestReplaceMaterialsBySeg(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(self.tmp_dir, "template.json")
+        build_draft().dump(path)
+        self.template = draft.ScriptFile.load_template(path)
+        self.track = self.template.get_imported_track(draft.TrackType.video, name="v2")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def expected_duration(self) -> int:
+        return max(track.end_time for track in self.template.imported_tracks)
+
+    def test_duration_shrinks(self):
+        # "v2"轨道是最长的轨道, 以较短的素材替换其全部片段并使后续片段前移后, 草稿总长随之缩短
+        before = self.template.duration
+        self.assertEqual(before, self.expected_duration())
+        gif = draft.VideoMaterial(asset("sticker.gif"))
+        self.template.replace_materials_by_seg(self.track, [(i, gif, None) for i in range(len(self.track))],
+                                               handle_shrink=ShrinkMode.cut_tail_align)
+        self.assertLess(self.template.duration, before)
+        self.assertEqual(self.template.duration, self.expected_duration())
+        self.assertTrue(all(seg.material_id == gif.material_id for seg in self.track.segments))
+
+    def test_extension_failed(self):
+        gif, video = draft.VideoMaterial(asset("sticker.gif")), draft.VideoMaterial(asset("video.mp4"))
+        old_ids = [seg.material_id for seg in self.track.segments]
+        with self.assertRaises(ExtensionFailed):
+            self.template.replace_materials_by_seg(self.track, [(0, gif, None), (3, video, None), (5, gif, None)],
+                                                   handle_shrink=ShrinkMode.cut_tail_align,
+                                                   handle_extend=ExtendMode.extend_tail)
+        # 失败前已处理的片段完成替换, 失败及之后的片段保持原样
+        self.assertEqual(self.track.segments[0].material_id, gif.material_id)
+        self.assertEqual([seg.material_id for seg in self.track.segments[1:]], old_ids[1:])
+        self.assertEqual(self.track.segments[1].start, self.track.segments[0].end)
+        self.assertEqual(self.template.duration, self.expected_duration())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+"""`time_util`中正则快速路径与原有解析方式的一致性检查
+
+快速路径不匹配的输入会回退到原有解析方式, 因此对任意输入, 新旧实现都应给出相同的结果或引发相同类型的异常.
+`TimerangeArray`的各项运算须与逐个`Timerange`计算的结果一致
+"""
+
+import os
+import sys
+import random
+import unittest
+
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from pyJianYingDraft import time_util
+from pyJianYingDraft.time_util import Timerange, TimerangeArray, SEC
+
+def _outcome(func, arg):
+    """返回调用结果, 或引发的异常类型"""
+    try:
+        return func(arg)
+    except Exception as e:
+        return type(e)
+
+class TestTim(unittest.TestCase):
+    CASES = ["1h52m3s", "0.15s", "-0.5s", "1m30", "5", "", "-", "--1s", "1.5e3s", "1H 30M", "500ms", "30m1h",
+             " - 1s", ".5s", "5.s", "1e-3s", "1_000s", "+2m", "inf s", "1hh", " 2h ", "1h-30m"]
+
+    def assert_same(self, inp: str) -> None:
+        self.assertEqual(_outcome(time_util._parse_tim_fallback, inp), _outcome(time_util.tim, inp), repr(inp))
+
+    def test_known_inputs(self):
+        for inp in self.CASES:
+            self.assert_same(inp)
+
+    def test_random_inputs(self):
+        rng = random.Random(0)
+        alphabet = "0123456789.hms-+ e_H\t"
+        for _ in range(50000):
+            self.assert_same("".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 8))))
+
+    def test_numbers_passthrough(self):
+        self.assertEqual(time_util.tim(1500), 1500)
+        self.assertEqual(time_util.tim(1.6), 2)
+
+class TestSrtTstamp(unittest.TestCase):
+    CASES = ["00:01:02,500", " 1:2:3,4 ", "01:02,500", "a:b:c,d", "00:00:01.000", "1:2:3:4,5", "1:2:3,4,5",
+             "+1:02:03,004", "١٢:02:03,004"]
+
+    def assert_same(self, inp: str) -> None:
+        self.assertEqual(_outcome(time_util._srt_tstamp_fallback, inp), _outcome(time_util.srt_tstamp, inp), repr(inp))
+
+    def test_known_inputs(self):
+        for inp in self.CASES:
+            self.assert_same(inp)
+
+    def test_random_inputs(self):
+        rng = random.Random(1)
+        for _ in range(50000):
+            self.assert_same("".join(rng.choice("0123456789:, +") for _ in range(rng.randrange(0, 14))))
+
+    def test_batch_matches_single(self):
+        rng = random.Random(2)
+        for _ in range(5000):
+            tstamps = []
+            for _ in range(rng.randrange(1, 4)):
+                tstamp = "%02d:%02d:%02d,%03d" % (rng.randrange(100), rng.randrange(100), rng.randrange(100), rng.randrange(1000))
+                # 随机破坏部分字符, 覆盖非标准格式的回退路径
+                tstamps.append("".join(rng.choice("0123456789:, ") if rng.random() < 0.05 else c for c in tstamp))
+            expected = _outcome(lambda ts: [time_util._srt_tstamp_fallback(t) for t in ts], tstamps)
+            self.assertEqual(expected, _outcome(time_util.srt_tstamps, tstamps), tstamps)
+
+    def test_batch_empty(self):
+        self.assertEqual(time_util.srt_tstamps([]), [])
+
+def _random_timeranges(rng: random.Random, count: int):
+    return [Timerange(rng.randrange(-SEC, 100 * SEC), rng.choice([0, rng.randrange(1, SEC), rng.randrange(1, 20 * SEC)]))
+            for _ in range(count)]
+
+def _reference_find_overlaps(timeranges):
+    """逐个元素计算的`find_overlaps`: 与此前开始且结束最晚(相同时取靠后者)的时间范围比较"""
+    order = sorted((i for i, tr in enumerate(timeranges) if tr.duration > 0), key=lambda i: timeranges[i].start)
+    ret, latest = [], None
+    for i in order:
+        if latest is not None and timeranges[latest].overlaps(timeranges[i]):
+            ret.append((latest, i))
+        if latest is None or timeranges[i].end >= timeranges[latest].end:
+            latest = i
+    return ret
+
+class TestTimerangeArray(unittest.TestCase):
+    def assert_ranges(self, array: TimerangeArray, expected) -> None:
+        self.assertEqual([(tr.start, tr.duration) for tr in array], [(tr.start, tr.duration) for tr in expected])
+
+    def test_random_against_scalar(self):
+        rng = random.Random(22)
+        for _ in range(500):
+            timeranges = _random_timeranges(rng, rng.randrange(0, 40))
+            array = TimerangeArray.from_timeranges(timeranges)
+            self.assertEqual(len(array), len(timeranges))
+            self.assertEqual(array.ends.tolist(), [tr.end for tr in timeranges])
+
+            offset = rng.randrange(-SEC, SEC)
+            self.assert_ranges(array.shift(offset), [Timerange(tr.start + offset, tr.duration) for tr in timeranges])
+            offsets = [rng.randrange(-SEC, SEC) for _ in timeranges]
+            self.assert_ranges(array.shift(offsets), [Timerange(tr.start + o, tr.duration) for tr, o in zip(timeranges, offsets)])
+
+            factor, origin = rng.choice([0.5, 1.0, 1 / 3, 1.25, 2.0, 7.77]), rng.randrange(-SEC, 10 * SEC)
+            scaled = []
+            for tr in timeranges:
+                start, end = round((tr.start - origin) * factor) + origin, round((tr.end - origin) * factor) + origin
+                scaled.append(Timerange(start, end - start))
+            self.assert_ranges(array.scale(factor, origin), scaled)
+
+            fps = rng.choice([24, 25, 29.97, 30, 60])
+            snapped = []
+            for tr in timeranges:
+                start, end = [round(round(t * (fps / SEC)) * (SEC / fps)) for t in (tr.start, tr.end)]
+                snapped.append(Timerange(start, end - start))
+            self.assert_ranges(array.snap(fps), snapped)
+
+            low, high = rng.choice([None, 0, rng.randrange(0, 50 * SEC)]), rng.choice([None, rng.randrange(0, 100 * SEC)])
+            clamped = []
+            for tr in timeranges:
+                start, end = tr.start, tr.end
+                if low is not None:
+                    start, end = max(start, low), max(end, low)
+                if high is not None:
+                    start, end = min(start, high), min(end, high)
+                clamped.append(Timerange(start, end - start))
+            self.assert_ranges(array.clamp(low, high), clamped)
+
+            other = _random_timeranges(rng, 1)[0]
+            self.assertEqual(array.overlaps(other).tolist(), [tr.overlaps(other) for tr in timeranges])
+            self.assertEqual([tuple(pair) for pair in array.find_overlaps().tolist()], _reference_find_overlaps(timeranges))
+
+    def test_find_overlaps_detects_conflicts(self):
+        # 有重叠的元素恰为与某个在其之前开始的时间范围重叠的元素
+        rng = random.Random(220)
+        for _ in range(300):
+            timeranges = _random_timeranges(rng, rng.randrange(0, 30))
+            order = sorted(range(len(timeranges)), key=lambda i: timeranges[i].start)
+            expected = {j for pos, j in enumerate(order) if timeranges[j].duration > 0 and
+                        any(timeranges[i].duration > 0 and timeranges[i].overlaps(timeranges[j]) for i in order[:pos])}
+            pairs = TimerangeArray.from_timeranges(timeranges).find_overlaps()
+            self.assertEqual(pairs.shape[1:], (2,))
+            self.assertEqual(set(pairs[:, 1].tolist()), expected)
+
+    def test_conversions(self):
+        timeranges = [Timerange(0, 10), Timerange(5, 0), Timerange(20, 5)]
+        array = TimerangeArray.from_timeranges(timeranges)
+        self.assertEqual(array.starts.dtype, np.int64)
+        self.assertEqual(array[2], Timerange(20, 5))
+        self.assertIs(type(array[np.int64(0)].start), int)
+        self.assertEqual(array[1:], TimerangeArray([5, 20], [0, 5]))
+        self.assertEqual(array[array.durations > 0], TimerangeArray([0, 20], [10, 5]))
+        self.assertNotEqual(array, TimerangeArray([0, 5, 20], [10, 0, 6]))
+        self.assertNotEqual(array, timeranges)
+
+        # 构造时总会复制数据, 各运算也不修改原数组
+        starts = np.array([0, 5, 20])
+        copied = TimerangeArray(starts, [10, 0, 5])
+        starts[0] = 100
+        copied.shift(1).scale(2.0)
+        self.assertEqual(copied, array)
+
+        targets = [Timerange(0, 0) for _ in range(3)]
+        array.shift(SEC).write_to(targets)
+        self.assertEqual(targets, [Timerange(SEC, 10), Timerange(SEC + 5, 0), Timerange(SEC + 20, 5)])
+        self.assertTrue(all(type(tr.start) is int and type(tr.duration) is int for tr in targets))
+
+    def test_from_segments(self):
+        segments = [SimpleNamespace(target_timerange=Timerange(i * SEC, SEC)) for i in range(5)]
+        array = TimerangeArray.from_segments(segments)
+        array.scale(0.5).write_to([seg.target_timerange for seg in segments])
+        self.assertEqual([seg.target_timerange for seg in segments], [Timerange(i * SEC // 2, SEC // 2) for i in range(5)])
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            TimerangeArray([0, 1], [1])
+        array = TimerangeArray([0], [1])
+        with self.assertRaises(ValueError):
+            array.scale(0)
+        with self.assertRaises(ValueError):
+            array.snap(-30)
+        with self.assertRaises(ValueError):
+            array.write_to([])
+        self.assertEqual(TimerangeArray([], []).find_overlaps().shape, (0, 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""`TimelineIndex`的检查: 各类查询的结果须与逐个片段的线性扫描一致, 且草稿修改后索引随之更新"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from types import SimpleNamespace
+
+from helpers import draft, build_draft
+
+from pyJianYingDraft import trange, SEC
+from pyJianYingDraft.track import TrackType
+from pyJianYingDraft.timeline_index import TimelineIndex
+
+TRACK_TYPES = [TrackType.video, TrackType.audio, TrackType.effect]
+
+def _random_tracks(rng: random.Random):
+    """随机生成若干轨道, 同一轨道内的片段可以重叠, 也可以长度为0; 部分轨道只有原始json数据"""
+    tracks = []
+    for _ in range(rng.randint(0, 6)):
+        ranges = []
+        for _ in range(rng.randint(0, 25)):
+            start = rng.randrange(0, 1000)
+            ranges.append((start, start + rng.choice([0, rng.randrange(1, 50), rng.randrange(1, 500)])))
+        track_type = rng.choice(TRACK_TYPES)
+        if rng.random() < 0.3:
+            raw = [{"target_timerange": {"start": start, "duration": end - start}} for start, end in ranges]
+            tracks.append(SimpleNamespace(track_type=track_type, raw_data={"segments": raw}))
+        else:
+            segments = [SimpleNamespace(start=start, end=end) for start, end in ranges]
+            tracks.append(SimpleNamespace(track_type=track_type, segments=segments))
+    return tracks
+
+def _all_items(tracks):
+    """以(起始时间, 结束时间, 轨道, 片段)的形式按轨道及轨道内的顺序列出所有片段"""
+    ret = []
+    for track in tracks:
+        if hasattr(track, "segments"):
+            ret.extend((seg.start, seg.end, track, seg) for seg in track.segments)
+        else:
+            for seg in track.raw_data["segments"]:
+                start = seg["target_timerange"]["start"]
+                ret.append((start, start + seg["target_timerange"]["duration"], track, seg))
+    return ret
+
+def _brute_force(tracks, predicate, track_type=None):
+    items = [(start, order, track, seg) for order, (start, end, track, seg) in enumerate(_all_items(tracks))
+             if predicate(start, end) and (track_type is None or track.track_type == track_type)]
+    return [(track, seg) for _, _, track, seg in sorted(items, key=lambda item: item[:2])]
+
+def _identities(pairs):
+    # 片段对象可能相等但不相同(如内容相同的原始json), 故按对象身份比较
+    return [(id(track), id(seg)) for track, seg in pairs]
+
+class TestTimelineIndex(unittest.TestCase):
+    def assert_same(self, actual, expected):
+        self.assertEqual(_identities((item.track, item.segment) for item in actual), _identities(expected))
+
+    def test_random_against_brute_force(self):
+        rng = random.Random(21)
+        for _ in range(200):
+            tracks = _random_tracks(rng)
+            index = TimelineIndex(tracks)
+            self.assertEqual(len(index), len(_all_items(tracks)))
+            for _ in range(30):
+                a, b = sorted(rng.randrange(-10, 1100) for _ in range(2))
+                track_type = rng.choice([None] + TRACK_TYPES)
+                self.assert_same(index.at(a, track_type=track_type),
+                                 _brute_force(tracks, lambda s, e: s <= a < e, track_type))
+                self.assert_same(index.overlapping(a, b, track_type=track_type),
+                                 _brute_force(tracks, lambda s, e: a < b and not (e <= a or b <= s), track_type))
+                self.assert_same(index.covering(a, b, track_type=track_type),
+                                 _brute_force(tracks, lambda s, e: s <= a and e >= b and s < e, track_type))
+
+    def test_items(self):
+        segments = [SimpleNamespace(start=0, end=10), SimpleNamespace(start=5, end=5), SimpleNamespace(start=10, end=20)]
+        track = SimpleNamespace(track_type=TrackType.video, segments=segments)
+        index = TimelineIndex([track])
+        self.assertEqual([(item.start, item.end, item.order) for item in index.overlapping(0, 20)],
+                         [(0, 10, 0), (5, 5, 1), (10, 20, 2)])
+        self.assertEqual([item.segment for item in index.at(10)], [segments[2]])
+        self.assertEqual(index.at(10)[0].track_type, TrackType.video)
+        self.assertEqual(index.overlapping(5, 5), [])
+        self.assertEqual(len(TimelineIndex([]).at(0)), 0)
+        with self.assertRaises(ValueError):
+            index.overlapping(10, 5)
+        with self.assertRaises(ValueError):
+            index.covering(10, 5)
+
+class TestScriptFileIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp_dir, "template.json")
+        build_draft().dump(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def check(self, script: draft.ScriptFile) -> None:
+        """草稿的索引须与按当前轨道新建的索引给出相同的查询结果"""
+        tracks = list(script.tracks.values()) + list(script.imported_tracks)
+        index = script.get_timeline_index()
+        for t in range(0, 25 * SEC, SEC // 4):
+            self.assert_same(index.at(t), _brute_force(tracks, lambda s, e: s <= t < e))
+
+    assert_same = TestTimelineIndex.assert_same
+
+    def test_native_draft(self):
+        script = build_draft()
+        index = script.get_timeline_index()
+        self.check(script)
+        self.assertIs(script.get_timeline_index(), index)
+
+        script.add_segment(draft.TextSegment("新增", trange("30s", "1s")), "text")
+        self.assertIsNot(script.get_timeline_index(), index)
+        self.assertEqual(len(script.get_timeline_index().at(30 * SEC, track_type=TrackType.text)), 1)
+        self.check(script)
+
+        # 直接修改片段时间范围时须手动使索引失效
+        seg = script.get_timeline_index().at(30 * SEC, track_type=TrackType.text)[0].segment
+        seg.target_timerange = trange("40s", "1s")
+        script.invalidate_timeline_index()
+        self.assertEqual(script.get_timeline_index().at(30 * SEC, track_type=TrackType.text), [])
+        self.check(script)
+
+    def test_imported_tracks(self):
+        template = draft.ScriptFile.load_template(self.path)
+        index = template.get_timeline_index()
+        self.assertEqual(len(index), sum(len(_all_items([track])) for track in template.imported_tracks))
+        self.check(template)
+        self.assertTrue(index.at(SEC, track_type=TrackType.effect) or index.at(SEC, track_type=TrackType.filter))
+
+        script = draft.ScriptFile(1920, 1080, 30, True)
+        self.assertEqual(len(script.get_timeline_index()), 0)
+        script.import_track(template, template.get_imported_track(TrackType.video, name="v2"), offset="1s")
+        self.assertEqual(len(script.get_timeline_index()), len(template.get_imported_track(TrackType.video, name="v2").segments))
+        self.check(script)
+
+        copied = template.clone()
+        self.assertIsNot(copied.get_timeline_index(), index)
+        self.check(copied)
+
+        # 绕过`ScriptFile`接口增删片段时, 索引也能根据片段数量的变化自动重建
+        track = copied.get_imported_track(TrackType.video, name="v2")
+        removed = track.segments.pop()
+        self.assertNotIn(removed, [item.segment for item in copied.get_timeline_index().overlapping(0, 10 ** 9)])
+        self.check(copied)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""`Track`中基于二分查找的重叠检查与原有逐个比较方式的一致性检查
+
+原实现按添加顺序保存片段, 并逐个检查新片段是否与已有片段重叠; 新实现保持片段按起始时间有序,
+因此对任意添加顺序, 两者应接受或拒绝相同的片段, 且片段集合及轨道结束时间相同
+"""
+
+import random
+import unittest
+
+from helpers import draft
+
+from pyJianYingDraft import Timerange
+from pyJianYingDraft.track import Track
+from pyJianYingDraft.exceptions import SegmentOverlap
+
+def _sticker(start: int, duration: int) -> draft.StickerSegment:
+    return draft.StickerSegment("7226264929620921604", Timerange(start, duration))
+
+class TestTrack(unittest.TestCase):
+    def new_track(self) -> Track:
+        return Track(draft.TrackType.sticker, "sticker", 0, False)
+
+    def check_random_inserts(self, rng: random.Random, count: int, span: int, max_duration: int) -> None:
+        track = self.new_track()
+        reference = []  # 原实现: 按添加顺序保存的片段列表
+        for _ in range(count):
+            seg = _sticker(rng.randrange(span), rng.randrange(max_duration + 1))
+
+            expected = next((old for old in reference if old.overlaps(seg)), None)
+            found = track.find_overlap(seg)
+            self.assertEqual(found is None, expected is None, seg.target_timerange)
+            if found is not None:
+                self.assertTrue(found.overlaps(seg))
+                with self.assertRaises(SegmentOverlap):
+                    track.add_segment(seg)
+            else:
+                track.add_segment(seg)
+                reference.append(seg)
+
+            self.assertEqual(track.end_time, max((old.end for old in reference), default=0))
+
+        self.assertEqual(sorted(map(id, track.segments)), sorted(map(id, reference)))
+        starts = [seg.start for seg in track.segments]
+        self.assertEqual(starts, sorted(starts))
+
+    def test_random_inserts(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            self.check_random_inserts(rng, 60, 1000, 50)
+
+    def test_zero_length_segments(self):
+        # 长度为0的片段可能使更早片段的结束时间越过后续片段的起始时间
+        rng = random.Random(1)
+        for _ in range(200):
+            self.check_random_inserts(rng, 60, 100, 3)
+
+    def test_out_of_order_inserts(self):
+        track = self.new_track()
+        for start in (3000, 0, 2000, 1000):
+            track.add_segment(_sticker(start, 1000))
+        self.assertEqual([seg.start for seg in track.segments], [0, 1000, 2000, 3000])
+        self.assertEqual(track.end_time, 4000)
+
+        with self.assertRaises(SegmentOverlap):
+            track.add_segment(_sticker(1500, 10))
+        self.assertIsNone(track.find_overlap(_sticker(4000, 10)))
+        self.assertEqual(len(track.segments), 4)
+
+    def test_end_time(self):
+        track = self.new_track()
+        self.assertEqual(track.end_time, 0)
+        track.add_segment(_sticker(5000, 1000))
+        track.add_segment(_sticker(0, 1000))
+        # 原实现返回最后添加的片段的结束时间
+        self.assertEqual(track.end_time, 6000)
+
+    def test_type_check(self):
+        track = self.new_track()
+        with self.assertRaises(TypeError):
+            track.add_segment(draft.TextSegment("text", Timerange(0, 1000)))
+
+if __name__ == "__main__":
+    unittest.main()